@@ -0,0 +1,75 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "venues",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("address", sa.String(length=255), nullable=False),
+        sa.Column("city", sa.String(length=100), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("image_url", sa.String(length=500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_venues_id", "venues", ["id"])
+
+    op.create_table(
+        "events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("venue_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=150), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(length=50), nullable=True),
+        sa.Column("event_date", sa.Date(), nullable=False),
+        sa.Column("event_time", sa.Time(), nullable=False),
+        sa.Column("image_url", sa.String(length=500), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.ForeignKeyConstraint(["venue_id"], ["venues.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_events_id", "events", ["id"])
+
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("buyer_name", sa.String(length=100), nullable=False),
+        sa.Column("buyer_email", sa.String(length=150), nullable=False),
+        sa.Column("ticket_type", sa.String(length=50), nullable=True),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("confirmation_code", sa.String(length=20), nullable=False),
+        sa.Column("purchase_date", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("confirmation_code"),
+    )
+    op.create_index("ix_tickets_id", "tickets", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_id", table_name="tickets")
+    op.drop_table("tickets")
+    op.drop_index("ix_events_id", table_name="events")
+    op.drop_table("events")
+    op.drop_index("ix_venues_id", table_name="venues")
+    op.drop_table("venues")
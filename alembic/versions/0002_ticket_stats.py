@@ -0,0 +1,38 @@
+"""ticket_stats summary table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ticket_stats",
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("ticket_count", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint("status"),
+    )
+    # Build the summary from existing tickets in one grouped pass
+    op.execute(
+        "INSERT INTO ticket_stats (status, ticket_count, revenue) "
+        "SELECT status, COUNT(id), COALESCE(SUM(price), 0) FROM tickets "
+        "WHERE status IS NOT NULL GROUP BY status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ticket_stats")
@@ -0,0 +1,37 @@
+"""FTS5 search indexes for events and venues
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.search_index import SEARCH_INDEXES, search_index_ddl, search_index_drop_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite-only; other backends search with ILIKE
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES:
+        for statement in search_index_ddl(index):
+            op.execute(statement)
+        op.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES:
+        for statement in search_index_drop_ddl(index):
+            op.execute(statement)
@@ -0,0 +1,35 @@
+"""indexes for the hot filter and sort columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_venues_city", "venues", ["city"])
+    op.create_index("ix_events_venue_id", "events", ["venue_id"])
+    op.create_index("ix_events_category", "events", ["category"])
+    op.create_index("ix_events_event_date_id", "events", ["event_date", "id"])
+    op.create_index("ix_tickets_event_id_status", "tickets", ["event_id", "status"])
+    op.create_index("ix_tickets_purchase_date", "tickets", ["purchase_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_purchase_date", table_name="tickets")
+    op.drop_index("ix_tickets_event_id_status", table_name="tickets")
+    op.drop_index("ix_events_event_date_id", table_name="events")
+    op.drop_index("ix_events_category", table_name="events")
+    op.drop_index("ix_events_venue_id", table_name="events")
+    op.drop_index("ix_venues_city", table_name="venues")
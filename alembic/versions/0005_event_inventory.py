@@ -0,0 +1,42 @@
+"""event_inventory seat counters
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_inventory",
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("sold", sa.Integer(), nullable=False),
+        sa.Column("remaining", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    # Seed every event from its venue's capacity and its live tickets
+    op.execute(
+        "INSERT INTO event_inventory (event_id, capacity, sold, remaining) "
+        "SELECT e.id, v.capacity, COUNT(t.id), v.capacity - COUNT(t.id) "
+        "FROM events e JOIN venues v ON v.id = e.venue_id "
+        "LEFT JOIN tickets t ON t.event_id = e.id AND t.status != 'cancelled' "
+        "GROUP BY e.id, v.capacity"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_inventory")
@@ -0,0 +1,54 @@
+"""ticket_sales rollup per event and ticket type
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 13:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ticket_sales",
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("ticket_type", sa.String(length=50), nullable=False),
+        sa.Column("sold", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("event_id", "ticket_type"),
+    )
+    # Seed from existing tickets
+    op.execute(
+        "INSERT INTO ticket_sales (event_id, ticket_type, sold, cancelled, revenue) "
+        "SELECT event_id, ticket_type, "
+        "SUM(CASE WHEN status != 'cancelled' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END), "
+        "COALESCE(SUM(CASE WHEN status != 'cancelled' THEN price ELSE 0 END), 0) "
+        "FROM tickets WHERE ticket_type IS NOT NULL "
+        "GROUP BY event_id, ticket_type"
+    )
+    # Events created since 0005 without a purchase have no seat counters yet
+    op.execute(
+        "INSERT INTO event_inventory (event_id, capacity, sold, remaining) "
+        "SELECT e.id, v.capacity, COUNT(t.id), v.capacity - COUNT(t.id) "
+        "FROM events e JOIN venues v ON v.id = e.venue_id "
+        "LEFT JOIN tickets t ON t.event_id = e.id AND t.status != 'cancelled' "
+        "WHERE NOT EXISTS (SELECT 1 FROM event_inventory i WHERE i.event_id = e.id) "
+        "GROUP BY e.id, v.capacity"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ticket_sales")
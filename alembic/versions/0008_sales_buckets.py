@@ -0,0 +1,41 @@
+"""sales_buckets hourly and daily sales per event
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by scripts/backfill_sales_buckets.py
+    op.create_table(
+        "sales_buckets",
+        sa.Column("grain", sa.String(length=4), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("sold", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("grain", "bucket_start", "event_id"),
+    )
+    op.create_index(
+        "ix_sales_buckets_event_grain_start", "sales_buckets", ["event_id", "grain", "bucket_start"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sales_buckets_event_grain_start", table_name="sales_buckets")
+    op.drop_table("sales_buckets")
@@ -0,0 +1,44 @@
+"""holds for checkout and event_inventory.held
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "event_inventory",
+        sa.Column("held", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "holds",
+        sa.Column("id", sa.String(length=20), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_holds_event_id", "holds", ["event_id"])
+    op.create_index("ix_holds_expires_at", "holds", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_holds_expires_at", table_name="holds")
+    op.drop_index("ix_holds_event_id", table_name="holds")
+    op.drop_table("holds")
+    with op.batch_alter_table("event_inventory") as batch_op:
+        batch_op.drop_column("held")
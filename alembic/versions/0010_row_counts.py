@@ -0,0 +1,36 @@
+"""row_counts summary table for the dashboard
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "row_counts",
+        sa.Column("table_name", sa.String(length=50), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    # Count the existing rows once; writes keep the counts from here on
+    op.execute(
+        "INSERT INTO row_counts (table_name, row_count) "
+        "SELECT 'venues', COUNT(*) FROM venues UNION ALL SELECT 'events', COUNT(*) FROM events"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("row_counts")
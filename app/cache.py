@@ -0,0 +1,218 @@
+"""
+Read-through response cache for event and venue reads.
+
+Cached entries are the serialized JSON bodies of GET responses, keyed on the
+request path plus its sorted, non-empty query parameters. Every entry is
+filed under one or more tags (``events``, ``event:7``, ``venue:3`` ...) and
+write routes drop exactly the tags they affect once their transaction has
+committed; the TTL bounds how long a response that raced a write can linger.
+
+The storage backend only needs a handful of Redis commands (see
+``CacheBackend``), so ``redis.asyncio.Redis`` plugs in unchanged when
+``CACHE_BACKEND=redis``. ``MemoryCache`` is the in-process stand-in: a
+bounded LRU with per-entry expiry.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Protocol, Set, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .config import Settings, get_settings
+
+CACHE_HEADER = "X-Cache"
+
+
+class CacheBackend(Protocol):
+    """The subset of the (async) Redis command set the cache relies on"""
+
+    async def get(self, name: str) -> Optional[bytes]: ...
+
+    async def set(self, name: str, value: bytes, ex: Optional[int] = None) -> None: ...
+
+    async def delete(self, *names: str) -> int: ...
+
+    async def sadd(self, name: str, *values: str) -> int: ...
+
+    async def smembers(self, name: str) -> Set: ...
+
+    async def expire(self, name: str, time: int) -> bool: ...
+
+
+class MemoryCache:
+    """In-process CacheBackend: LRU-bounded values with per-entry TTLs"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._values: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._sets: Dict[str, Set[str]] = {}
+        # Which sets each value is filed under, so evictions leave no strays
+        self._memberships: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _drop(self, name: str) -> bool:
+        if self._values.pop(name, None) is None:
+            return False
+        for set_name in self._memberships.pop(name, ()):
+            members = self._sets.get(set_name)
+            if members is not None:
+                members.discard(name)
+                if not members:
+                    del self._sets[set_name]
+        return True
+
+    async def get(self, name: str) -> Optional[bytes]:
+        entry = self._values.get(name)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._drop(name)
+            return None
+        self._values.move_to_end(name)
+        return value
+
+    async def set(self, name: str, value: bytes, ex: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ex if ex else None
+        self._values[name] = (expires_at, value)
+        self._values.move_to_end(name)
+        while len(self._values) > self.max_entries:
+            self._drop(next(iter(self._values)))
+
+    async def delete(self, *names: str) -> int:
+        removed = 0
+        for name in names:
+            if self._drop(name):
+                removed += 1
+            elif self._sets.pop(name, None) is not None:
+                removed += 1
+        return removed
+
+    async def sadd(self, name: str, *values: str) -> int:
+        members = self._sets.setdefault(name, set())
+        added = len(set(values) - members)
+        members.update(values)
+        for value in values:
+            self._memberships.setdefault(value, set()).add(name)
+        return added
+
+    async def smembers(self, name: str) -> Set[str]:
+        return set(self._sets.get(name, ()))
+
+    async def expire(self, name: str, time: int) -> bool:
+        # Sets are emptied as their members are evicted, so they need no TTL
+        return name in self._sets
+
+
+def to_json(adapter: TypeAdapter, value) -> bytes:
+    """Validate ORM objects against a response schema and serialize them"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+class ResponseCache:
+    """Route-level read-through cache over a CacheBackend (None disables it)"""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: int = 30, prefix: str = "tickettou:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key_for(self, request: Request) -> str:
+        """Route plus normalized query: sorted, with empty parameters dropped"""
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+        return f"{self.prefix}GET {request.url.path}?{urlencode(params)}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, request: Request, etag: Optional[str] = None) -> Optional[Response]:
+        """The cached response for this request, or None on a miss
+
+        With ``etag``, an entry stored under a different ETag is stale (the
+        tables it was built from have been written since, perhaps by another
+        worker): it is dropped and counted as a miss.
+        """
+        if self.backend is None:
+            return None
+        key = self.key_for(request)
+        entry = await self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        # Entries are a JSON line of headers followed by the body
+        head, _, body = entry.partition(b"\n")
+        headers = json.loads(head)
+        if etag is not None and headers.get("ETag") != etag:
+            await self.backend.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        headers[CACHE_HEADER] = "HIT"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def put(
+        self,
+        request: Request,
+        body: bytes,
+        tags: Iterable[str],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Store a serialized body under ``tags`` and return it as the response"""
+        headers = dict(headers or {})
+        if self.backend is not None:
+            key = self.key_for(request)
+            await self.backend.set(key, json.dumps(headers).encode() + b"\n" + body, ex=self.ttl)
+            for tag in tags:
+                await self.backend.sadd(self._tag(tag), key)
+                await self.backend.expire(self._tag(tag), self.ttl)
+            headers[CACHE_HEADER] = "MISS"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every entry filed under any of ``tags``"""
+        if self.backend is None or not tags:
+            return
+        names = [self._tag(tag) for tag in tags]
+        keys = set()
+        for name in names:
+            keys |= await self.backend.smembers(name)
+        await self.backend.delete(*keys, *names)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "entries": len(self.backend) if isinstance(self.backend, MemoryCache) else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+def create_cache_backend(settings: Settings) -> Optional[CacheBackend]:
+    """The backend named by CACHE_BACKEND: memory, redis or none"""
+    if settings.cache_backend == "memory":
+        return MemoryCache(settings.cache_max_entries)
+    if settings.cache_backend == "redis":
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        return redis.from_url(settings.cache_url)
+    if settings.cache_backend == "none":
+        return None
+    raise ValueError(f"Unknown CACHE_BACKEND {settings.cache_backend!r}")
+
+
+settings = get_settings()
+response_cache = ResponseCache(create_cache_backend(settings), ttl=settings.cache_ttl_seconds)
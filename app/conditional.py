@@ -0,0 +1,118 @@
+"""
+Conditional GET (ETag / Last-Modified) for event and venue reads.
+
+A route's version is the revision counters of the tables it reads (see
+``app/services/revisions.py``), fetched by primary key. The strong ETag is
+built from those counters and ``Last-Modified`` from their latest write
+time. A matching ``If-None-Match`` (or, without one, an ``If-Modified-Since``
+no older than the last write) is answered with ``304 Not Modified`` before
+the route runs its query or serializes anything. The validators are per
+table, so a single-row route also passes a cheap existence query: a 304 is
+only sent for a row that exists, and a missing one gets its 404.
+
+Cached responses keep the validators they were built with, so a body and
+its ETag always belong together even when a read raced a write. A cached
+response is only served while its ETag is still the current one; one left
+behind by a write this worker never saw (another worker's, or one made
+outside the API) is rebuilt rather than served until its TTL runs out.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+
+from .cache import response_cache
+from .models import TableRevision
+
+VALIDATOR_HEADERS = ("etag", "last-modified", "cache-control")
+
+
+async def version_headers(db: AsyncSession, *tables: str) -> Dict[str, str]:
+    """ETag and Last-Modified for a response built from ``tables``"""
+    rows = {
+        name: (revision, updated_at)
+        for name, revision, updated_at in await db.execute(
+            select(TableRevision.table_name, TableRevision.revision, TableRevision.updated_at)
+            .where(TableRevision.table_name.in_(tables))
+        )
+    }
+    etag = "-".join(f"{table}.{rows.get(table, (0, None))[0]}" for table in tables)
+    # Clients must revalidate every time rather than guess a freshness lifetime
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+
+    written = [updated_at for _, updated_at in rows.values() if updated_at is not None]
+    if written:
+        last_modified = max(
+            value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in written
+        )
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, headers: Headers) -> bool:
+    """Whether the client's copy, per its validators, matches ``headers``"""
+    etag = headers.get("etag")
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        return any(
+            tag == "*" or _opaque_tag(tag) == etag
+            for tag in (tag.strip() for tag in if_none_match.split(","))
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("last-modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    since = _parse_http_date(if_modified_since)
+    modified = _parse_http_date(last_modified)
+    return since is not None and modified is not None and modified <= since
+
+
+def not_modified(headers: Headers) -> Response:
+    """A bodiless 304 carrying the validators from ``headers``"""
+    return Response(
+        status_code=304,
+        headers={name: headers[name] for name in VALIDATOR_HEADERS if name in headers},
+    )
+
+
+async def conditional_get(
+    request: Request, db: AsyncSession, *tables: str, exists: Optional[Select] = None
+) -> Tuple[Optional[Response], Dict[str, str]]:
+    """Answer a read from its validators or the cache when possible
+
+    Returns ``(response, headers)``: ``response`` is a 304 or cached response
+    to return as-is, or None when the route has to build the body itself, in
+    which case ``headers`` are the validators to send with it. A single-row
+    route passes ``exists``, a SELECT of that row, and a 304 is then only sent
+    when it finds one. Cached responses need no such check, since deleting
+    the row changes the ETag.
+    """
+    headers = await version_headers(db, *tables)
+    if is_not_modified(request, Headers(headers)):
+        if exists is None or await db.scalar(exists) is not None:
+            return not_modified(Headers(headers)), headers
+
+    cached = await response_cache.get(request, headers["ETag"])
+    if cached is not None:
+        return cached, headers
+    return None, headers
@@ -1,13 +1,100 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./tickettou.db"
+from .config import Settings, get_settings
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async driver used for each backend when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _sqlite_pragmas(settings: Settings):
+    """Connect hook applying the configured pragmas to each new SQLite connection"""
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+    ]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return set_pragmas
+
+
+def _engine_options(url: URL, settings: Settings) -> dict:
+    """create_engine keyword arguments shared by the sync and async engines"""
+    options = {"echo": settings.database_echo}
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+        return options
+
+    options["connect_args"] = {"check_same_thread": False}
+    if url.database in (None, "", ":memory:"):
+        # An in-memory database only exists inside its one connection
+        options["poolclass"] = StaticPool
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+def create_db_engine(settings: Settings) -> Engine:
+    """Build the engine for ``settings.database_url`` with pooling and SQLite tuning"""
+    url = make_url(settings.database_url)
+    engine = create_engine(url, **_engine_options(url, settings))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas(settings))
+    return engine
+
+
+def async_database_url(settings: Settings) -> URL:
+    """The async driver URL: ASYNC_DATABASE_URL, or DATABASE_URL with its async driver"""
+    if settings.async_database_url:
+        return make_url(settings.async_database_url)
+    url = make_url(settings.database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}', set ASYNC_DATABASE_URL")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_db_engine(settings: Settings) -> AsyncEngine:
+    """Async counterpart of create_db_engine, used by the request path"""
+    url = async_database_url(settings)
+    engine = create_async_engine(url, **_engine_options(url, settings))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas(settings))
+    return engine
+
+
+settings = get_settings()
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+engine = create_db_engine(settings)
+async_engine = create_async_db_engine(settings)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay readable after commit; async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -21,3 +108,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency that provides an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
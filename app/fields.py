@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets (``?fields=id,title,event_date,venue.name``) for list endpoints.
+
+``sparse_schema`` trims a response schema to the requested fields. Dotted
+paths reach into nested schemas (``venue.name``) and a bare relationship
+name (``venue``) keeps the nested schema whole. ``id`` is kept at every
+level so objects stay identifiable and cursors keep working; routes can
+name further fields they always need. The trimmed schema then drives the
+rest of the route: ``eager_load(..., columns_only=True)`` narrows the ORM
+query with ``load_only``, ``row_select`` selects just those columns on the
+fast path, and ``list_adapter`` serializes only them.
+"""
+from copy import copy
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Type, Union, get_origin
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from .loading import _nested_schema
+
+ALWAYS_INCLUDED = frozenset({"id"})
+
+
+@lru_cache(maxsize=512)
+def _trimmed(
+    schema: Type[BaseModel], paths: FrozenSet[str], required: FrozenSet[str], prefix: str = ""
+) -> Type[BaseModel]:
+    # Field name -> nested paths wanted under it, or None for the whole field
+    selected: Dict[str, Optional[Set[str]]] = {}
+    for path in paths:
+        name, _, rest = path.partition(".")
+        if name not in schema.model_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{prefix}{path}'")
+        if not rest:
+            selected[name] = None
+        elif selected.get(name, set()) is not None:
+            selected.setdefault(name, set()).add(rest)
+    for name in required | ALWAYS_INCLUDED:
+        if name in schema.model_fields:
+            selected.setdefault(name, None)
+
+    definitions = {}
+    # Declaration order, so sparse bodies list fields in the full schema's order
+    for name, field in schema.model_fields.items():
+        if name not in selected:
+            continue
+        annotation = field.annotation
+        if selected[name] is not None:
+            nested = _nested_schema(annotation)
+            if nested is None or get_origin(annotation) in (list, tuple, set):
+                raise HTTPException(status_code=400, detail=f"Field '{prefix}{name}' has no subfields")
+            trimmed = _trimmed(nested, frozenset(selected[name]), frozenset(), f"{prefix}{name}.")
+            annotation = Optional[trimmed] if get_origin(annotation) is Union else trimmed
+        # A copy: create_model writes the new annotation onto the FieldInfo
+        definitions[name] = (annotation, copy(field))
+    return create_model(
+        f"{schema.__name__}Fields", __config__=ConfigDict(from_attributes=True), **definitions
+    )
+
+
+def sparse_schema(schema: Type[BaseModel], fields: Optional[str], *required: str) -> Type[BaseModel]:
+    """``schema`` trimmed to a comma-separated ``fields`` parameter; as-is when empty"""
+    paths = frozenset(path.strip() for path in (fields or "").split(",") if path.strip())
+    if not paths:
+        return schema
+    return _trimmed(schema, paths, frozenset(required))
+
+
+@lru_cache(maxsize=512)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """A (cached) TypeAdapter serializing a list of ``schema``"""
+    return TypeAdapter(List[schema])
@@ -0,0 +1,87 @@
+"""
+Gate index: confirmation code -> ticket status for events at the doors.
+
+Ahead of doors-open, ``POST /events/{id}/gate`` loads every ticket of the
+event into an in-process hash map with one indexed SELECT, after which
+``GET /tickets/code/{code}/status`` answers scans from memory without a
+database round trip. Codes of events that are not loaded fall through to a
+single indexed query.
+
+The index only serves lookups. Redeeming always goes through the database
+as a compare-and-set ``UPDATE ... WHERE status = 'confirmed'`` (see
+``app/services/redemption.py``), so no ticket is admitted twice however
+many scanners or worker processes race for it. Purchases, cancellations,
+redemptions and deletes made through this process update its index after
+they commit; another worker's index may briefly show a stale status, which
+redeeming then rejects.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class GateEntry(NamedTuple):
+    ticket_id: int
+    event_id: int
+    status: str
+
+
+class GateIndex:
+    """Confirmation codes of the loaded events, each with its ticket id and status"""
+
+    def __init__(self):
+        self._codes: Dict[str, GateEntry] = {}
+        self._events: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def loaded_events(self) -> List[int]:
+        return list(self._events)
+
+    def load(self, event_id: int, rows: Iterable[Tuple[str, int, str]]) -> int:
+        """(Re)load an event from ``(code, ticket_id, status)`` rows; returns the count"""
+        self.unload(event_id)
+        codes = set()
+        for code, ticket_id, status in rows:
+            self._codes[code] = GateEntry(ticket_id, event_id, status)
+            codes.add(code)
+        self._events[event_id] = codes
+        return len(codes)
+
+    def unload(self, *event_ids: int) -> None:
+        for event_id in event_ids:
+            for code in self._events.pop(event_id, ()):
+                self._codes.pop(code, None)
+
+    def lookup(self, code: str) -> Optional[GateEntry]:
+        """The entry for ``code``, or None when its event is not loaded"""
+        entry = self._codes.get(code)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def add(self, code: str, ticket_id: int, event_id: int, status: str) -> None:
+        """Track a ticket bought after its event was loaded"""
+        codes = self._events.get(event_id)
+        if codes is not None:
+            codes.add(code)
+            self._codes[code] = GateEntry(ticket_id, event_id, status)
+
+    def set_status(self, code: str, status: str) -> None:
+        entry = self._codes.get(code)
+        if entry is not None:
+            self._codes[code] = entry._replace(status=status)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "events": sorted(self._events),
+            "codes": len(self._codes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+gate_index = GateIndex()
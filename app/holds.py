@@ -0,0 +1,73 @@
+"""
+Hold expiry sweeper.
+
+Every ``HOLD_SWEEP_SECONDS`` each worker process releases the holds that
+have expired, in batches of ``SWEEP_BATCH`` until none are left (see
+``app/services/holds.py``). Each sweep reads only expired rows through the
+``expires_at`` index, so it costs the same whether a hundred or a hundred
+thousand holds are live. Workers may sweep at the same time; every expired
+hold's seats are returned by exactly one of them.
+
+Until a sweep picks it up, an expired hold can no longer be confirmed but
+its seats still count as held.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from .database import AsyncSessionLocal
+from .services import release_expired_holds
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH = 500
+
+
+class HoldSweeper:
+    """Releases expired holds through ``sessions``, an async session factory"""
+
+    def __init__(self, sessions=AsyncSessionLocal, batch: int = SWEEP_BATCH):
+        self.sessions = sessions
+        self.batch = batch
+        self.sweeps = 0
+        self.released = 0
+        self.failures = 0
+        self.last_sweep: Optional[datetime] = None
+
+    async def sweep(self) -> int:
+        """Release every hold expired by now; returns how many"""
+        now = datetime.now(timezone.utc)
+        released = 0
+        while True:
+            async with self.sessions() as db:
+                count = await db.run_sync(release_expired_holds, now, self.batch)
+                await db.commit()
+            released += count
+            if count < self.batch:
+                break
+        self.sweeps += 1
+        self.released += released
+        self.last_sweep = now
+        return released
+
+    async def run(self, interval: float) -> None:
+        """Sweep every ``interval`` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception:
+                self.failures += 1
+                logger.exception("Hold sweep failed")
+
+    def stats(self) -> dict:
+        return {
+            "sweeps": self.sweeps,
+            "released": self.released,
+            "failures": self.failures,
+            "last_sweep": self.last_sweep,
+        }
+
+
+hold_sweeper = HoldSweeper()
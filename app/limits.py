@@ -0,0 +1,227 @@
+"""
+Rate limiting and load shedding for purchases.
+
+Two guards sit in front of ``POST /tickets`` and ``POST /tickets/batch``;
+browse endpoints pass through untouched.
+
+Token buckets, per client IP and per event. Every key holds up to
+``burst`` tokens, refilled at ``rate`` per second; a purchase spends one
+token of its client's bucket and one per ticket of each event's bucket.
+An empty bucket answers ``429`` with ``Retry-After`` set to when enough
+tokens will be back. The buckets live in a ``RateLimitStore``:
+``MemoryRateLimitStore`` keeps them per process, ``RedisRateLimitStore``
+shares them between workers with an atomic server-side script.
+
+Adaptive concurrency. ``ConcurrencyLimiter`` caps how many purchases run
+at once. Every SQL statement's duration (timed by ``app/metrics.py``)
+feeds a moving average; while it stays under ``DB_LATENCY_THRESHOLD_MS``
+the cap grows by one per completed purchase up to its maximum, and while
+it is over, each completion cuts the cap by a quarter down to its minimum.
+Purchases beyond the cap get ``503`` with ``Retry-After`` straight away,
+so a saturated database sheds purchase load instead of queueing it behind
+everyone's page views.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol, Tuple
+
+from fastapi import HTTPException, Request
+
+from .config import Settings, get_settings
+
+
+class RateLimitStore(Protocol):
+    """Where token buckets live"""
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        """Spend ``cost`` tokens: 0 when allowed, else seconds until they would be there"""
+        ...
+
+
+class MemoryRateLimitStore:
+    """Per-process token buckets, at most ``max_keys`` of them (least recently used go first)"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        tokens, stamp = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill and spend in one step on the server, against the server's clock
+TAKE_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or burst
+local stamp = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - stamp) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker through Redis"""
+
+    def __init__(self, client, prefix: str = "tickettou:rate:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        wait = await self.client.eval(TAKE_SCRIPT, 1, self.prefix + key, rate, burst, cost)
+        return float(wait)
+
+
+class DatabaseLatency:
+    """Exponentially weighted moving average of SQL statement durations"""
+
+    def __init__(self, weight: float = 0.1):
+        self.weight = weight
+        self.average_ms: Optional[float] = None
+        self.statements = 0
+
+    def observe(self, milliseconds: float) -> None:
+        self.statements += 1
+        if self.average_ms is None:
+            self.average_ms = milliseconds
+        else:
+            self.average_ms += self.weight * (milliseconds - self.average_ms)
+
+
+class ConcurrencyLimiter:
+    """A cap on concurrent purchases that follows database latency (AIMD)"""
+
+    def __init__(self, latency: DatabaseLatency, threshold_ms: float, min_limit: int, max_limit: int):
+        self.latency = latency
+        self.threshold_ms = threshold_ms
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.in_flight = 0
+        self.shed = 0
+
+    @property
+    def overloaded(self) -> bool:
+        return self.latency.average_ms is not None and self.latency.average_ms > self.threshold_ms
+
+    def try_acquire(self) -> bool:
+        if self.max_limit and self.in_flight >= self.limit:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if not self.max_limit:
+            return
+        if self.overloaded:
+            self.limit = max(self.min_limit, self.limit - max(1, self.limit // 4))
+        elif self.limit < self.max_limit:
+            self.limit += 1
+
+
+class PurchaseGuard:
+    """Both purchase guards, configured from settings"""
+
+    def __init__(self, store: Optional[RateLimitStore], settings: Settings, latency: DatabaseLatency):
+        self.store = store
+        self.settings = settings
+        self.concurrency = ConcurrencyLimiter(
+            latency,
+            settings.db_latency_threshold_ms,
+            settings.purchase_concurrency_min,
+            settings.purchase_concurrency_max,
+        )
+        self.allowed = 0
+        self.limited: Dict[str, int] = {"ip": 0, "event": 0}
+
+    async def check(self, request: Request, tickets_per_event: Dict[int, int]) -> None:
+        """Spend the client's and the events' tokens, or raise 429"""
+        if self.store is None:
+            return
+        settings = self.settings
+        client = request.client.host if request.client else "unknown"
+        spends = [("ip", f"ip:{client}", settings.purchase_rate_per_ip, settings.purchase_burst_per_ip, 1)]
+        spends += [
+            ("event", f"event:{event_id}", settings.purchase_rate_per_event, settings.purchase_burst_per_event, count)
+            for event_id, count in sorted(tickets_per_event.items())
+        ]
+        for scope, key, rate, burst, cost in spends:
+            wait = await self.store.take(key, rate, burst, cost)
+            if wait:
+                self.limited[scope] += 1
+                detail = "Too many purchase attempts" if scope == "ip" else "Too many purchases for this event"
+                raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(math.ceil(wait))})
+        self.allowed += 1
+
+    async def slot(self):
+        """Dependency holding a concurrency slot for the length of a purchase, or raising 503"""
+        if not self.concurrency.try_acquire():
+            raise HTTPException(
+                status_code=503,
+                detail="Ticket sales are busy, please retry",
+                headers={"Retry-After": str(self.settings.purchase_retry_after_seconds)},
+            )
+        try:
+            yield
+        finally:
+            self.concurrency.release()
+
+    def stats(self) -> dict:
+        concurrency = self.concurrency
+        return {
+            "backend": type(self.store).__name__ if self.store is not None else None,
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+            "concurrency_limit": concurrency.limit,
+            "in_flight": concurrency.in_flight,
+            "shed": concurrency.shed,
+            "db_latency_ms": round(concurrency.latency.average_ms, 3) if concurrency.latency.average_ms else None,
+            "db_latency_threshold_ms": concurrency.threshold_ms,
+        }
+
+
+def create_rate_limit_store(settings: Settings) -> Optional[RateLimitStore]:
+    """The store named by RATE_LIMIT_BACKEND: memory, redis or none"""
+    if settings.rate_limit_backend == "memory":
+        return MemoryRateLimitStore()
+    if settings.rate_limit_backend == "redis":
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+        return RedisRateLimitStore(redis.from_url(settings.rate_limit_url or settings.cache_url))
+    if settings.rate_limit_backend == "none":
+        return None
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {settings.rate_limit_backend!r}")
+
+
+db_latency = DatabaseLatency()
+settings = get_settings()
+purchase_guard = PurchaseGuard(create_rate_limit_store(settings), settings, db_latency)
@@ -0,0 +1,61 @@
+"""
+Query shaping from response schemas.
+
+A response schema declares the relationships it needs simply by having a
+field named after one (``EventWithVenue.venue``, ``VenueWithEvents.events``).
+``eager_load(Model, Schema)`` turns those fields into loader options:
+``joinedload`` for many-to-one relationships, which add a join to the same
+SELECT, and ``selectinload`` for collections, which cost one extra
+``IN (...)`` query however many parents were loaded. Nested schemas are
+followed, so the statement count of a route never depends on its row count.
+Async sessions cannot lazy-load, so any relationship a schema reads must be
+loaded this way.
+"""
+from functools import lru_cache
+from typing import Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+
+def _nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    """The model inside annotations like ``VenueSummary``, ``List[X]`` or ``Optional[X]``"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (list, tuple, set, Union):
+        for argument in get_args(annotation):
+            schema = _nested_schema(argument)
+            if schema is not None:
+                return schema
+    return None
+
+
+@lru_cache(maxsize=1024)
+def eager_load(entity, schema: Type[BaseModel], columns_only: bool = False) -> Tuple:
+    """Loader options covering every relationship ``schema`` serializes
+
+    With ``columns_only`` each level is also narrowed with ``load_only`` to
+    the columns the schema reads (see ``app/fields.py``).
+    """
+    mapper = inspect(entity)
+    relationships = mapper.relationships
+    options = []
+    columns = []
+    for name, field in schema.model_fields.items():
+        if name in mapper.column_attrs:
+            columns.append(getattr(entity, name))
+            continue
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        attribute = getattr(entity, name)
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        nested = _nested_schema(field.annotation)
+        nested_options = eager_load(relationship.mapper.class_, nested, columns_only) if nested else ()
+        if nested_options:
+            loader = loader.options(*nested_options)
+        options.append(loader)
+    if columns_only and columns:
+        options.append(load_only(*columns))
+    return tuple(options)
@@ -1,18 +1,43 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import configure_mappers
+
+from .config import get_settings
+from .database import async_engine
+from .holds import hold_sweeper
+from .metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import venues_router, events_router, tickets_router, stats_router, waiting_room_router, holds_router
+from .schema import prepare_schema
+
 
-from .database import engine, Base
-from .routers import venues_router, events_router, tickets_router, stats_router
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the schema and sweep expired holds while serving; release pooled async connections on shutdown"""
+    settings = get_settings()
+    await prepare_schema(settings.schema_on_startup, async_engine)
+    # Set up the ORM mappers before serving rather than inside the first request
+    configure_mappers()
+    interval = settings.hold_sweep_seconds
+    sweeper = asyncio.create_task(hold_sweeper.run(interval)) if interval > 0 else None
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+    await async_engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="TicketToU API",
     description="Event ticketing API for managing venues, events, and ticket sales",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend
@@ -22,17 +47,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Outermost, so it measures everything including CORS preflights
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(venues_router)
 app.include_router(events_router)
 app.include_router(tickets_router)
 app.include_router(stats_router)
+app.include_router(waiting_room_router)
+app.include_router(holds_router)
 
 
 @app.get("/", tags=["root"])
-def root():
+async def root():
     """API root endpoint"""
     return {
         "message": "Welcome to TicketToU API",
@@ -42,6 +73,12 @@ def root():
 
 
 @app.get("/health", tags=["health"])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", tags=["health"])
+async def get_metrics():
+    """Request and database metrics in Prometheus text format"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
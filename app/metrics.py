@@ -0,0 +1,260 @@
+"""
+Request and database metrics in Prometheus text format.
+
+``MetricsMiddleware`` wraps the whole application and records, per method
+and route template (``/events/{event_id}``, never the raw path, so label
+sets stay bounded):
+
+- ``http_requests_total`` by status code
+- ``http_request_duration_seconds`` up to the last body byte sent
+- ``http_response_size_bytes``
+- ``http_requests_in_flight``
+
+Engine hooks time every SQL statement and add it to the running request's
+totals, carried in a context variable, which become the
+``http_request_db_statements`` and ``http_request_db_seconds`` histograms;
+their ``_sum`` series show which routes spend the database's time. A
+statement slower than ``SLOW_QUERY_MS`` is logged with its route and
+counted in ``db_slow_statements_total``. The same timings feed the
+purchase load shedder's latency average (``app/limits.py``).
+
+``GET /metrics`` renders everything. Metrics are kept per process; with
+several workers, scrape each of them.
+"""
+import logging
+import re
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+from .limits import db_latency
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "unmatched"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """A value per label set that only goes up"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in sorted(self.values.items()):
+            yield self.name, dict(zip(self.labels, labels)), value
+
+
+class Gauge(Counter):
+    """A value per label set that goes up and down"""
+
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    """Observations per label set, counted into cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> (count per bucket, the last one past every bound; sum)
+        self.series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, (counts, total) in sorted(self.series.items()):
+            named = dict(zip(self.labels, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**named, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", named, total[0]
+            yield f"{self.name}_count", named, cumulative
+
+
+class Metrics:
+    """Every metric the application exports"""
+
+    def __init__(self):
+        route = ("method", "route")
+        self.requests = Counter("http_requests_total", "HTTP requests handled", route + ("status",))
+        self.in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled")
+        self.duration = Histogram(
+            "http_request_duration_seconds", "Time to handle a request, up to its last byte", route, DURATION_BUCKETS
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size", route, SIZE_BUCKETS
+        )
+        self.db_statements = Histogram(
+            "http_request_db_statements", "SQL statements run per request", route, STATEMENT_BUCKETS
+        )
+        self.db_seconds = Histogram(
+            "http_request_db_seconds", "Time spent in SQL statements per request", route, DURATION_BUCKETS
+        )
+        self.slow_statements = Counter(
+            "db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS", route
+        )
+        self.all = [
+            self.requests, self.in_flight, self.duration, self.response_size,
+            self.db_statements, self.db_seconds, self.slow_statements,
+        ]
+
+    def render(self) -> str:
+        """The Prometheus text exposition of every metric"""
+        lines = []
+        for metric in self.all:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+                    name = f"{name}{{{pairs}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def route_label(scope: dict) -> str:
+    """The path template of the route that handled the request"""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class RequestStats:
+    """SQL statements run on behalf of one request"""
+
+    __slots__ = ("scope", "statements", "seconds", "slow")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+        self.slow = 0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed and sized to the end"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status = 500
+        size = 0
+
+        async def send_measured(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_measured)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight.dec()
+            _current_request.reset(token)
+            labels = (scope["method"], route_label(scope))
+            metrics.requests.inc(labels + (str(status),))
+            metrics.duration.observe(labels, elapsed)
+            metrics.response_size.observe(labels, size)
+            metrics.db_statements.observe(labels, stats.statements)
+            metrics.db_seconds.observe(labels, stats.seconds)
+            if stats.slow:
+                metrics.slow_statements.inc(labels, stats.slow)
+
+
+def _one_line(statement: str, limit: int = 500) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+slow_query_seconds = get_settings().slow_query_ms / 1000
+
+
+# Every engine, including the sync engine under each AsyncEngine
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    db_latency.observe(elapsed * 1000)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+    if elapsed >= slow_query_seconds:
+        if stats is not None:
+            stats.slow += 1
+            where = f"in {stats.scope['method']} {route_label(stats.scope)}"
+        else:
+            where = "outside a request"
+        logger.warning("Slow SQL statement (%.1f ms) %s: %s", elapsed * 1000, where, _one_line(statement))
+
+
+@event.listens_for(Engine, "handle_error")
+def _statement_failed(context):
+    if context.connection is not None and context.connection.info.get("statement_started"):
+        context.connection.info["statement_started"].pop()
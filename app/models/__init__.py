@@ -1,5 +1,13 @@
 from .venue import Venue
 from .event import Event
 from .ticket import Ticket
+from .ticket_stats import TicketStats
+from .row_count import RowCount
+from .event_inventory import EventInventory
+from .ticket_sales import TicketSales
+from .sales_bucket import SalesBucket
+from .table_revision import TableRevision
+from .hold import Hold
+from . import search_index  # noqa: F401  (registers the FTS5 DDL hooks)
 
-__all__ = ["Venue", "Event", "Ticket"]
+__all__ = ["Venue", "Event", "Ticket", "TicketStats", "RowCount", "EventInventory", "TicketSales", "SalesBucket", "TableRevision", "Hold"]
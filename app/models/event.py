@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Time, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, Time, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -6,12 +6,16 @@ from ..database import Base
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Upcoming-events listing: WHERE event_date >= ? ORDER BY event_date, id
+        Index("ix_events_event_date_id", "event_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    venue_id = Column(Integer, ForeignKey("venues.id"), nullable=False)
+    venue_id = Column(Integer, ForeignKey("venues.id"), nullable=False, index=True)
     title = Column(String(150), nullable=False)
     description = Column(Text, nullable=True)
-    category = Column(String(50), nullable=True)
+    category = Column(String(50), nullable=True, index=True)
     event_date = Column(Date, nullable=False)
     event_time = Column(Time, nullable=False)
     image_url = Column(String(500), nullable=True)
@@ -20,6 +24,12 @@ class Event(Base):
     # Relationships
     venue = relationship("Venue", back_populates="events")
     tickets = relationship("Ticket", back_populates="event", cascade="all, delete-orphan")
+    inventory = relationship("EventInventory", back_populates="event", uselist=False, cascade="all, delete-orphan")
+    sales = relationship("TicketSales", cascade="all, delete-orphan")
+    sales_buckets = relationship("SalesBucket", cascade="all, delete-orphan")
+    holds = relationship("Hold", back_populates="event", cascade="all, delete-orphan")
+    # Read-only alias of the inventory for response schemas embedding availability
+    availability = relationship("EventInventory", uselist=False, viewonly=True)
 
     def __repr__(self):
         return f"<Event(id={self.id}, title='{self.title}', date='{self.event_date}')>"
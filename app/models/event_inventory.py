@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, ForeignKey, case
+from sqlalchemy.orm import column_property, relationship
+from ..database import Base
+
+# An event is "selling fast" once no more than this share of its seats is left
+SELLING_FAST_PERCENT = 10
+
+
+def availability_status(remaining, capacity):
+    """SQL expression: sold_out, selling_fast or available"""
+    return case(
+        (remaining <= 0, "sold_out"),
+        (remaining * 100 <= capacity * SELLING_FAST_PERCENT, "selling_fast"),
+        else_="available",
+    )
+
+
+class EventInventory(Base):
+    """Per-event seat counters; purchases and holds take seats with a conditional UPDATE
+
+    ``remaining`` is ``capacity - sold - held``.
+    """
+    __tablename__ = "event_inventory"
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    sold = Column(Integer, nullable=False, default=0)
+    held = Column(Integer, nullable=False, default=0, server_default="0")  # by unexpired holds
+    remaining = Column(Integer, nullable=False)
+    # Computed in SQL, so column selects and ORM loads agree
+    status = column_property(availability_status(remaining, capacity))
+
+    # Relationships
+    event = relationship("Event", back_populates="inventory")
+
+    def __repr__(self):
+        return f"<EventInventory(event_id={self.event_id}, sold={self.sold}, held={self.held}, remaining={self.remaining})>"
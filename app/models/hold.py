@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from ..codes import generate_confirmation_code
+from ..database import Base
+
+
+class Hold(Base):
+    """Seats set aside for a checkout until ``expires_at``; deleted once confirmed, released or expired"""
+    __tablename__ = "holds"
+
+    # Time-ordered and unguessable, like confirmation codes
+    id = Column(String(20), primary_key=True, default=generate_confirmation_code)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    # The sweeper reads expired holds oldest first through this index
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    # Relationships
+    event = relationship("Event", back_populates="holds")
+
+    def __repr__(self):
+        return f"<Hold(id='{self.id}', event_id={self.event_id}, quantity={self.quantity})>"
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String
+from ..database import Base
+
+
+class RowCount(Base):
+    """Materialized row counts of the venues and events tables, read by the dashboard"""
+    __tablename__ = "row_counts"
+
+    table_name = Column(String(50), primary_key=True)
+    row_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RowCount(table_name='{self.table_name}', rows={self.row_count})>"
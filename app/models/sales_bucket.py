@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index
+from ..database import Base
+
+
+class SalesBucket(Base):
+    """Ticket sales per event per hour and per day (UTC), by purchase time"""
+    __tablename__ = "sales_buckets"
+    __table_args__ = (
+        # One event's series: WHERE event_id = ? AND grain = ? AND bucket_start BETWEEN ...
+        Index("ix_sales_buckets_event_grain_start", "event_id", "grain", "bucket_start"),
+    )
+
+    grain = Column(String(4), primary_key=True)  # hour, day
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    sold = Column(Integer, nullable=False, default=0)  # live tickets: confirmed or used
+    cancelled = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)  # of live tickets
+
+    def __repr__(self):
+        return f"<SalesBucket(grain='{self.grain}', start='{self.bucket_start}', event_id={self.event_id})>"
@@ -0,0 +1,59 @@
+"""
+SQLite FTS5 indexes over event and venue text.
+
+Each index is an external-content FTS5 table that stores only the inverted
+index and reads the text back from its source table. Triggers on the source
+table keep it in sync with every insert, update and delete, whether the write
+comes from the ORM, Core or raw SQL. Other backends skip the index and search
+falls back to ILIKE (see ``app.services.search``).
+"""
+from sqlalchemy import event
+
+from ..database import Base
+
+SEARCH_INDEXES = {
+    "events_fts": ("events", ("title", "description")),
+    "venues_fts": ("venues", ("name",)),
+}
+
+
+def search_index_ddl(index: str) -> list:
+    """CREATE statements for an FTS5 index and its sync triggers"""
+    table, columns = SEARCH_INDEXES[index]
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    insert_new = f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_values});"
+    delete_old = (
+        f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def search_index_drop_ddl(index: str) -> list:
+    """DROP statements undoing search_index_ddl"""
+    return [f"DROP TRIGGER IF EXISTS {index}_{suffix}" for suffix in ("ai", "ad", "au")] + [
+        f"DROP TABLE IF EXISTS {index}"
+    ]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_indexes(target, connection, **kw):
+    """Create missing FTS5 indexes after create_all, backfilling them from existing rows"""
+    if connection.dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES:
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)
+        ).first()
+        for statement in search_index_ddl(index):
+            connection.exec_driver_sql(statement)
+        if not exists:
+            connection.exec_driver_sql(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from ..database import Base
+
+
+class TableRevision(Base):
+    """Per-table write counter; read routes derive their ETags from it"""
+    __tablename__ = "table_revisions"
+
+    table_name = Column(String(50), primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<TableRevision(table_name='{self.table_name}', revision={self.revision})>"
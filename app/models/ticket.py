@@ -1,17 +1,16 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from ..codes import generate_confirmation_code
 from ..database import Base
-import secrets
-
-
-def generate_confirmation_code():
-    """Generate a unique confirmation code"""
-    return secrets.token_hex(8).upper()
 
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Per-event ticket lookups, optionally narrowed by status
+        Index("ix_tickets_event_id_status", "event_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
@@ -20,7 +19,7 @@ class Ticket(Base):
     ticket_type = Column(String(50), default="Standard")  # Standard, VIP, Premium
     price = Column(Numeric(10, 2), nullable=False)
     confirmation_code = Column(String(20), unique=True, nullable=False, default=generate_confirmation_code)
-    purchase_date = Column(DateTime(timezone=True), server_default=func.now())
+    purchase_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     status = Column(String(20), default="confirmed")  # confirmed, cancelled, used
 
     # Relationships
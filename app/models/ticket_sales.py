@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey
+from ..database import Base
+
+
+class TicketSales(Base):
+    """Per-event, per-ticket-type sales rollup, updated with every purchase and cancellation"""
+    __tablename__ = "ticket_sales"
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    ticket_type = Column(String(50), primary_key=True)
+    sold = Column(Integer, nullable=False, default=0)  # live tickets: confirmed or used
+    cancelled = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)  # of live tickets
+
+    def __repr__(self):
+        return f"<TicketSales(event_id={self.event_id}, ticket_type='{self.ticket_type}', sold={self.sold})>"
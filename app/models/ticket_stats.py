@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Numeric
+from ..database import Base
+
+
+class TicketStats(Base):
+    """Materialized ticket totals, one row per ticket status"""
+    __tablename__ = "ticket_stats"
+
+    status = Column(String(20), primary_key=True)
+    ticket_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TicketStats(status='{self.status}', tickets={self.ticket_count})>"
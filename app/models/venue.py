@@ -10,7 +10,7 @@ class Venue(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     address = Column(String(255), nullable=False)
-    city = Column(String(100), nullable=False)
+    city = Column(String(100), nullable=False, index=True)
     capacity = Column(Integer, nullable=False)
     image_url = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -2,5 +2,7 @@ from .venues import router as venues_router
 from .events import router as events_router
 from .tickets import router as tickets_router
 from .stats import router as stats_router
+from .waiting_room import router as waiting_room_router
+from .holds import router as holds_router
 
-__all__ = ["venues_router", "events_router", "tickets_router", "stats_router"]
+__all__ = ["venues_router", "events_router", "tickets_router", "stats_router", "waiting_room_router", "holds_router"]
@@ -1,93 +1,252 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
-from ..models import Event, Venue
-from ..schemas import EventCreate, EventUpdate, EventResponse, EventWithVenue
+from ..cache import response_cache, to_json
+from ..conditional import conditional_get
+from ..config import get_settings
+from ..database import get_async_db
+from ..export import export_response
+from ..fast_json import row_select, rows_json
+from ..fields import sparse_schema, list_adapter
+from ..gate import gate_index
+from ..loading import eager_load
+from ..pagination import paginate, cursor_headers
+from ..models import Event, Venue, Ticket, EventInventory
+from ..schemas import (
+    EventCreate,
+    EventUpdate,
+    EventResponse,
+    EventWithVenue,
+    EventWithAvailability,
+    EventAvailability,
+    EventSearchResult,
+)
+from ..services import (
+    record_tickets_removed,
+    record_row_counts,
+    event_search_filter,
+    search_events,
+    ensure_inventory,
+    resize_inventory,
+    get_event_availability,
+    bump_revisions,
+)
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+EVENT_DETAIL = TypeAdapter(EventWithVenue)
+
 
-@router.get("", response_model=List[EventWithVenue])
-def get_all_events(
-    skip: int = 0, 
+@router.get("", response_model=List[EventWithAvailability])
+async def get_all_events(
+    request: Request,
+    response: Response,
+    skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
     category: Optional[str] = Query(None, description="Filter by category"),
     venue_id: Optional[int] = Query(None, description="Filter by venue"),
     search: Optional[str] = Query(None, description="Search in title and description"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Fields to return, e.g. id,title,event_date,venue.name"),
+    include: Optional[str] = Query(
+        None, pattern="^availability$", description="availability: embed seats left and a sold-out / selling-fast status"
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all events with optional filtering and search"""
-    query = db.query(Event).options(joinedload(Event.venue))
-    
+    live = include == "availability"
+    # venue_id always comes along: the page is tagged with its venues
+    if live:
+        schema = sparse_schema(EventWithAvailability, fields, "venue_id", "availability")
+    else:
+        schema = sparse_schema(EventWithVenue, fields, "venue_id")
+        early, validators = await conditional_get(request, db, "events", "venues")
+        if early is not None:
+            return early
+
+    fast = get_settings().fast_json
+    if fast:
+        query = row_select(Event, schema)
+    else:
+        query = select(Event).options(*eager_load(Event, schema, columns_only=True))
+
     if category:
-        query = query.filter(Event.category == category)
+        query = query.where(Event.category == category)
     if venue_id:
-        query = query.filter(Event.venue_id == venue_id)
+        query = query.where(Event.venue_id == venue_id)
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Event.title.ilike(search_term)) | (Event.description.ilike(search_term))
-        )
-    
-    events = query.offset(skip).limit(limit).all()
-    return events
+        query = query.where(event_search_filter(db, search))
+
+    events = await paginate(db, query, [Event.id], response, limit, skip=skip, cursor=cursor)
+    # Pages embed their venues, so venue edits drop them too
+    tags = ["events", *{f"venue:{e.venue_id}" for e in events}]
+    body = rows_json(Event, schema, events) if fast else to_json(list_adapter(schema), events)
+    if live:
+        # Availability moves with every purchase, which bumps no revision,
+        # so these pages are neither cached nor given validators
+        return Response(content=body, media_type="application/json", headers=cursor_headers(response))
+    return await response_cache.put(request, body, tags, {**validators, **cursor_headers(response)})
+
+
+@router.get("/search", response_model=List[EventSearchResult])
+async def search_all_events(
+    q: str = Query(..., min_length=1, description="Words to search for (prefix matched)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over event titles and descriptions, best matches first"""
+    return await db.run_sync(search_events, q, limit)
+
+
+@router.get("/export")
+async def export_events(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    venue_id: Optional[int] = Query(None, description="Filter by venue"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    date_from: Optional[date] = Query(None, description="Events on or after this date"),
+    date_to: Optional[date] = Query(None, description="Events on or before this date"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream every matching event as NDJSON or CSV"""
+    query = select(
+        Event.id,
+        Event.venue_id,
+        Event.title,
+        Event.description,
+        Event.category,
+        Event.event_date,
+        Event.event_time,
+        Event.image_url,
+        Event.created_at,
+    ).order_by(Event.id)
+
+    if venue_id:
+        query = query.where(Event.venue_id == venue_id)
+    if category:
+        query = query.where(Event.category == category)
+    if date_from:
+        query = query.where(Event.event_date >= date_from)
+    if date_to:
+        query = query.where(Event.event_date <= date_to)
+
+    return export_response(db, query, export_format, "events")
 
 
 @router.get("/{event_id}", response_model=EventWithVenue)
-def get_event(event_id: int, db: Session = Depends(get_db)):
+async def get_event(event_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get a single event by ID with venue info"""
-    event = db.query(Event).options(joinedload(Event.venue)).filter(Event.id == event_id).first()
+    early, validators = await conditional_get(
+        request, db, "events", "venues", exists=select(Event.id).where(Event.id == event_id)
+    )
+    if early is not None:
+        return early
+
+    event = await db.get(Event, event_id, options=eager_load(Event, EventWithVenue))
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    tags = [f"event:{event.id}", f"venue:{event.venue_id}"]
+    return await response_cache.put(request, to_json(EVENT_DETAIL, event), tags, validators)
+
+
+@router.get("/{event_id}/availability", response_model=EventAvailability)
+async def get_availability(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Seats left and sales per ticket type, from the sales rollup"""
+    availability = await db.run_sync(get_event_availability, event_id)
+    if availability is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return availability
 
 
 @router.post("", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
-def create_event(event: EventCreate, db: Session = Depends(get_db)):
+async def create_event(event: EventCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new event"""
     # Verify venue exists
-    venue = db.query(Venue).filter(Venue.id == event.venue_id).first()
+    venue = await db.get(Venue, event.venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    
+
     db_event = Event(**event.model_dump())
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    await db.flush()
+    # Seat counters from the start, so listings can show availability
+    await db.run_sync(ensure_inventory, db_event.id)
+    await db.run_sync(record_row_counts, events=1)
+    await db.run_sync(bump_revisions, "events")
+    await db.commit()
+    await response_cache.invalidate("events", f"venue:{db_event.venue_id}")
+    await db.refresh(db_event)
     return db_event
 
 
 @router.put("/{event_id}", response_model=EventResponse)
-def update_event(event_id: int, event: EventUpdate, db: Session = Depends(get_db)):
+async def update_event(event_id: int, event: EventUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update an event"""
-    db_event = db.query(Event).filter(Event.id == event_id).first()
+    db_event = await db.get(Event, event_id)
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
-    
+    old_venue_id = db_event.venue_id
+
     # If updating venue, verify it exists
     if event.venue_id:
-        venue = db.query(Venue).filter(Venue.id == event.venue_id).first()
+        venue = await db.get(Venue, event.venue_id)
         if not venue:
             raise HTTPException(status_code=404, detail="Venue not found")
-    
+        # Seats follow the new venue's capacity
+        if not await db.run_sync(resize_inventory, venue.capacity, EventInventory.event_id == event_id):
+            raise HTTPException(
+                status_code=409, detail="The new venue's capacity is below the seats already sold or held for this event"
+            )
+
     update_data = event.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_event, key, value)
-    
-    db.commit()
-    db.refresh(db_event)
+
+    await db.run_sync(bump_revisions, "events")
+    await db.commit()
+    await response_cache.invalidate(
+        "events", f"event:{event_id}", f"venue:{old_venue_id}", f"venue:{db_event.venue_id}"
+    )
+    await db.refresh(db_event)
     return db_event
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(event_id: int, db: Session = Depends(get_db)):
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete an event"""
-    db_event = db.query(Event).filter(Event.id == event_id).first()
+    db_event = await db.get(Event, event_id)
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
-    
-    db.delete(db_event)
-    db.commit()
+
+    await db.run_sync(record_tickets_removed, Ticket.event_id == event_id)
+    await db.delete(db_event)
+    await db.run_sync(record_row_counts, events=-1)
+    await db.run_sync(bump_revisions, "events")
+    await db.commit()
+    await response_cache.invalidate("events", f"event:{event_id}", f"venue:{db_event.venue_id}")
+    gate_index.unload(event_id)
+    return None
+
+
+@router.post("/{event_id}/gate")
+async def load_event_gate(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Load the event's confirmation codes into the gate index ahead of doors-open"""
+    event = await db.get(Event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    rows = await db.execute(
+        select(Ticket.confirmation_code, Ticket.id, Ticket.status).where(Ticket.event_id == event_id)
+    )
+    return {"event_id": event_id, "tickets": gate_index.load(event_id, rows)}
+
+
+@router.delete("/{event_id}/gate", status_code=status.HTTP_204_NO_CONTENT)
+async def unload_event_gate(event_id: int):
+    """Drop the event from the gate index once doors have closed"""
+    gate_index.unload(event_id)
     return None
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from ..codes import is_mistyped
+from ..config import get_settings
+from ..database import get_async_db
+from ..gate import gate_index
+from ..limits import purchase_guard
+from ..models import Event, Hold
+from ..schemas import HoldCreate, HoldConfirm, HoldResponse, TicketResponse
+from ..services import (
+    create_hold,
+    claim_hold,
+    release_hold,
+    sell_held_seats,
+    insert_tickets,
+    record_ticket_purchase,
+    record_sales,
+    record_sales_buckets,
+)
+from ..waiting_room import waiting_room
+
+router = APIRouter(tags=["holds"])
+
+
+@router.post(
+    "/events/{event_id}/holds",
+    response_model=HoldResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(purchase_guard.slot)],
+)
+async def hold_seats_for_checkout(
+    event_id: int, hold: HoldCreate, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Set seats aside while the buyer checks out; they go back on sale unless confirmed in time"""
+    await purchase_guard.check(request, {event_id: hold.quantity})
+    await waiting_room.admit(request, [event_id])
+    settings = get_settings()
+    ttl = min(hold.ttl_seconds or settings.hold_ttl_seconds, settings.hold_max_ttl_seconds)
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+
+    db_hold = await db.run_sync(create_hold, event_id, hold.quantity, expires_at)
+    if db_hold is None:
+        if not await db.get(Event, event_id):
+            raise HTTPException(status_code=404, detail="Event not found")
+        raise HTTPException(status_code=409, detail="Not enough seats left")
+    await db.commit()
+    return db_hold
+
+
+@router.get("/holds/{hold_id}", response_model=HoldResponse)
+async def get_hold(hold_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get a hold that has not been confirmed or released yet"""
+    db_hold = None if is_mistyped(hold_id) else await db.get(Hold, hold_id)
+    if not db_hold:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return db_hold
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_hold(hold_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Give a hold's seats back before it expires"""
+    if is_mistyped(hold_id) or not await db.run_sync(release_hold, hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found")
+    await db.commit()
+    return None
+
+
+@router.post(
+    "/holds/{hold_id}/confirm",
+    response_model=List[TicketResponse],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(purchase_guard.slot)],
+)
+async def confirm_hold(hold_id: str, details: HoldConfirm, db: AsyncSession = Depends(get_async_db)):
+    """Buy the held seats, one ticket each; fails once the hold has expired"""
+    # Deleting the hold claims it, so a second confirmation or the sweeper finds nothing
+    claimed = None if is_mistyped(hold_id) else await db.run_sync(claim_hold, hold_id, datetime.now(timezone.utc))
+    if claimed is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    event_id, quantity = claimed
+
+    await db.run_sync(sell_held_seats, event_id, quantity)
+    tickets = await db.run_sync(
+        insert_tickets, [{**details.model_dump(), "event_id": event_id} for _ in range(quantity)]
+    )
+    await db.run_sync(record_ticket_purchase, details.price * quantity, quantity)
+    await db.run_sync(record_sales, tickets)
+    await db.run_sync(record_sales_buckets, tickets)
+    await db.commit()
+    for db_ticket in tickets:
+        gate_index.add(db_ticket.confirmation_code, db_ticket.id, db_ticket.event_id, db_ticket.status)
+    return tickets
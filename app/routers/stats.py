@@ -1,54 +1,47 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional
 
-from ..database import get_db
-from ..models import Venue, Event, Ticket
+from ..cache import response_cache
+from ..database import get_async_db
+from ..gate import gate_index
+from ..holds import hold_sweeper
+from ..limits import purchase_guard
+from ..waiting_room import waiting_room
+from ..models import Event, Ticket
+from ..schemas import SalesTimeseriesPoint
+from ..services import get_dashboard_totals, get_sales_timeseries
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+# Longest series a single request may ask for
+MAX_BUCKETS = 2000
+BUCKET_DAYS = {"hour": 1 / 24, "day": 1, "week": 7}
+
 
 @router.get("/dashboard")
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
     """Get dashboard statistics for admin panel"""
     
-    # Counts
-    total_venues = db.query(func.count(Venue.id)).scalar() or 0
-    total_events = db.query(func.count(Event.id)).scalar() or 0
-    total_tickets = db.query(func.count(Ticket.id)).scalar() or 0
-    
-    # Revenue (confirmed tickets only)
-    total_revenue = db.query(func.sum(Ticket.price)).filter(
-        Ticket.status != "cancelled"
-    ).scalar() or 0
+    # Totals come from the materialized ticket_stats summary
+    totals = await db.run_sync(get_dashboard_totals)
     
     # Recent tickets (last 10)
-    recent_tickets = db.query(Ticket).order_by(
-        Ticket.purchase_date.desc()
-    ).limit(10).all()
+    recent_tickets = (await db.scalars(
+        select(Ticket).order_by(Ticket.purchase_date.desc()).limit(10)
+    )).all()
     
     # Upcoming events (next 5)
-    upcoming_events = db.query(Event).filter(
-        Event.event_date >= datetime.now().date()
-    ).order_by(Event.event_date).limit(5).all()
-    
-    # Ticket stats by status
-    confirmed_tickets = db.query(func.count(Ticket.id)).filter(
-        Ticket.status == "confirmed"
-    ).scalar() or 0
-    
-    cancelled_tickets = db.query(func.count(Ticket.id)).filter(
-        Ticket.status == "cancelled"
-    ).scalar() or 0
+    upcoming_events = (await db.scalars(
+        select(Event).where(
+            Event.event_date >= datetime.now().date()
+        ).order_by(Event.event_date, Event.id).limit(5)
+    )).all()
     
     return {
-        "total_venues": total_venues,
-        "total_events": total_events,
-        "total_tickets": total_tickets,
-        "total_revenue": float(total_revenue),
-        "confirmed_tickets": confirmed_tickets,
-        "cancelled_tickets": cancelled_tickets,
+        **totals,
         "recent_tickets": [
             {
                 "id": t.id,
@@ -75,3 +68,70 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
             for e in upcoming_events
         ]
     }
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Response cache hit/miss counters for this process"""
+    return response_cache.stats()
+
+
+@router.get("/gate")
+async def get_gate_stats():
+    """Events loaded into this process's gate index and its lookup counters"""
+    return gate_index.stats()
+
+
+@router.get("/limits")
+async def get_limit_stats():
+    """Purchase rate limit and load shedding counters for this process"""
+    return purchase_guard.stats()
+
+
+@router.get("/queues")
+async def get_queue_stats():
+    """Waiting room joins, admissions and admitted or rejected purchases for this process"""
+    return waiting_room.stats()
+
+
+@router.get("/holds")
+async def get_hold_stats():
+    """Expiry sweeps run by this process and the holds they released"""
+    return hold_sweeper.stats()
+
+
+@router.get("/timeseries", response_model=List[SalesTimeseriesPoint])
+async def get_timeseries(
+    date_from: date = Query(..., description="First day of the series (UTC)"),
+    date_to: Optional[date] = Query(None, description="Last day of the series (UTC); defaults to today"),
+    interval: str = Query("day", pattern="^(hour|day|week)$"),
+    group_by: Optional[str] = Query(None, pattern="^(event|venue|city|category)$"),
+    event_id: Optional[int] = Query(None, description="Filter by event"),
+    venue_id: Optional[int] = Query(None, description="Filter by venue"),
+    city: Optional[str] = Query(None, description="Filter by venue city"),
+    category: Optional[str] = Query(None, description="Filter by event category"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Tickets sold, cancelled and revenue per hour, day or week, from pre-aggregated buckets"""
+    date_to = date_to or datetime.now(timezone.utc).date()
+    if interval == "week":
+        # Whole weeks, Monday to Sunday
+        date_from -= timedelta(days=date_from.weekday())
+        date_to += timedelta(days=6 - date_to.weekday())
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    days = (date_to - date_from).days + 1
+    if days / BUCKET_DAYS[interval] > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BUCKETS} {interval} buckets per request")
+
+    return await db.run_sync(
+        get_sales_timeseries,
+        interval,
+        datetime.combine(date_from, time.min),
+        datetime.combine(date_to + timedelta(days=1), time.min),
+        group_by,
+        event_id,
+        venue_id,
+        city,
+        category,
+    )
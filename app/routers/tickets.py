@@ -1,75 +1,296 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from collections import Counter
+from datetime import date, datetime, time, timedelta
 
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..cache import to_json
+from ..codes import is_mistyped
+from ..config import get_settings
+from ..database import get_async_db
+from ..export import export_response
+from ..fast_json import row_select, rows_json
+from ..fields import sparse_schema, list_adapter
+from ..gate import GateEntry, gate_index
+from ..limits import purchase_guard
+from ..loading import eager_load
+from ..pagination import paginate, cursor_headers
 from ..models import Ticket, Event
-from ..schemas import TicketCreate, TicketResponse
+from ..schemas import (
+    TicketCreate,
+    TicketBatchCreate,
+    TicketResponse,
+    TicketGateStatus,
+    TicketRedeemBatch,
+    TicketRedeemResult,
+)
+from ..services import (
+    record_ticket_purchase,
+    record_ticket_status_change,
+    reserve_seats,
+    reserve_seats_many,
+    release_seats,
+    redeem_tickets,
+    insert_tickets,
+    record_sales,
+    record_sale_cancelled,
+    record_sales_buckets,
+    record_bucket_cancelled,
+)
+from ..waiting_room import waiting_room
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
+REDEEM_ERRORS = {
+    "not_found": (404, "Ticket not found"),
+    "already_used": (409, "Ticket has already been used"),
+    "cancelled": (409, "Ticket is cancelled"),
+    "wrong_event": (409, "Ticket is for a different event"),
+}
+
 
 @router.get("", response_model=List[TicketResponse])
-def get_all_tickets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_all_tickets(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Fields to return, e.g. id,event_id,status"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all tickets"""
-    tickets = db.query(Ticket).offset(skip).limit(limit).all()
-    return tickets
+    schema = sparse_schema(TicketResponse, fields)
+    fast = get_settings().fast_json
+    if fast:
+        query = row_select(Ticket, schema)
+    else:
+        query = select(Ticket).options(*eager_load(Ticket, schema, columns_only=True))
+
+    tickets = await paginate(db, query, [Ticket.id], response, limit, skip=skip, cursor=cursor)
+    body = rows_json(Ticket, schema, tickets) if fast else to_json(list_adapter(schema), tickets)
+    return Response(content=body, media_type="application/json", headers=cursor_headers(response))
+
+
+@router.get("/export")
+async def export_tickets(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    event_id: Optional[int] = Query(None, description="Only this event's tickets"),
+    ticket_status: Optional[str] = Query(None, alias="status", pattern="^(confirmed|cancelled|used)$"),
+    date_from: Optional[date] = Query(None, description="Purchased on or after this date"),
+    date_to: Optional[date] = Query(None, description="Purchased on or before this date"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream every matching ticket as NDJSON or CSV"""
+    query = select(
+        Ticket.id,
+        Ticket.event_id,
+        Ticket.buyer_name,
+        Ticket.buyer_email,
+        Ticket.ticket_type,
+        Ticket.price,
+        Ticket.confirmation_code,
+        Ticket.status,
+        Ticket.purchase_date,
+    ).order_by(Ticket.id)
+
+    if event_id:
+        query = query.where(Ticket.event_id == event_id)
+    if ticket_status:
+        query = query.where(Ticket.status == ticket_status)
+    if date_from:
+        query = query.where(Ticket.purchase_date >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.where(Ticket.purchase_date < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    return export_response(db, query, export_format, "tickets")
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
-def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
+async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a single ticket by ID"""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return ticket
 
 
 @router.get("/code/{confirmation_code}", response_model=TicketResponse)
-def get_ticket_by_code(confirmation_code: str, db: Session = Depends(get_db)):
+async def get_ticket_by_code(confirmation_code: str, db: AsyncSession = Depends(get_async_db)):
     """Get a ticket by confirmation code"""
-    ticket = db.query(Ticket).filter(Ticket.confirmation_code == confirmation_code).first()
+    if is_mistyped(confirmation_code):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    ticket = await db.scalar(select(Ticket).where(Ticket.confirmation_code == confirmation_code))
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return ticket
 
 
-@router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
-def purchase_ticket(ticket: TicketCreate, db: Session = Depends(get_db)):
+@router.get("/code/{confirmation_code}/status", response_model=TicketGateStatus)
+async def get_ticket_gate_status(confirmation_code: str, db: AsyncSession = Depends(get_async_db)):
+    """Gate scan: a code's status, from memory when its event is loaded at the gate"""
+    # A mistyped code is turned away on its check character, without a query
+    if is_mistyped(confirmation_code):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    entry = gate_index.lookup(confirmation_code)
+    if entry is None:
+        row = (await db.execute(
+            select(Ticket.id, Ticket.event_id, Ticket.status)
+            .where(Ticket.confirmation_code == confirmation_code)
+        )).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        entry = GateEntry(*row)
+    return {"confirmation_code": confirmation_code, **entry._asdict()}
+
+
+@router.post("/code/{confirmation_code}/redeem", response_model=TicketResponse)
+async def redeem_ticket(
+    confirmation_code: str,
+    event_id: Optional[int] = Query(None, description="Only admit tickets for this event"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Admit a ticket at the gate: confirmed becomes used, exactly once"""
+    outcomes = await db.run_sync(redeem_tickets, [confirmation_code], event_id)
+    outcome, ticket = outcomes[confirmation_code]
+    if outcome != "redeemed":
+        status_code, detail = REDEEM_ERRORS[outcome]
+        raise HTTPException(status_code=status_code, detail=detail)
+    await db.commit()
+    gate_index.set_status(confirmation_code, "used")
+    return ticket
+
+
+@router.post("/redeem", response_model=List[TicketRedeemResult])
+async def redeem_ticket_batch(batch: TicketRedeemBatch, db: AsyncSession = Depends(get_async_db)):
+    """Redeem a queue of scanned codes (e.g. an offline scanner syncing); each succeeds or fails alone"""
+    outcomes = await db.run_sync(redeem_tickets, batch.codes, batch.event_id)
+    await db.commit()
+
+    results = []
+    admitted = set()
+    for code in batch.codes:
+        outcome, ticket = outcomes[code]
+        if outcome == "redeemed":
+            # A code scanned twice in the same queue gets in once
+            if code in admitted:
+                outcome = "already_used"
+            else:
+                admitted.add(code)
+                gate_index.set_status(code, "used")
+        results.append({
+            "confirmation_code": code,
+            "result": outcome,
+            "ticket_id": ticket.id if ticket else None,
+            "status": ticket.status if ticket else None,
+        })
+    return results
+
+
+@router.post(
+    "",
+    response_model=TicketResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(purchase_guard.slot)],
+)
+async def purchase_ticket(ticket: TicketCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Purchase a new ticket"""
-    # Verify event exists
-    event = db.query(Event).filter(Event.id == ticket.event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    db_ticket = Ticket(**ticket.model_dump())
-    db.add(db_ticket)
-    db.commit()
-    db.refresh(db_ticket)
+    await purchase_guard.check(request, {ticket.event_id: 1})
+    await waiting_room.admit(request, [ticket.event_id])
+    # Take the seat first; the conditional UPDATE cannot oversell. Writing
+    # before any read also keeps SQLite from failing a read-to-write upgrade
+    # when another purchase commits in between.
+    if not await db.run_sync(reserve_seats, ticket.event_id):
+        # Verify event exists
+        if not await db.get(Event, ticket.event_id):
+            raise HTTPException(status_code=404, detail="Event not found")
+        raise HTTPException(status_code=409, detail="Event is sold out")
+
+    [db_ticket] = await db.run_sync(insert_tickets, [ticket.model_dump()])
+    await db.run_sync(record_ticket_purchase, db_ticket.price)
+    await db.run_sync(record_sales, [db_ticket])
+    await db.run_sync(record_sales_buckets, [db_ticket])
+    await db.commit()
+    gate_index.add(db_ticket.confirmation_code, db_ticket.id, db_ticket.event_id, db_ticket.status)
     return db_ticket
 
 
+@router.post(
+    "/batch",
+    response_model=List[TicketResponse],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(purchase_guard.slot)],
+)
+async def purchase_tickets(order: TicketBatchCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Purchase a group of tickets in one transaction; all succeed or none do"""
+    quantities = Counter(item.event_id for item in order.tickets)
+    await purchase_guard.check(request, quantities)
+    await waiting_room.admit(request, quantities)
+
+    # One seat UPDATE per event, in event id order
+    short = await db.run_sync(reserve_seats_many, quantities)
+    if short:
+        # Tell missing events apart from sold-out ones with a single IN query
+        found = set((await db.scalars(select(Event.id).where(Event.id.in_(short)))).all())
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[
+                {
+                    "loc": ["body", "tickets", index, "event_id"],
+                    "msg": "Event is sold out" if item.event_id in found else "Event not found",
+                    "type": "sold_out" if item.event_id in found else "not_found",
+                }
+                for index, item in enumerate(order.tickets)
+                if item.event_id in short
+            ],
+        )
+
+    # A single multi-row INSERT ... RETURNING instead of a flush and refresh per ticket
+    tickets = await db.run_sync(insert_tickets, [item.model_dump() for item in order.tickets])
+    await db.run_sync(record_ticket_purchase, sum(item.price for item in order.tickets), len(tickets))
+    await db.run_sync(record_sales, tickets)
+    await db.run_sync(record_sales_buckets, tickets)
+    await db.commit()
+    for db_ticket in tickets:
+        gate_index.add(db_ticket.confirmation_code, db_ticket.id, db_ticket.event_id, db_ticket.status)
+    return tickets
+
+
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-def cancel_ticket(ticket_id: int, db: Session = Depends(get_db)):
-    """Cancel a ticket (sets status to cancelled)"""
-    db_ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not db_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    if db_ticket.status == "cancelled":
-        raise HTTPException(status_code=400, detail="Ticket is already cancelled")
-    
-    db_ticket.status = "cancelled"
-    db.commit()
+async def cancel_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Cancel a confirmed ticket (sets status to cancelled)"""
+    # Compare-and-set, as in redemption: a ticket redeemed at the gate is
+    # never cancelled, even by a request that read it just before the scan
+    db_ticket = (await db.scalars(
+        update(Ticket)
+        .where(Ticket.id == ticket_id, Ticket.status == "confirmed")
+        .values(status="cancelled")
+        .returning(Ticket)
+    )).first()
+    if db_ticket is None:
+        existing = await db.get(Ticket, ticket_id)
+        if not existing:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        if existing.status == "cancelled":
+            raise HTTPException(status_code=400, detail="Ticket is already cancelled")
+        raise HTTPException(status_code=409, detail="Ticket has already been used")
+
+    await db.run_sync(record_ticket_status_change, db_ticket.price, "confirmed", "cancelled")
+    await db.run_sync(release_seats, db_ticket.event_id)
+    await db.run_sync(record_sale_cancelled, db_ticket.event_id, db_ticket.ticket_type, db_ticket.price)
+    await db.run_sync(record_bucket_cancelled, db_ticket)
+    await db.commit()
+    gate_index.set_status(db_ticket.confirmation_code, "cancelled")
     return None
 
 
 @router.get("/event/{event_id}", response_model=List[TicketResponse])
-def get_event_tickets(event_id: int, db: Session = Depends(get_db)):
+async def get_event_tickets(event_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all tickets for a specific event"""
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = await db.get(Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    
-    tickets = db.query(Ticket).filter(Ticket.event_id == event_id).all()
+
+    tickets = (await db.scalars(select(Ticket).where(Ticket.event_id == event_id))).all()
     return tickets
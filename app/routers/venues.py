@@ -1,90 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..database import get_db
-from ..models import Venue, Event
-from ..schemas import VenueCreate, VenueUpdate, VenueResponse, VenueWithEvents
+from ..cache import response_cache, to_json
+from ..conditional import conditional_get
+from ..config import get_settings
+from ..database import get_async_db
+from ..fast_json import row_select, rows_json
+from ..fields import sparse_schema, list_adapter
+from ..gate import gate_index
+from ..loading import eager_load
+from ..pagination import paginate, cursor_headers
+from ..models import Venue, Event, Ticket, EventInventory
+from ..schemas import VenueCreate, VenueUpdate, VenueResponse, VenueWithEvents, VenueSearchResult
+from ..services import (
+    record_tickets_removed,
+    record_row_counts,
+    venue_search_filter,
+    search_venues,
+    resize_inventory,
+    bump_revisions,
+)
 
 router = APIRouter(prefix="/venues", tags=["venues"])
 
+VENUE_DETAIL = TypeAdapter(VenueWithEvents)
+
 
 @router.get("", response_model=List[VenueResponse])
-def get_all_venues(
-    skip: int = 0, 
+async def get_all_venues(
+    request: Request,
+    response: Response,
+    skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
     search: Optional[str] = Query(None, description="Search by venue name"),
     city: Optional[str] = Query(None, description="Filter by city"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Fields to return, e.g. id,name,city"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all venues with optional search and filtering"""
-    query = db.query(Venue)
-    
+    schema = sparse_schema(VenueResponse, fields)
+    early, validators = await conditional_get(request, db, "venues")
+    if early is not None:
+        return early
+
+    fast = get_settings().fast_json
+    if fast:
+        query = row_select(Venue, schema)
+    else:
+        query = select(Venue).options(*eager_load(Venue, schema, columns_only=True))
+
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(Venue.name.ilike(search_term))
+        query = query.where(venue_search_filter(db, search))
     if city:
-        query = query.filter(Venue.city == city)
-    
-    venues = query.offset(skip).limit(limit).all()
-    return venues
+        query = query.where(Venue.city == city)
+
+    venues = await paginate(db, query, [Venue.id], response, limit, skip=skip, cursor=cursor)
+    tags = ["venues", *(f"venue:{v.id}" for v in venues)]
+    body = rows_json(Venue, schema, venues) if fast else to_json(list_adapter(schema), venues)
+    return await response_cache.put(request, body, tags, {**validators, **cursor_headers(response)})
+
+
+@router.get("/search", response_model=List[VenueSearchResult])
+async def search_all_venues(
+    q: str = Query(..., min_length=1, description="Words to search for (prefix matched)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over venue names, best matches first"""
+    return await db.run_sync(search_venues, q, limit)
 
 
 @router.get("/{venue_id}", response_model=VenueWithEvents)
-def get_venue(venue_id: int, db: Session = Depends(get_db)):
+async def get_venue(venue_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get a single venue by ID with its events"""
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    early, validators = await conditional_get(
+        request, db, "venues", "events", exists=select(Venue.id).where(Venue.id == venue_id)
+    )
+    if early is not None:
+        return early
+
+    venue = await db.get(Venue, venue_id, options=eager_load(Venue, VenueWithEvents))
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    return venue
+    return await response_cache.put(request, to_json(VENUE_DETAIL, venue), [f"venue:{venue.id}"], validators)
 
 
 @router.post("", response_model=VenueResponse, status_code=status.HTTP_201_CREATED)
-def create_venue(venue: VenueCreate, db: Session = Depends(get_db)):
+async def create_venue(venue: VenueCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new venue"""
     db_venue = Venue(**venue.model_dump())
     db.add(db_venue)
-    db.commit()
-    db.refresh(db_venue)
+    await db.run_sync(record_row_counts, venues=1)
+    await db.run_sync(bump_revisions, "venues")
+    await db.commit()
+    await response_cache.invalidate("venues")
+    await db.refresh(db_venue)
     return db_venue
 
 
 @router.put("/{venue_id}", response_model=VenueResponse)
-def update_venue(venue_id: int, venue: VenueUpdate, db: Session = Depends(get_db)):
+async def update_venue(venue_id: int, venue: VenueUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a venue"""
-    db_venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    db_venue = await db.get(Venue, venue_id)
     if not db_venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    
+
     update_data = venue.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_venue, key, value)
-    
-    db.commit()
-    db.refresh(db_venue)
+
+    if "capacity" in update_data and not await db.run_sync(
+        resize_inventory,
+        db_venue.capacity,
+        EventInventory.event_id.in_(select(Event.id).where(Event.venue_id == venue_id)),
+    ):
+        raise HTTPException(
+            status_code=409, detail="Capacity is below the seats already sold or held for an event at this venue"
+        )
+    await db.run_sync(bump_revisions, "venues")
+    await db.commit()
+    # Also drops event pages and details that embed this venue
+    await response_cache.invalidate("venues", f"venue:{venue_id}")
+    await db.refresh(db_venue)
     return db_venue
 
 
 @router.delete("/{venue_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_venue(venue_id: int, db: Session = Depends(get_db)):
+async def delete_venue(venue_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a venue"""
-    db_venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    db_venue = await db.get(Venue, venue_id)
     if not db_venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    
-    db.delete(db_venue)
-    db.commit()
+
+    await db.run_sync(
+        record_tickets_removed,
+        Ticket.event_id.in_(select(Event.id).where(Event.venue_id == venue_id)),
+    )
+    gated = []
+    if gate_index.loaded_events:
+        gated = (await db.scalars(
+            select(Event.id).where(Event.venue_id == venue_id, Event.id.in_(gate_index.loaded_events))
+        )).all()
+    events = await db.scalar(select(func.count()).select_from(Event).where(Event.venue_id == venue_id))
+    await db.delete(db_venue)
+    # Deleting a venue deletes its events as well
+    await db.run_sync(record_row_counts, venues=-1, events=-events)
+    await db.run_sync(bump_revisions, "venues", "events")
+    await db.commit()
+    # Its events are gone too, which can shift any event page
+    await response_cache.invalidate("venues", "events", f"venue:{venue_id}")
+    gate_index.unload(*gated)
     return None
 
 
 @router.get("/{venue_id}/events", response_model=List[dict])
-def get_venue_events(venue_id: int, db: Session = Depends(get_db)):
+async def get_venue_events(venue_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all events for a specific venue"""
-    venue = db.query(Venue).filter(Venue.id == venue_id).first()
+    venue = await db.get(Venue, venue_id)
     if not venue:
         raise HTTPException(status_code=404, detail="Venue not found")
-    
-    events = db.query(Event).filter(Event.venue_id == venue_id).all()
+
+    events = (await db.scalars(select(Event).where(Event.venue_id == venue_id))).all()
     return [
         {
             "id": e.id,
@@ -0,0 +1,89 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..models import Event
+from ..schemas import QueueOpen, QueueStatus, QueuePosition
+from ..waiting_room import QueueState, waiting_room
+
+router = APIRouter(prefix="/events", tags=["waiting room"])
+
+
+def queue_status(event_id: int, state: QueueState) -> QueueStatus:
+    admitted = int(state.admitted)
+    return QueueStatus(
+        event_id=event_id,
+        rate_per_second=state.rate,
+        joined=state.joined,
+        admitted=admitted,
+        waiting=state.joined - admitted,
+    )
+
+
+@router.post("/{event_id}/queue", response_model=QueueStatus)
+async def open_queue(event_id: int, queue: QueueOpen, db: AsyncSession = Depends(get_async_db)):
+    """Put the event's purchases behind a waiting room, or change its rate (0 holds the queue)"""
+    if not await db.get(Event, event_id):
+        raise HTTPException(status_code=404, detail="Event not found")
+    return queue_status(event_id, await waiting_room.open(event_id, queue.rate_per_second))
+
+
+@router.get("/{event_id}/queue", response_model=QueueStatus)
+async def get_queue(event_id: int):
+    """How many buyers have joined the event's queue and how many are through"""
+    state = await waiting_room.state(event_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="This event has no waiting room")
+    return queue_status(event_id, state)
+
+
+@router.delete("/{event_id}/queue", status_code=status.HTTP_204_NO_CONTENT)
+async def close_queue(event_id: int):
+    """Let purchases through without admission tokens again"""
+    await waiting_room.close(event_id)
+    return None
+
+
+@router.post("/{event_id}/queue/join", response_model=QueuePosition, status_code=status.HTTP_201_CREATED)
+async def join_queue(event_id: int):
+    """Take a place at the back of the event's queue"""
+    position = await waiting_room.join(event_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="This event has no waiting room")
+    return position
+
+
+@router.get("/{event_id}/queue/{queue_token}", response_model=QueuePosition)
+async def get_queue_position(event_id: int, queue_token: str):
+    """How many buyers are ahead; carries an admission token once it is this buyer's turn"""
+    position = await waiting_room.position(event_id, queue_token)
+    if position is None:
+        raise HTTPException(status_code=404, detail="This event has no waiting room")
+    return position
+
+
+@router.get("/{event_id}/queue/{queue_token}/stream")
+async def stream_queue_position(event_id: int, queue_token: str):
+    """Server-sent events with the buyer's position, ending with their admission"""
+    position = await waiting_room.position(event_id, queue_token)
+    if position is None:
+        raise HTTPException(status_code=404, detail="This event has no waiting room")
+
+    async def events():
+        current = position
+        while current is not None:
+            yield f"event: position\ndata: {QueuePosition(**current).model_dump_json()}\n\n"
+            if current["admitted"]:
+                return
+            await asyncio.sleep(waiting_room.poll_seconds)
+            current = await waiting_room.position(event_id, queue_token)
+        yield "event: closed\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
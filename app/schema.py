@@ -0,0 +1,78 @@
+"""
+Schema management at startup.
+
+The schema belongs to Alembic: ``alembic upgrade head`` creates and
+migrates it, once per deployment, before new workers start. What each
+worker does about it in its lifespan startup is SCHEMA_ON_STARTUP:
+
+  check   refuse to start unless the database is at the latest migration;
+          one read of ``alembic_version`` (the default)
+  create  create missing tables with ``create_all``, for local development
+          and throwaway SQLite databases; it inspects every table on every
+          worker start
+  none    nothing
+
+Importing the app never touches the database, so tests, scripts and
+worker imports pay for neither.
+"""
+import re
+from pathlib import Path
+from typing import Tuple
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .database import Base
+
+VERSIONS_DIR = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+REVISION = re.compile(r"^(down_)?revision\b[^=]*=(.*)$", re.MULTILINE)
+QUOTED = re.compile(r"[\"']([^\"']+)[\"']")
+
+
+def migration_heads() -> Tuple[str, ...]:
+    """The latest revisions in the migration chain
+
+    Read from the ``revision`` and ``down_revision`` lines of the version
+    files rather than through Alembic, whose import alone costs each worker
+    a quarter of a second.
+    """
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        for down, value in REVISION.findall(path.read_text()):
+            (parents if down else revisions).update(QUOTED.findall(value))
+    return tuple(sorted(revisions - parents))
+
+
+def current_revisions(conn: Connection) -> Tuple[str, ...]:
+    """The revisions recorded in ``alembic_version``; none before the first upgrade"""
+    try:
+        return tuple(sorted(conn.scalars(text("SELECT version_num FROM alembic_version"))))
+    except DBAPIError:
+        return ()
+
+
+def check_schema(conn: Connection) -> None:
+    """Raise unless the database is at the latest migration
+
+    Shared by worker startup and the scripts that load data (``seed.py``,
+    ``scripts/import_data.py``), none of which create tables themselves.
+    """
+    current, heads = current_revisions(conn), migration_heads()
+    if current != heads:
+        raise RuntimeError(
+            f"Database is at revision {', '.join(current) or 'none'}, not {', '.join(heads)}; "
+            "run `alembic upgrade head` first"
+        )
+
+
+async def prepare_schema(mode: str, engine: AsyncEngine) -> None:
+    """Create or check the schema as SCHEMA_ON_STARTUP says"""
+    if mode == "create":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    elif mode == "check":
+        async with engine.connect() as conn:
+            await conn.run_sync(check_schema)
+    elif mode != "none":
+        raise ValueError(f"Unknown SCHEMA_ON_STARTUP {mode!r}")
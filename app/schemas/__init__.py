@@ -1,9 +1,24 @@
 from .venue import VenueCreate, VenueUpdate, VenueResponse, VenueWithEvents
-from .event import EventCreate, EventUpdate, EventResponse, EventWithVenue
-from .ticket import TicketCreate, TicketResponse
+from .event import (
+    EventCreate, EventUpdate, EventResponse, EventWithVenue,
+    EventAvailabilitySummary, EventWithAvailability, TicketTypeSales, EventAvailability
+)
+from .ticket import (
+    TicketCreate, TicketBatchCreate, TicketResponse, TicketGateStatus, TicketRedeemBatch, TicketRedeemResult
+)
+from .search import EventSearchResult, VenueSearchResult
+from .stats import SalesTimeseriesPoint
+from .waiting_room import QueueOpen, QueueStatus, QueuePosition
+from .hold import HoldCreate, HoldConfirm, HoldResponse
 
 __all__ = [
     "VenueCreate", "VenueUpdate", "VenueResponse", "VenueWithEvents",
     "EventCreate", "EventUpdate", "EventResponse", "EventWithVenue",
-    "TicketCreate", "TicketResponse"
+    "EventAvailabilitySummary", "EventWithAvailability", "TicketTypeSales", "EventAvailability",
+    "TicketCreate", "TicketBatchCreate", "TicketResponse",
+    "TicketGateStatus", "TicketRedeemBatch", "TicketRedeemResult",
+    "EventSearchResult", "VenueSearchResult",
+    "SalesTimeseriesPoint",
+    "QueueOpen", "QueueStatus", "QueuePosition",
+    "HoldCreate", "HoldConfirm", "HoldResponse"
 ]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date, time, datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class EventBase(BaseModel):
@@ -47,3 +47,40 @@ class EventResponse(EventBase):
 
 class EventWithVenue(EventResponse):
     venue: VenueSummary
+
+
+class EventAvailabilitySummary(BaseModel):
+    """Seat availability embedded in event listings (``include=availability``)"""
+    capacity: int
+    sold: int
+    remaining: int
+    status: str  # available, selling_fast, sold_out
+
+    class Config:
+        from_attributes = True
+
+
+class EventWithAvailability(EventWithVenue):
+    availability: Optional[EventAvailabilitySummary] = None
+
+
+class TicketTypeSales(BaseModel):
+    ticket_type: str
+    sold: int
+    cancelled: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+
+class EventAvailability(BaseModel):
+    """Seats left and sales per ticket type, read from the sales rollup"""
+    event_id: int
+    capacity: int
+    sold: int
+    held: int  # set aside by unexpired checkout holds
+    remaining: int
+    status: str
+    revenue: float
+    ticket_types: List[TicketTypeSales]
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, timezone
+from typing import Optional
+
+from .ticket import TicketBase
+
+
+class HoldCreate(BaseModel):
+    quantity: int = Field(1, ge=1, le=500)
+    # Defaults to HOLD_TTL_SECONDS, capped at HOLD_MAX_TTL_SECONDS
+    ttl_seconds: Optional[int] = Field(None, ge=1)
+
+
+class HoldConfirm(TicketBase):
+    """Buyer and ticket details applied to every seat of the hold"""
+    pass
+
+
+class HoldResponse(BaseModel):
+    id: str
+    event_id: int
+    quantity: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
+
+    @field_validator("expires_at")
+    @classmethod
+    def expires_at_in_utc(cls, value: datetime) -> datetime:
+        """Holds expire in UTC; SQLite hands the stored time back without its zone"""
+        return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+
+class EventSearchResult(BaseModel):
+    id: int
+    title: str
+    category: Optional[str]
+    event_date: date
+    venue_id: int
+    snippet: Optional[str] = None
+    rank: Optional[float] = None
+
+
+class VenueSearchResult(BaseModel):
+    id: int
+    name: str
+    city: str
+    snippet: Optional[str] = None
+    rank: Optional[float] = None
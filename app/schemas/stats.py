@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, Union
+
+
+class SalesTimeseriesPoint(BaseModel):
+    """Sales in one bucket; ``group`` is the event or venue id, city or category when grouped"""
+    bucket: datetime
+    group: Optional[Union[int, str]] = None
+    sold: int
+    cancelled: int
+    revenue: float
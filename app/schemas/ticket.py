@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -15,6 +15,11 @@ class TicketCreate(TicketBase):
     event_id: int
 
 
+class TicketBatchCreate(BaseModel):
+    """A group order; purchased all together or not at all"""
+    tickets: List[TicketCreate] = Field(..., min_length=1, max_length=500)
+
+
 class TicketResponse(TicketBase):
     id: int
     event_id: int
@@ -26,6 +31,27 @@ class TicketResponse(TicketBase):
         from_attributes = True
 
 
+class TicketGateStatus(BaseModel):
+    """What a gate scanner needs to know about a code"""
+    confirmation_code: str
+    ticket_id: int
+    event_id: int
+    status: str
+
+
+class TicketRedeemBatch(BaseModel):
+    """Codes queued by a scanner, redeemed independently of each other"""
+    codes: List[str] = Field(..., min_length=1, max_length=1000)
+    event_id: Optional[int] = None
+
+
+class TicketRedeemResult(BaseModel):
+    confirmation_code: str
+    result: str  # redeemed, already_used, cancelled, wrong_event, not_found
+    ticket_id: Optional[int] = None
+    status: Optional[str] = None
+
+
 class TicketWithEvent(TicketResponse):
     event_title: str
     event_date: str
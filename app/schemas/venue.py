@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 
 
@@ -34,7 +34,7 @@ class VenueResponse(VenueBase):
 class EventSummary(BaseModel):
     id: int
     title: str
-    event_date: str
+    event_date: date
     category: Optional[str]
 
     class Config:
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class QueueOpen(BaseModel):
+    rate_per_second: float = Field(..., ge=0, le=10000)  # 0 holds the queue
+
+
+class QueueStatus(BaseModel):
+    """An event's queue: buyers joined so far and how many are through"""
+    event_id: int
+    rate_per_second: float
+    joined: int
+    admitted: int
+    waiting: int
+
+
+class QueuePosition(BaseModel):
+    """A buyer's place in a queue; ``admission_token`` is set once it is their turn
+
+    ``estimated_wait_seconds`` is None while the queue is on hold.
+    """
+    event_id: int
+    queue_token: str
+    admitted: bool
+    ahead: int
+    estimated_wait_seconds: Optional[float] = None
+    poll_after_seconds: Optional[int] = None
+    admission_token: Optional[str] = None
+    admission_expires_at: Optional[datetime] = None
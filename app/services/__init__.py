@@ -0,0 +1,36 @@
+from .stats import (
+    rebuild_ticket_stats,
+    record_ticket_purchase,
+    record_ticket_status_change,
+    record_tickets_removed,
+    rebuild_row_counts,
+    record_row_counts,
+    get_dashboard_totals,
+)
+from .search import event_search_filter, venue_search_filter, search_events, search_venues
+from .revisions import bump_revisions
+from .inventory import (
+    ensure_inventory, rebuild_inventory, reserve_seats, reserve_seats_many, release_seats, resize_inventory,
+    hold_seats, sell_held_seats, release_held_seats,
+)
+from .redemption import REDEEM_OUTCOMES, redeem_tickets
+from .issuing import insert_tickets
+from .sales import record_sales, record_sale_cancelled, rebuild_ticket_sales, get_event_availability
+from .timeseries import (
+    record_sales_buckets, record_bucket_cancelled, rebuild_sales_buckets, get_sales_timeseries
+)
+from .holds import create_hold, claim_hold, release_hold, release_expired_holds
+
+__all__ = [
+    "rebuild_ticket_stats", "record_ticket_purchase", "record_ticket_status_change",
+    "record_tickets_removed", "rebuild_row_counts", "record_row_counts", "get_dashboard_totals",
+    "event_search_filter", "venue_search_filter", "search_events", "search_venues",
+    "bump_revisions",
+    "ensure_inventory", "rebuild_inventory", "reserve_seats", "reserve_seats_many", "release_seats", "resize_inventory",
+    "hold_seats", "sell_held_seats", "release_held_seats",
+    "REDEEM_OUTCOMES", "redeem_tickets",
+    "insert_tickets",
+    "record_sales", "record_sale_cancelled", "rebuild_ticket_sales", "get_event_availability",
+    "record_sales_buckets", "record_bucket_cancelled", "rebuild_sales_buckets", "get_sales_timeseries",
+    "create_hold", "claim_hold", "release_hold", "release_expired_holds"
+]
@@ -0,0 +1,69 @@
+"""
+Seat holds.
+
+A hold sets seats aside for a checkout: ``create_hold`` moves them from
+``remaining`` to ``held`` with the same conditional UPDATE purchases use,
+then records how many until when in ``holds``. Confirming, releasing and
+expiring all claim the row with ``DELETE ... RETURNING`` before touching
+any counter, so exactly one of them ever gets a hold's seats: a
+confirmation racing the sweeper, or a second confirmation, finds nothing
+to delete.
+
+Expired holds are found through the index on ``expires_at``: a sweep reads
+only rows already past their expiry, oldest first, however many live
+holds there are.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..models import Hold
+from .inventory import hold_seats, release_held_seats
+
+
+def create_hold(db: Session, event_id: int, quantity: int, expires_at: datetime) -> Optional[Hold]:
+    """Hold ``quantity`` seats until ``expires_at``; None when not enough remain"""
+    # Take the seats first, so SQLite's first statement is a write
+    if not hold_seats(db, event_id, quantity):
+        return None
+    hold = Hold(event_id=event_id, quantity=quantity, expires_at=expires_at)
+    db.add(hold)
+    db.flush()
+    return hold
+
+
+def _claim(db: Session, *criteria):
+    return db.execute(
+        delete(Hold)
+        .where(*criteria)
+        .returning(Hold.event_id, Hold.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def claim_hold(db: Session, hold_id: str, now: datetime) -> Optional[Tuple[int, int]]:
+    """Delete an unexpired hold for confirming; its (event_id, quantity), or None"""
+    rows = _claim(db, Hold.id == hold_id, Hold.expires_at > now)
+    return tuple(rows[0]) if rows else None
+
+
+def release_hold(db: Session, hold_id: str) -> bool:
+    """Delete a hold and return its seats; False when it is already gone"""
+    rows = _claim(db, Hold.id == hold_id)
+    if rows:
+        release_held_seats(db, {rows[0].event_id: rows[0].quantity})
+    return bool(rows)
+
+
+def release_expired_holds(db: Session, now: datetime, limit: int = 500) -> int:
+    """Delete up to ``limit`` holds expired by ``now``, oldest first, and return their seats"""
+    expired = select(Hold.id).where(Hold.expires_at <= now).order_by(Hold.expires_at).limit(limit)
+    rows = _claim(db, Hold.id.in_(expired))
+    quantities: Counter = Counter()
+    for event_id, quantity in rows:
+        quantities[event_id] += quantity
+    release_held_seats(db, quantities)
+    return len(rows)
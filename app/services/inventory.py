@@ -0,0 +1,148 @@
+"""
+Event seat inventory.
+
+Each event has one ``event_inventory`` row holding its capacity and its
+sold/held/remaining counters. A purchase takes seats with a single
+conditional ``UPDATE ... WHERE remaining >= n``: the database applies it
+atomically, so concurrent buyers can never push ``sold`` past ``capacity``,
+and no purchase has to count tickets. Holds take seats the same way into
+``held``, then move them on to ``sold`` or back to ``remaining``. Rows are
+created on first use from the venue's capacity minus the event's live
+tickets.
+"""
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Venue, Event, Ticket, EventInventory, Hold
+from .dialects import on_conflict_insert
+
+
+def _insert_ignoring_conflicts(db: Session, table):
+    """INSERT that skips rows whose primary key already exists"""
+    statement = on_conflict_insert(db, table)
+    return statement.on_conflict_do_nothing() if statement is not None else insert(table)
+
+
+def ensure_inventory(db: Session, event_id: int) -> bool:
+    """Create the event's inventory row if it is missing; True if one was created"""
+    live_tickets = (
+        select(func.count(Ticket.id))
+        .where(Ticket.event_id == Event.id, Ticket.status != "cancelled")
+        .scalar_subquery()
+    )
+    source = (
+        select(Event.id, Venue.capacity, live_tickets, Venue.capacity - live_tickets)
+        .join(Venue, Venue.id == Event.venue_id)
+        .where(Event.id == event_id)
+    )
+    result = db.execute(
+        _insert_ignoring_conflicts(db, EventInventory).from_select(
+            ["event_id", "capacity", "sold", "remaining"], source
+        )
+    )
+    return bool(result.rowcount)
+
+
+def rebuild_inventory(db: Session) -> None:
+    """Recompute every event's seat counters from tickets and holds in one grouped pass"""
+    db.flush()
+    sold = (
+        select(Ticket.event_id, func.count(Ticket.id).label("sold"))
+        .where(Ticket.status != "cancelled")
+        .group_by(Ticket.event_id)
+        .subquery()
+    )
+    held = (
+        select(Hold.event_id, func.sum(Hold.quantity).label("held"))
+        .group_by(Hold.event_id)
+        .subquery()
+    )
+    sold_count = func.coalesce(sold.c.sold, 0)
+    held_count = func.coalesce(held.c.held, 0)
+    db.execute(delete(EventInventory))
+    db.execute(
+        insert(EventInventory).from_select(
+            ["event_id", "capacity", "sold", "held", "remaining"],
+            select(Event.id, Venue.capacity, sold_count, held_count, Venue.capacity - sold_count - held_count)
+            .join(Venue, Venue.id == Event.venue_id)
+            .outerjoin(sold, sold.c.event_id == Event.id)
+            .outerjoin(held, held.c.event_id == Event.id),
+        )
+    )
+
+
+def _take_seats(db: Session, event_id: int, quantity: int, counter) -> bool:
+    statement = (
+        update(EventInventory)
+        .where(EventInventory.event_id == event_id, EventInventory.remaining >= quantity)
+        .values({counter: counter + quantity, EventInventory.remaining: EventInventory.remaining - quantity})
+    )
+    if db.execute(statement).rowcount:
+        return True
+    # Either sold out, or the row does not exist yet
+    return ensure_inventory(db, event_id) and bool(db.execute(statement).rowcount)
+
+
+def reserve_seats(db: Session, event_id: int, quantity: int = 1) -> bool:
+    """Atomically take ``quantity`` seats; False when not enough remain"""
+    return _take_seats(db, event_id, quantity, EventInventory.sold)
+
+
+def hold_seats(db: Session, event_id: int, quantity: int) -> bool:
+    """Atomically set ``quantity`` seats aside for a hold; False when not enough remain"""
+    return _take_seats(db, event_id, quantity, EventInventory.held)
+
+
+def sell_held_seats(db: Session, event_id: int, quantity: int) -> None:
+    """Turn a confirmed hold's seats into sold ones"""
+    db.execute(
+        update(EventInventory)
+        .where(EventInventory.event_id == event_id)
+        .values(held=EventInventory.held - quantity, sold=EventInventory.sold + quantity)
+    )
+
+
+def release_held_seats(db: Session, quantities: Dict[int, int]) -> None:
+    """Return the seats of released or expired holds to the pool, in event id order"""
+    for event_id, quantity in sorted(quantities.items()):
+        db.execute(
+            update(EventInventory)
+            .where(EventInventory.event_id == event_id)
+            .values(held=EventInventory.held - quantity, remaining=EventInventory.remaining + quantity)
+        )
+
+
+def reserve_seats_many(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """Take seats for several events; returns the event ids that fell short"""
+    return [
+        event_id
+        for event_id, quantity in sorted(quantities.items())
+        if not reserve_seats(db, event_id, quantity)
+    ]
+
+
+def release_seats(db: Session, event_id: int, quantity: int = 1) -> None:
+    """Return seats from cancelled tickets to the pool"""
+    db.execute(
+        update(EventInventory)
+        .where(EventInventory.event_id == event_id)
+        .values(sold=EventInventory.sold - quantity, remaining=EventInventory.remaining + quantity)
+    )
+
+
+def resize_inventory(db: Session, capacity: int, *criteria) -> bool:
+    """Apply a new capacity to the inventory rows matching ``criteria``
+
+    False when some of those events have already sold or held more seats than
+    ``capacity``; the caller must then roll back rather than commit. Resizing
+    never leaves ``remaining`` below zero.
+    """
+    taken = EventInventory.sold + EventInventory.held
+    db.execute(
+        update(EventInventory)
+        .where(*criteria, taken <= capacity)
+        .values(capacity=capacity, remaining=capacity - taken)
+    )
+    return db.scalar(select(EventInventory.event_id).where(*criteria, taken > capacity).limit(1)) is None
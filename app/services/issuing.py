@@ -0,0 +1,35 @@
+"""
+Ticket issuing.
+
+New tickets are written with one ``INSERT ... RETURNING`` whatever their
+number, inside a SAVEPOINT. Confirmation codes come from the column default
+(``app/codes.py``) and are random within each second, so a clash with an
+existing code is vanishingly rare; should one happen, only the savepoint is
+rolled back and the insert retried with fresh codes, keeping the seats the
+purchase has already taken.
+"""
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Ticket
+
+CODE_ATTEMPTS = 3
+
+
+def is_code_conflict(error: IntegrityError) -> bool:
+    """Whether an insert failed on the confirmation code's unique constraint"""
+    return "confirmation_code" in str(error.orig)
+
+
+def insert_tickets(db: Session, rows: List[dict]) -> List[Ticket]:
+    """Insert tickets, retrying with fresh confirmation codes on a clash"""
+    for attempt in range(1, CODE_ATTEMPTS + 1):
+        try:
+            with db.begin_nested():
+                return db.scalars(insert(Ticket).returning(Ticket), rows).all()
+        except IntegrityError as error:
+            if attempt == CODE_ATTEMPTS or not is_code_conflict(error):
+                raise
@@ -0,0 +1,56 @@
+"""
+Ticket redemption at the gate.
+
+Redeeming is a compare-and-set: a single
+``UPDATE tickets SET status = 'used' WHERE confirmation_code IN (...) AND status = 'confirmed'``
+(optionally narrowed to the gate's event). The database applies it
+atomically, so however many scanners submit the same code, exactly one
+update matches it and every other attempt sees ``already_used``. Only the
+codes the update did not match are read back, to say why.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..codes import is_mistyped
+from ..models import Ticket
+from .stats import record_ticket_status_change
+
+REDEEM_OUTCOMES = ("redeemed", "already_used", "cancelled", "wrong_event", "not_found")
+
+
+def redeem_tickets(
+    db: Session, codes: Sequence[str], event_id: Optional[int] = None
+) -> Dict[str, Tuple[str, Optional[Ticket]]]:
+    """Mark confirmed tickets used; ``{code: (outcome, ticket or None)}`` for every code"""
+    # Mistyped codes fail their check character and are never looked up
+    unique = [code for code in dict.fromkeys(codes) if not is_mistyped(code)]
+    criteria = [Ticket.confirmation_code.in_(unique), Ticket.status == "confirmed"]
+    if event_id is not None:
+        criteria.append(Ticket.event_id == event_id)
+    # The write comes first, as in purchases, so SQLite never has to
+    # upgrade a read transaction that another writer got ahead of
+    redeemed = []
+    if unique:
+        redeemed = db.scalars(
+            update(Ticket).where(*criteria).values(status="used").returning(Ticket)
+        ).all()
+    outcomes = {ticket.confirmation_code: ("redeemed", ticket) for ticket in redeemed}
+    if redeemed:
+        revenue = sum(ticket.price for ticket in redeemed)
+        record_ticket_status_change(db, revenue, "confirmed", "used", len(redeemed))
+
+    rest = [code for code in unique if code not in outcomes]
+    if rest:
+        for ticket in db.scalars(select(Ticket).where(Ticket.confirmation_code.in_(rest))):
+            if event_id is not None and ticket.event_id != event_id:
+                outcome = "wrong_event"
+            elif ticket.status == "cancelled":
+                outcome = "cancelled"
+            else:
+                outcome = "already_used"
+            outcomes[ticket.confirmation_code] = (outcome, ticket)
+    for code in codes:
+        outcomes.setdefault(code, ("not_found", None))
+    return outcomes
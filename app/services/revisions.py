@@ -0,0 +1,33 @@
+"""
+Table revision counters.
+
+Writes to a table bump its ``table_revisions`` row inside the same
+transaction, so a read route can tell whether anything it depends on has
+changed by looking up a couple of primary keys instead of re-running its
+query (see ``app/conditional.py``).
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import TableRevision
+
+
+def bump_revisions(db: Session, *tables: str) -> None:
+    """Record a write to each of ``tables``"""
+    now = datetime.now(timezone.utc)
+    result = db.execute(
+        update(TableRevision)
+        .where(TableRevision.table_name.in_(tables))
+        .values(revision=TableRevision.revision + 1, updated_at=now)
+    )
+    if result.rowcount == len(tables):
+        return
+    # First write since the table was created
+    existing = set(db.scalars(select(TableRevision.table_name).where(TableRevision.table_name.in_(tables))))
+    missing = [table for table in tables if table not in existing]
+    db.execute(
+        insert(TableRevision),
+        [{"table_name": table, "revision": 1, "updated_at": now} for table in missing],
+    )
@@ -0,0 +1,140 @@
+"""
+Per-event sales rollup.
+
+``ticket_sales`` holds one row per (event, ticket type): live tickets sold,
+cancellations and live revenue. Purchases and cancellations apply their
+deltas inside the same transaction with a single upsert, so availability
+reads look up a handful of rows by primary key instead of grouping over
+``tickets``. Seats left come from ``event_inventory``, which purchases
+already keep exact.
+"""
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Venue, Event, Ticket, EventInventory, TicketSales
+from ..models.event_inventory import availability_status
+from .dialects import on_conflict_insert
+
+COUNTERS = ("sold", "cancelled", "revenue")
+
+# (event_id, ticket_type) -> (sold, cancelled, revenue) deltas
+SalesDeltas = Dict[Tuple[int, str], Tuple[int, int, Decimal]]
+
+
+def _add_counters(db: Session, model, rows: List[dict]) -> None:
+    """Add each row's counters onto the row with the same primary key, creating missing ones"""
+    keys = [column.name for column in model.__table__.primary_key]
+    # A fixed order, so concurrent writers lock rows the same way round
+    rows = sorted(rows, key=lambda row: [row[key] for key in keys])
+    statement = on_conflict_insert(db, model)
+    if statement is not None:
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in COUNTERS},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        result = db.execute(
+            update(model)
+            .where(*(getattr(model, key) == row[key] for key in keys))
+            .values({name: getattr(model, name) + row[name] for name in COUNTERS})
+        )
+        if not result.rowcount:
+            db.execute(insert(model).values(**row))
+
+
+def _apply_sales(db: Session, deltas: SalesDeltas) -> None:
+    _add_counters(db, TicketSales, [
+        {"event_id": event_id, "ticket_type": ticket_type, "sold": sold, "cancelled": cancelled, "revenue": revenue}
+        for (event_id, ticket_type), (sold, cancelled, revenue) in deltas.items()
+    ])
+
+
+def record_sales(db: Session, tickets: Iterable) -> None:
+    """Add newly purchased tickets (anything with event_id, ticket_type and price) to the rollup"""
+    deltas: SalesDeltas = {}
+    for ticket in tickets:
+        key = (ticket.event_id, ticket.ticket_type)
+        sold, cancelled, revenue = deltas.get(key, (0, 0, Decimal("0")))
+        deltas[key] = (sold + 1, cancelled, revenue + Decimal(ticket.price))
+    if deltas:
+        _apply_sales(db, deltas)
+
+
+def record_sale_cancelled(db: Session, event_id: int, ticket_type: str, price: Decimal) -> None:
+    """Move a cancelled ticket out of its type's sold count and revenue"""
+    _apply_sales(db, {(event_id, ticket_type): (-1, 1, -Decimal(price))})
+
+
+def rebuild_ticket_sales(db: Session) -> None:
+    """Recompute the rollup from the tickets table in one grouped pass"""
+    db.flush()
+    live = Ticket.status != "cancelled"
+    rows = db.execute(
+        select(
+            Ticket.event_id,
+            Ticket.ticket_type,
+            func.count(Ticket.id).filter(live),
+            func.count(Ticket.id).filter(Ticket.status == "cancelled"),
+            func.coalesce(func.sum(Ticket.price).filter(live), 0),
+        )
+        .where(Ticket.ticket_type.isnot(None))
+        .group_by(Ticket.event_id, Ticket.ticket_type)
+    ).all()
+    db.execute(delete(TicketSales))
+    if rows:
+        db.execute(
+            insert(TicketSales),
+            [
+                {"event_id": event_id, "ticket_type": ticket_type, "sold": sold, "cancelled": cancelled, "revenue": revenue}
+                for event_id, ticket_type, sold, cancelled, revenue in rows
+            ],
+        )
+
+
+def get_event_availability(db: Session, event_id: int) -> Optional[dict]:
+    """Seats and per-type sales for an event, or None when it does not exist"""
+    # Events nobody has bought into since seat inventories were added have
+    # no inventory row yet; derive theirs the way the first purchase will
+    sold = (
+        select(func.coalesce(func.sum(TicketSales.sold), 0))
+        .where(TicketSales.event_id == Event.id)
+        .scalar_subquery()
+    )
+    capacity = func.coalesce(EventInventory.capacity, Venue.capacity)
+    remaining = func.coalesce(EventInventory.remaining, Venue.capacity - sold)
+    row = db.execute(
+        select(
+            capacity,
+            func.coalesce(EventInventory.sold, sold),
+            func.coalesce(EventInventory.held, 0),
+            remaining,
+            availability_status(remaining, capacity),
+        )
+        .select_from(Event)
+        .join(Venue, Venue.id == Event.venue_id)
+        .outerjoin(EventInventory, EventInventory.event_id == Event.id)
+        .where(Event.id == event_id)
+    ).first()
+    if row is None:
+        return None
+    capacity, sold, held, remaining, status = row
+    types = db.scalars(
+        select(TicketSales).where(TicketSales.event_id == event_id).order_by(TicketSales.ticket_type)
+    ).all()
+    return {
+        "event_id": event_id,
+        "capacity": capacity,
+        "sold": sold,
+        "held": held,
+        "remaining": remaining,
+        "status": status,
+        "revenue": sum((sales.revenue for sales in types), Decimal("0")),
+        "ticket_types": types,
+    }
@@ -0,0 +1,141 @@
+"""
+Event and venue search.
+
+On SQLite, searches run against the FTS5 indexes defined in
+``app.models.search_index``: every word of the query is prefix-matched,
+results are ranked with bm25 and come back with highlighted snippets. Other
+backends fall back to ILIKE filtering with snippets built in Python.
+"""
+import re
+from typing import List, Optional
+
+from sqlalchemy import false, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from ..models import Event, Venue
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query that prefix-matches every word"""
+    terms = re.findall(r"\w+", search)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _uses_fts(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _fts_filter(id_column, index: str, match: str):
+    return id_column.in_(
+        select(literal_column("rowid"))
+        .select_from(text(index))
+        .where(literal_column(index).op("MATCH")(match))
+    )
+
+
+def event_search_filter(db: Session, search: str):
+    """WHERE criterion matching events whose title or description contains ``search``"""
+    match = build_match_query(search)
+    if _uses_fts(db):
+        return _fts_filter(Event.id, "events_fts", match) if match else false()
+    term = f"%{search}%"
+    return or_(Event.title.ilike(term), Event.description.ilike(term))
+
+
+def venue_search_filter(db: Session, search: str):
+    """WHERE criterion matching venues whose name contains ``search``"""
+    match = build_match_query(search)
+    if _uses_fts(db):
+        return _fts_filter(Venue.id, "venues_fts", match) if match else false()
+    return Venue.name.ilike(f"%{search}%")
+
+
+def _highlight(value: Optional[str], search: str) -> Optional[str]:
+    """Fallback snippet: a window of ``value`` around the first hit, hits marked"""
+    if not value:
+        return value
+    terms = [re.escape(term) for term in re.findall(r"\w+", search)]
+    if not terms:
+        return value[:200]
+    pattern = re.compile("|".join(terms), re.IGNORECASE)
+    first = pattern.search(value)
+    start = max(0, first.start() - 60) if first else 0
+    window = value[start:start + 200]
+    marked = pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}", window)
+    return ("…" if start else "") + marked + ("…" if start + 200 < len(value) else "")
+
+
+def search_events(db: Session, search: str, limit: int = 20) -> List[dict]:
+    """Ranked event search hits with a highlighted snippet"""
+    match = build_match_query(search)
+    if not match:
+        return []
+    if _uses_fts(db):
+        rows = db.execute(
+            text(
+                "SELECT e.id, e.title, e.category, e.event_date, e.venue_id, "
+                f"snippet(events_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_TOKENS}) AS snippet, "
+                "bm25(events_fts, 10.0, 1.0) AS rank "
+                "FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+                "WHERE events_fts MATCH :match ORDER BY rank LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    events = (
+        db.query(Event)
+        .filter(event_search_filter(db, search))
+        .order_by(Event.id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": e.id,
+            "title": e.title,
+            "category": e.category,
+            "event_date": e.event_date,
+            "venue_id": e.venue_id,
+            "snippet": _highlight(e.description, search) or _highlight(e.title, search),
+            "rank": None,
+        }
+        for e in events
+    ]
+
+
+def search_venues(db: Session, search: str, limit: int = 20) -> List[dict]:
+    """Ranked venue search hits with a highlighted snippet"""
+    match = build_match_query(search)
+    if not match:
+        return []
+    if _uses_fts(db):
+        rows = db.execute(
+            text(
+                "SELECT v.id, v.name, v.city, "
+                f"highlight(venues_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') AS snippet, "
+                "bm25(venues_fts) AS rank "
+                "FROM venues_fts JOIN venues v ON v.id = venues_fts.rowid "
+                "WHERE venues_fts MATCH :match ORDER BY rank LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    venues = (
+        db.query(Venue)
+        .filter(venue_search_filter(db, search))
+        .order_by(Venue.id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"id": v.id, "name": v.name, "city": v.city, "snippet": _highlight(v.name, search), "rank": None}
+        for v in venues
+    ]
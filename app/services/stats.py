@@ -0,0 +1,147 @@
+"""
+Ticket statistics engine.
+
+The dashboard totals are served from the ``ticket_stats`` summary table, which
+holds one row per ticket status, and ``row_counts``, which holds the number of
+venues and events. Every write that creates, re-statuses or removes tickets,
+venues or events applies its delta to the summaries inside the same
+transaction, so reading the totals never touches the tables they count and
+never writes. The migrations build both summaries, and ``seed.py``, the
+importer and the benchmark generator rebuild them after bulk loads.
+"""
+from decimal import Decimal
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Venue, Event, Ticket, TicketStats, RowCount
+
+TICKET_STATUSES = ("confirmed", "cancelled", "used")
+COUNTED_TABLES = {"venues": Venue, "events": Event}
+
+
+def rebuild_ticket_stats(db: Session) -> None:
+    """Recompute the ticket_stats summary from the tickets table in one grouped pass"""
+    db.flush()
+    totals = {status: (0, Decimal("0")) for status in TICKET_STATUSES}
+    rows = db.execute(
+        select(Ticket.status, func.count(Ticket.id), func.coalesce(func.sum(Ticket.price), 0))
+        .where(Ticket.status.isnot(None))
+        .group_by(Ticket.status)
+    ).all()
+    for status, count, revenue in rows:
+        totals[status] = (count, revenue)
+
+    db.execute(delete(TicketStats))
+    db.execute(
+        insert(TicketStats),
+        [
+            {"status": status, "ticket_count": count, "revenue": revenue}
+            for status, (count, revenue) in totals.items()
+        ],
+    )
+
+
+def _apply_deltas(db: Session, deltas: Dict[str, Tuple[int, Decimal]]) -> None:
+    """Add per-status (count, revenue) deltas to the summary"""
+    db.flush()
+    for status, (count, revenue) in deltas.items():
+        result = db.execute(
+            update(TicketStats)
+            .where(TicketStats.status == status)
+            .values(
+                ticket_count=TicketStats.ticket_count + count,
+                revenue=TicketStats.revenue + revenue,
+            )
+        )
+        if result.rowcount:
+            continue
+        if db.scalar(select(TicketStats.status).limit(1)) is None:
+            # The summary was never built (e.g. the database predates it).
+            # The pending change is already flushed, so a rebuild covers it.
+            rebuild_ticket_stats(db)
+            return
+        db.execute(
+            insert(TicketStats).values(status=status, ticket_count=count, revenue=revenue)
+        )
+
+
+def record_ticket_purchase(db: Session, price: Decimal, quantity: int = 1) -> None:
+    """Count newly purchased (confirmed) tickets; ``price`` is their combined price"""
+    _apply_deltas(db, {"confirmed": (quantity, Decimal(price))})
+
+
+def record_ticket_status_change(
+    db: Session, price: Decimal, old_status: str, new_status: str, quantity: int = 1
+) -> None:
+    """Move tickets between status rows of the summary; ``price`` is their combined price"""
+    if old_status == new_status:
+        return
+    price = Decimal(price)
+    _apply_deltas(db, {old_status: (-quantity, -price), new_status: (quantity, price)})
+
+
+def record_tickets_removed(db: Session, *criteria) -> None:
+    """Subtract tickets matching ``criteria`` before they are deleted"""
+    rows = db.execute(
+        select(Ticket.status, func.count(Ticket.id), func.coalesce(func.sum(Ticket.price), 0))
+        .where(Ticket.status.isnot(None), *criteria)
+        .group_by(Ticket.status)
+    ).all()
+    if rows:
+        _apply_deltas(db, {status: (-count, -Decimal(revenue)) for status, count, revenue in rows})
+
+
+def rebuild_row_counts(db: Session) -> None:
+    """Recompute the row_counts summary with one COUNT per counted table"""
+    db.flush()
+    counts = [
+        {"table_name": table, "row_count": db.scalar(select(func.count()).select_from(model))}
+        for table, model in COUNTED_TABLES.items()
+    ]
+    db.execute(delete(RowCount))
+    db.execute(insert(RowCount), counts)
+
+
+def record_row_counts(db: Session, **deltas: int) -> None:
+    """Add row count deltas, e.g. ``venues=-1, events=-3``, once the rows are flushed"""
+    db.flush()
+    for table, delta in deltas.items():
+        result = db.execute(
+            update(RowCount)
+            .where(RowCount.table_name == table)
+            .values(row_count=RowCount.row_count + delta)
+        )
+        if not result.rowcount:
+            # The summary was never built; the change is flushed, so a rebuild covers it
+            rebuild_row_counts(db)
+            return
+
+
+def _row_count(table: str):
+    return select(RowCount.row_count).where(RowCount.table_name == table).scalar_subquery()
+
+
+def _ticket_total(column, *criteria):
+    return select(func.coalesce(func.sum(column), 0)).where(*criteria).scalar_subquery()
+
+
+def get_dashboard_totals(db: Session) -> dict:
+    """Read every dashboard total from the summaries in a single statement"""
+    total_venues, total_events, total_tickets, total_revenue, confirmed, cancelled = db.execute(select(
+        _row_count("venues"),
+        _row_count("events"),
+        _ticket_total(TicketStats.ticket_count),
+        _ticket_total(TicketStats.revenue, TicketStats.status != "cancelled"),
+        _ticket_total(TicketStats.ticket_count, TicketStats.status == "confirmed"),
+        _ticket_total(TicketStats.ticket_count, TicketStats.status == "cancelled"),
+    )).one()
+    return {
+        "total_venues": total_venues or 0,
+        "total_events": total_events or 0,
+        "total_tickets": int(total_tickets or 0),
+        "total_revenue": float(total_revenue or 0),
+        "confirmed_tickets": int(confirmed or 0),
+        "cancelled_tickets": int(cancelled or 0),
+    }
@@ -0,0 +1,186 @@
+"""
+Sales time series.
+
+``sales_buckets`` holds sales per event per UTC hour and per UTC day, keyed
+on purchase time. Purchases add to both grains and cancellations take the
+ticket back out of the buckets it was bought in, inside the same
+transaction, so a chart over any range sums pre-aggregated rows instead of
+scanning tickets: hourly series read hour buckets, daily and weekly series
+day buckets. Venue, city and category series join each bucket to its event,
+so they follow the event's current venue and category.
+
+``rebuild_sales_buckets`` recomputes buckets from ``tickets`` with one
+grouped ``INSERT ... SELECT`` per grain (``scripts/backfill_sales_buckets.py``).
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select, type_coerce
+from sqlalchemy.orm import Session
+
+from ..models import Venue, Event, Ticket, SalesBucket
+from .sales import _add_counters
+
+GRAINS = ("hour", "day")
+# Series interval -> the grain of bucket it is summed from
+INTERVALS = {"hour": "hour", "day": "day", "week": "day"}
+GROUPS = {
+    "event": SalesBucket.event_id,
+    "venue": Event.venue_id,
+    "city": Venue.city,
+    "category": Event.category,
+}
+
+
+def _bucket_start(value: datetime, grain: str) -> datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if grain == "day" else value
+
+
+def _truncated(db: Session, column, grain: str):
+    """SQL for ``column`` truncated to the grain, equal to what ``_bucket_start`` stores"""
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLAlchemy stores SQLite datetimes as text with microseconds
+        hour = "%H" if grain == "hour" else "00"
+        return func.strftime(f"%Y-%m-%d {hour}:00:00.000000", column)
+    return func.date_trunc(grain, column)
+
+
+def _week_start(db: Session, column):
+    """SQL for the Monday starting the week of a day bucket"""
+    if db.get_bind().dialect.name == "sqlite":
+        monday = func.strftime("%Y-%m-%d 00:00:00.000000", column, "weekday 0", "-6 days")
+        return type_coerce(monday, DateTime(timezone=True))
+    return func.date_trunc("week", column)
+
+
+def _bucket_rows(deltas: Dict[Tuple[str, datetime, int], Tuple[int, int, Decimal]]) -> List[dict]:
+    return [
+        {"grain": grain, "bucket_start": start, "event_id": event_id, "sold": sold, "cancelled": cancelled, "revenue": revenue}
+        for (grain, start, event_id), (sold, cancelled, revenue) in deltas.items()
+    ]
+
+
+def record_sales_buckets(db: Session, tickets: Iterable[Ticket]) -> None:
+    """Add newly purchased tickets to the hour and day buckets of their purchase time"""
+    deltas: Dict[Tuple[str, datetime, int], Tuple[int, int, Decimal]] = {}
+    for ticket in tickets:
+        if ticket.purchase_date is None:
+            continue
+        for grain in GRAINS:
+            key = (grain, _bucket_start(ticket.purchase_date, grain), ticket.event_id)
+            sold, cancelled, revenue = deltas.get(key, (0, 0, Decimal("0")))
+            deltas[key] = (sold + 1, cancelled, revenue + Decimal(ticket.price))
+    if deltas:
+        _add_counters(db, SalesBucket, _bucket_rows(deltas))
+
+
+def record_bucket_cancelled(db: Session, ticket: Ticket) -> None:
+    """Move a cancelled ticket out of the sold count and revenue of its purchase buckets"""
+    if ticket.purchase_date is None:
+        return
+    _add_counters(db, SalesBucket, _bucket_rows({
+        (grain, _bucket_start(ticket.purchase_date, grain), ticket.event_id): (-1, 1, -Decimal(ticket.price))
+        for grain in GRAINS
+    }))
+
+
+def rebuild_sales_buckets(db: Session, since: Optional[datetime] = None) -> int:
+    """Recompute buckets from tickets, every one or those from ``since`` (midnight UTC) on
+
+    Returns the number of buckets written.
+    """
+    db.flush()
+    deletion = delete(SalesBucket)
+    if since is not None:
+        deletion = deletion.where(SalesBucket.bucket_start >= since)
+    db.execute(deletion)
+
+    live = Ticket.status != "cancelled"
+    written = 0
+    for grain in GRAINS:
+        bucket = _truncated(db, Ticket.purchase_date, grain)
+        source = (
+            select(
+                literal(grain),
+                bucket,
+                Ticket.event_id,
+                func.count(Ticket.id).filter(live),
+                func.count(Ticket.id).filter(Ticket.status == "cancelled"),
+                func.coalesce(func.sum(Ticket.price).filter(live), 0),
+            )
+            .where(Ticket.purchase_date.isnot(None))
+            .group_by(bucket, Ticket.event_id)
+        )
+        if since is not None:
+            # The index narrows the scan; the exact cut is on the bucket itself
+            source = source.where(Ticket.purchase_date >= since - timedelta(days=1)).having(bucket >= since)
+        result = db.execute(
+            insert(SalesBucket).from_select(
+                ["grain", "bucket_start", "event_id", "sold", "cancelled", "revenue"], source
+            )
+        )
+        written += result.rowcount
+    return written
+
+
+def get_sales_timeseries(
+    db: Session,
+    interval: str,
+    start: datetime,
+    end: datetime,
+    group_by: Optional[str] = None,
+    event_id: Optional[int] = None,
+    venue_id: Optional[int] = None,
+    city: Optional[str] = None,
+    category: Optional[str] = None,
+) -> List[dict]:
+    """Sales per ``interval`` bucket in [start, end), optionally per event, venue, city or category"""
+    if interval == "week":
+        bucket = _week_start(db, SalesBucket.bucket_start)
+    else:
+        bucket = SalesBucket.bucket_start
+    keys = [bucket, GROUPS[group_by]] if group_by else [bucket]
+    statement = (
+        select(
+            *keys,
+            func.sum(SalesBucket.sold),
+            func.sum(SalesBucket.cancelled),
+            func.sum(SalesBucket.revenue),
+        )
+        .select_from(SalesBucket)
+        .where(
+            SalesBucket.grain == INTERVALS[interval],
+            SalesBucket.bucket_start >= start,
+            SalesBucket.bucket_start < end,
+        )
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    needs_venue = bool(city) or group_by == "city"
+    if needs_venue or venue_id or category or group_by in ("venue", "category"):
+        statement = statement.join(Event, Event.id == SalesBucket.event_id)
+    if needs_venue:
+        statement = statement.join(Venue, Venue.id == Event.venue_id)
+    if event_id:
+        statement = statement.where(SalesBucket.event_id == event_id)
+    if venue_id:
+        statement = statement.where(Event.venue_id == venue_id)
+    if city:
+        statement = statement.where(Venue.city == city)
+    if category:
+        statement = statement.where(Event.category == category)
+
+    points = []
+    for row in db.execute(statement):
+        bucket_start, *key = row[:len(keys)]
+        sold, cancelled, revenue = row[len(keys):]
+        points.append({
+            "bucket": bucket_start,
+            "group": key[0] if key else None,
+            "sold": sold,
+            "cancelled": cancelled,
+            "revenue": float(revenue),
+        })
+    return points
@@ -0,0 +1,345 @@
+"""
+Virtual waiting room for high-demand on-sales.
+
+Opening a queue for an event (``POST /events/{id}/queue``) makes it hot:
+from then on ``POST /tickets`` and ``POST /tickets/batch`` only accept its
+tickets from buyers holding an admission token, sent in the
+``X-Admission-Token`` header (comma-separated for a batch spanning hot
+events). Buyers join with ``POST /events/{id}/queue/join`` and get a
+queue token and a place in line; polling ``GET /events/{id}/queue/{token}``
+(or streaming ``.../stream`` as server-sent events) reports how many are
+ahead until their turn comes, when the answer carries an admission token
+valid for ``ADMISSION_TTL_SECONDS`` and good for one purchase request.
+
+Admission advances at the queue's rate, in buyers per second, but never
+past the last buyer to join, so a queue that sat idle does not let a
+sudden crowd in at once. A rate of 0 holds the queue: buyers can line up
+ahead of the on-sale, and changing the rate starts letting them in. Purchases of a hot event therefore reach the
+database at most at the admission rate, however many buyers arrive.
+Joining and polling never touch the database.
+
+Tokens are signed with ``WAITING_ROOM_SECRET`` (HMAC-SHA256) and name the
+queue they came from, so reopening a queue invalidates the old ones.
+Queue state lives in a ``WaitingRoomStore``: ``MemoryWaitingRoomStore``
+keeps it per process (one worker), ``RedisWaitingRoomStore`` shares it
+between workers with atomic server-side scripts.
+"""
+import hashlib
+import hmac
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Protocol, Set
+
+from fastapi import HTTPException, Request
+
+from .config import Settings, get_settings
+
+ADMISSION_HEADER = "X-Admission-Token"
+
+
+class QueueState(NamedTuple):
+    rate: float
+    admitted: float  # buyers let in so far; fractional between admissions
+    joined: int
+    number: int  # the place taken by a join, counting from 0; -1 otherwise
+    epoch: int  # tells this opening of the queue from earlier ones
+
+
+class WaitingRoomStore(Protocol):
+    """Where queues live"""
+
+    async def open(self, event_id: int, rate: float) -> QueueState:
+        """Open the event's queue, or change its rate"""
+        ...
+
+    async def close(self, event_id: int) -> None: ...
+
+    async def advance(self, event_id: int, join: bool = False) -> Optional[QueueState]:
+        """Admit buyers for the time passed and optionally join; None when there is no queue"""
+        ...
+
+    async def consume(self, event_id: int, epoch: int, number: int) -> Optional[bool]:
+        """Spend an admission: False when already spent, None when that queue is gone"""
+        ...
+
+
+class _Queue:
+    __slots__ = ("rate", "admitted", "stamp", "joined", "epoch", "used")
+
+    def __init__(self, rate: float, now: float):
+        self.rate = rate
+        self.admitted = 0.0
+        self.stamp = now
+        self.joined = 0
+        self.epoch = int(now * 1000)
+        self.used: Set[int] = set()
+
+    def advance(self, now: float) -> None:
+        self.admitted = min(self.joined, self.admitted + max(0.0, now - self.stamp) * self.rate)
+        self.stamp = now
+
+
+class MemoryWaitingRoomStore:
+    """Per-process queues"""
+
+    def __init__(self):
+        self._queues: Dict[int, _Queue] = {}
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    async def open(self, event_id: int, rate: float) -> QueueState:
+        now = time.time()
+        queue = self._queues.get(event_id)
+        if queue is None:
+            queue = self._queues[event_id] = _Queue(rate, now)
+        else:
+            queue.advance(now)
+            queue.rate = rate
+        return QueueState(queue.rate, queue.admitted, queue.joined, -1, queue.epoch)
+
+    async def close(self, event_id: int) -> None:
+        self._queues.pop(event_id, None)
+
+    async def advance(self, event_id: int, join: bool = False) -> Optional[QueueState]:
+        queue = self._queues.get(event_id)
+        if queue is None:
+            return None
+        queue.advance(time.time())
+        number = -1
+        if join:
+            number = queue.joined
+            queue.joined += 1
+        return QueueState(queue.rate, queue.admitted, queue.joined, number, queue.epoch)
+
+    async def consume(self, event_id: int, epoch: int, number: int) -> Optional[bool]:
+        queue = self._queues.get(event_id)
+        if queue is None or queue.epoch != epoch:
+            return None
+        if number in queue.used:
+            return False
+        queue.used.add(number)
+        return True
+
+
+# Admit for the time passed (server clock) and optionally join or set the
+# rate, atomically; setting the rate of a missing queue opens it
+ADVANCE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'rate', 'admitted', 'stamp', 'joined', 'epoch')
+if not state[1] then
+    if ARGV[2] == '' then
+        return false
+    end
+    state = {ARGV[2], '0', tostring(now), '0', tostring(math.floor(now * 1000))}
+    redis.call('DEL', KEYS[2])
+    redis.call('HSET', KEYS[1], 'epoch', state[5])
+end
+local joined = tonumber(state[4])
+local admitted = math.min(joined, tonumber(state[2]) + math.max(0, now - tonumber(state[3])) * tonumber(state[1]))
+local number = -1
+if ARGV[1] == 'join' then
+    number = joined
+    joined = joined + 1
+end
+if ARGV[2] ~= '' then
+    state[1] = ARGV[2]
+end
+redis.call('HSET', KEYS[1], 'rate', state[1], 'admitted', tostring(admitted), 'stamp', tostring(now), 'joined', joined)
+return {state[1], tostring(admitted), joined, number, state[5]}
+"""
+
+# Spend an admission of the queue's current opening only
+CONSUME_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'epoch') ~= ARGV[1] then
+    return -1
+end
+return redis.call('SADD', KEYS[2], ARGV[2])
+"""
+
+
+class RedisWaitingRoomStore:
+    """Queues shared by every worker through Redis"""
+
+    def __init__(self, client, prefix: str = "tickettou:queue:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _keys(self, event_id: int) -> List[str]:
+        return [f"{self.prefix}{event_id}", f"{self.prefix}{event_id}:used"]
+
+    async def _advance(self, event_id: int, join: bool, rate: str = "") -> Optional[QueueState]:
+        state = await self.client.eval(ADVANCE_SCRIPT, 2, *self._keys(event_id), "join" if join else "peek", rate)
+        if not state:
+            return None
+        rate, admitted, joined, number, epoch = state
+        return QueueState(float(rate), float(admitted), int(joined), int(number), int(epoch))
+
+    async def open(self, event_id: int, rate: float) -> QueueState:
+        return await self._advance(event_id, False, repr(rate))
+
+    async def close(self, event_id: int) -> None:
+        await self.client.delete(*self._keys(event_id))
+
+    async def advance(self, event_id: int, join: bool = False) -> Optional[QueueState]:
+        return await self._advance(event_id, join)
+
+    async def consume(self, event_id: int, epoch: int, number: int) -> Optional[bool]:
+        added = await self.client.eval(CONSUME_SCRIPT, 2, *self._keys(event_id), epoch, number)
+        return None if int(added) < 0 else bool(int(added))
+
+
+class WaitingRoom:
+    """Queues, tokens and purchase admission over a WaitingRoomStore (None disables it)"""
+
+    def __init__(self, store: Optional[WaitingRoomStore], secret: bytes, admission_ttl: int, poll_seconds: int):
+        self.store = store
+        self.secret = secret
+        self.admission_ttl = admission_ttl
+        self.poll_seconds = poll_seconds
+        self.joins = 0
+        self.admissions = 0
+        self.admitted_purchases = 0
+        self.rejected_purchases = 0
+
+    def _sign(self, *parts: object) -> str:
+        payload = ".".join(str(part) for part in parts)
+        mac = hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        return f"{payload}.{mac}"
+
+    def _read(self, token: str, kind: str) -> Optional[List[int]]:
+        """The numbers signed into a token of ``kind``, or None when it is not one"""
+        payload, _, mac = token.rpartition(".")
+        expected = hmac.new(self.secret, payload.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(mac.encode(), expected.encode()):
+            return None
+        token_kind, *numbers = payload.split(".")
+        if token_kind != kind:
+            return None
+        return [int(number) for number in numbers]
+
+    def _position(self, event_id: int, state: QueueState, number: int) -> dict:
+        admitted = number < int(state.admitted)
+        position = {
+            "event_id": event_id,
+            "queue_token": self._sign("q", event_id, state.epoch, number),
+            "admitted": admitted,
+            "ahead": 0 if admitted else number - int(state.admitted),
+            "estimated_wait_seconds": None,
+            "poll_after_seconds": None if admitted else self.poll_seconds,
+            "admission_token": None,
+            "admission_expires_at": None,
+        }
+        if state.rate and not admitted:
+            position["estimated_wait_seconds"] = round((number + 1 - state.admitted) / state.rate, 1)
+        if admitted:
+            position["estimated_wait_seconds"] = 0.0
+            expires = int(time.time()) + self.admission_ttl
+            position["admission_token"] = self._sign("a", event_id, state.epoch, number, expires)
+            position["admission_expires_at"] = datetime.fromtimestamp(expires, timezone.utc)
+            self.admissions += 1
+        return position
+
+    async def open(self, event_id: int, rate: float) -> QueueState:
+        if self.store is None:
+            raise HTTPException(status_code=409, detail="The waiting room is disabled")
+        return await self.store.open(event_id, rate)
+
+    async def close(self, event_id: int) -> None:
+        if self.store is not None:
+            await self.store.close(event_id)
+
+    async def state(self, event_id: int) -> Optional[QueueState]:
+        if self.store is None:
+            return None
+        return await self.store.advance(event_id)
+
+    async def join(self, event_id: int) -> Optional[dict]:
+        """A new place at the back of the event's queue, or None when it has no queue"""
+        state = await self.store.advance(event_id, join=True) if self.store is not None else None
+        if state is None:
+            return None
+        self.joins += 1
+        return self._position(event_id, state, state.number)
+
+    async def position(self, event_id: int, queue_token: str) -> Optional[dict]:
+        """Where a queue token stands, with an admission token once it is through; None when the queue is gone"""
+        numbers = self._read(queue_token, "q")
+        if numbers is None or len(numbers) != 3 or numbers[0] != event_id:
+            raise HTTPException(status_code=403, detail="Invalid queue token")
+        _, epoch, number = numbers
+        state = await self.state(event_id)
+        if state is None or state.epoch != epoch:
+            return None
+        return self._position(event_id, state, number)
+
+    async def admit(self, request: Request, event_ids: Iterable[int]) -> None:
+        """Spend the request's admission token for each event with a queue, or raise 403"""
+        if self.store is None:
+            return
+        admissions = {}
+        for token in request.headers.get(ADMISSION_HEADER, "").split(","):
+            numbers = self._read(token.strip(), "a")
+            if numbers is not None and len(numbers) == 4:
+                event_id, epoch, number, expires = numbers
+                admissions[event_id] = (epoch, number, expires)
+
+        for event_id in sorted(set(event_ids)):
+            admission = admissions.get(event_id)
+            if admission is not None:
+                epoch, number, expires = admission
+                if expires < time.time():
+                    self._reject("Admission token has expired")
+                spent = await self.store.consume(event_id, epoch, number)
+                if spent is False:
+                    self._reject("Admission token has already been used")
+                if spent:
+                    self.admitted_purchases += 1
+                    continue
+            # No token, or one from a queue that has since closed
+            if await self.store.advance(event_id) is not None:
+                self._reject("This event has a waiting room; join its queue for an admission token")
+
+    def _reject(self, detail: str) -> None:
+        self.rejected_purchases += 1
+        raise HTTPException(status_code=403, detail=detail)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__ if self.store is not None else None,
+            "queues": len(self.store) if isinstance(self.store, MemoryWaitingRoomStore) else None,
+            "joins": self.joins,
+            "admissions": self.admissions,
+            "admitted_purchases": self.admitted_purchases,
+            "rejected_purchases": self.rejected_purchases,
+        }
+
+
+def create_waiting_room_store(settings: Settings) -> Optional[WaitingRoomStore]:
+    """The store named by WAITING_ROOM_BACKEND: memory, redis or none"""
+    if settings.waiting_room_backend == "memory":
+        return MemoryWaitingRoomStore()
+    if settings.waiting_room_backend == "redis":
+        if not settings.waiting_room_secret:
+            raise RuntimeError("WAITING_ROOM_BACKEND=redis requires WAITING_ROOM_SECRET, shared by every worker")
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("WAITING_ROOM_BACKEND=redis requires the redis package")
+        return RedisWaitingRoomStore(
+            redis.from_url(settings.waiting_room_url or settings.cache_url, decode_responses=True)
+        )
+    if settings.waiting_room_backend == "none":
+        return None
+    raise ValueError(f"Unknown WAITING_ROOM_BACKEND {settings.waiting_room_backend!r}")
+
+
+settings = get_settings()
+waiting_room = WaitingRoom(
+    create_waiting_room_store(settings),
+    (settings.waiting_room_secret or secrets.token_hex(32)).encode(),
+    settings.admission_ttl_seconds,
+    settings.queue_poll_seconds,
+)
@@ -0,0 +1,100 @@
+"""
+Benchmark results and baselines.
+
+``bench_routes.py`` and ``load_routes.py`` summarize each case as request
+count, p50/p95/p99 latency in milliseconds and requests per second. With
+``--save`` they write the summaries, and the settings and dataset they were
+taken with, to a JSON file. With ``--compare`` they check a run against
+such a file and flag every case whose latency percentiles grew, or whose
+requests per second fell, by more than the tolerance. Each benchmark picks
+the metrics it compares: one request at a time only the median is stable
+enough, under concurrent load p95 and throughput are the point. Latency
+changes smaller than MIN_DELTA_MS are ignored as noise.
+
+Baselines only mean something on the same machine and dataset; comparing
+runs taken with different settings prints a warning.
+"""
+import json
+import math
+import statistics
+from typing import Dict, List, Optional, Sequence
+
+MIN_DELTA_MS = 0.5
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies_ms: List[float], seconds: Optional[float] = None) -> dict:
+    """Percentiles of one case; requests per second over ``seconds``, or back to back"""
+    ordered = sorted(latencies_ms)
+    total = seconds if seconds is not None else sum(ordered) / 1000
+    return {
+        "requests": len(ordered),
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p95": round(percentile(ordered, 0.95), 3),
+        "p99": round(percentile(ordered, 0.99), 3),
+        "mean": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "rps": round(len(ordered) / total, 1) if total else 0.0,
+    }
+
+
+def print_table(results: Dict[str, dict]) -> None:
+    width = max((len(label) for label in results), default=10) + 2
+    print(f"{'case':<{width}}{'requests':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>10}")
+    for label, summary in results.items():
+        print(
+            f"{label:<{width}}{summary['requests']:>9}{summary['p50']:>9.2f}"
+            f"{summary['p95']:>9.2f}{summary['p99']:>9.2f}{summary['rps']:>10.1f}"
+        )
+
+
+def save(path: str, settings: dict, results: Dict[str, dict]) -> None:
+    with open(path, "w") as file:
+        json.dump({"settings": settings, "results": results}, file, indent=2, sort_keys=True)
+    print(f"Saved {len(results)} cases to {path}")
+
+
+def regressions(path: str, settings: dict, results: Dict[str, dict], tolerance: float,
+                metrics: Sequence[str]) -> List[str]:
+    """Cases in ``results`` more than ``tolerance`` (0.2 = 20%) worse on ``metrics`` than the baseline at ``path``"""
+    with open(path) as file:
+        baseline = json.load(file)
+    if baseline["settings"] != settings:
+        print(f"! baseline was taken with {baseline['settings']}, this run with {settings}")
+    found = []
+    for label, summary in results.items():
+        before = baseline["results"].get(label)
+        if before is None:
+            continue
+        for metric in metrics:
+            if metric == "rps":
+                if summary["rps"] < before["rps"] / (1 + tolerance):
+                    found.append(f"{label}: {before['rps']:.1f} -> {summary['rps']:.1f} req/s")
+            elif summary[metric] > before[metric] * (1 + tolerance) and summary[metric] - before[metric] > MIN_DELTA_MS:
+                found.append(f"{label}: {metric} {before[metric]:.2f} -> {summary[metric]:.2f} ms")
+    missing = sorted(set(baseline["results"]) - set(results))
+    if missing:
+        print(f"! {len(missing)} baseline case(s) not in this run: {', '.join(missing)}")
+    return found
+
+
+def report(path: Optional[str], compare: Optional[str], tolerance: float, settings: dict,
+           results: Dict[str, dict], metrics: Sequence[str]) -> bool:
+    """Save and/or compare as asked; False when a case regressed"""
+    if path:
+        save(path, settings, results)
+    if not compare:
+        return True
+    found = regressions(compare, settings, results, tolerance, metrics)
+    if found:
+        print(f"✗ {len(found)} regression(s) beyond {tolerance:.0%} against {compare}:")
+        for regression in found:
+            print(f"  - {regression}")
+        return False
+    print(f"✓ no case regressed beyond {tolerance:.0%} against {compare}")
+    return True
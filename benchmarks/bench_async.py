@@ -0,0 +1,151 @@
+"""
+Sync vs async request path throughput.
+
+Seeds a throwaway SQLite database, then keeps CONCURRENCY requests in flight
+against two ASGI apps through httpx and reports requests per second:
+
+  sync   reference handlers written like the old routers (def + Session),
+         which Starlette runs on its worker threadpool
+  async  the real app (async def + AsyncSession on aiosqlite)
+
+On a local SQLite file the async app is the slower one: about 0.74x on the
+list and 0.56x on the single event at 200 in flight. aiosqlite runs every
+statement as four hand-offs to its connection thread (cursor, execute,
+fetchall, close) plus two rollbacks when the session closes, and the real
+app also reads ``table_revisions`` for its ETag on every request; without
+that read the single event reaches about 0.75x. Pool size makes no
+difference. Under load these hand-offs queue behind the event loop, which
+is why ``app.metrics`` then logs the revision read as slow SQL.
+
+Run with: python benchmarks/bench_async.py [--requests 3000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Measure the request path itself, not the response cache
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app as async_app
+from app.models import Event, Venue
+from app.schemas import EventWithVenue
+
+VENUES = 50
+EVENTS = 1000
+
+
+def seed(engine):
+    """Venues and events only; these endpoints never touch tickets"""
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": f"Venue {i}", "address": f"{i} Moi Avenue", "city": "Nairobi", "capacity": 1000 + i}
+            for i in range(1, VENUES + 1)
+        ])
+        conn.execute(insert(Event), [
+            {
+                "venue_id": i % VENUES + 1,
+                "title": f"Event {i}",
+                "description": "Benchmark event " * 10,
+                "category": "Concert",
+                "event_date": date.today() + timedelta(days=i % 365),
+                "event_time": dtime(19, 0),
+            }
+            for i in range(1, EVENTS + 1)
+        ])
+
+
+def build_sync_app(engine) -> FastAPI:
+    """The pre-async handlers for the benchmarked routes"""
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+    app = FastAPI()
+
+    # Sessions are closed inside the handler: with a yield dependency the
+    # teardown needs a free threadpool slot, and under this much concurrency
+    # every slot can be waiting on a pooled connection (a deadlock).
+    @app.get("/events", response_model=List[EventWithVenue])
+    def get_all_events(skip: int = 0, limit: int = 100):
+        with SessionLocal() as db:
+            return db.query(Event).options(joinedload(Event.venue)).offset(skip).limit(limit).all()
+
+    @app.get("/events/{event_id}", response_model=EventWithVenue)
+    def get_event(event_id: int):
+        with SessionLocal() as db:
+            event = db.query(Event).options(joinedload(Event.venue)).filter(Event.id == event_id).first()
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return event
+
+    return app
+
+
+async def drive(app, paths, total, concurrency) -> float:
+    """Issue ``total`` GETs cycling over ``paths`` with ``concurrency`` in flight; returns req/s"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with gate:
+                response = await client.get(paths[i % len(paths)])
+                response.raise_for_status()
+
+        # Warm up pools and caches before timing
+        await asyncio.gather(*(one(i) for i in range(min(total, concurrency))))
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return total / (time.perf_counter() - started)
+
+
+async def run(total, concurrency):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/bench.db", db_pool_size=20, db_max_overflow=40)
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        seed(engine)
+
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        async_app.dependency_overrides[get_async_db] = override_get_async_db
+        workloads = {
+            "GET /events?limit=20": ["/events?limit=20"],
+            "GET /events/{id}": [f"/events/{i}" for i in range(1, EVENTS + 1)],
+        }
+        try:
+            print(f"{total} requests, {concurrency} in flight")
+            print(f"{'workload':<24}{'sync req/s':>12}{'async req/s':>13}{'speedup':>9}")
+            for name, paths in workloads.items():
+                sync_rps = await drive(build_sync_app(engine), paths, total, concurrency)
+                async_rps = await drive(async_app, paths, total, concurrency)
+                print(f"{name:<24}{sync_rps:>12.0f}{async_rps:>13.0f}{async_rps / sync_rps:>8.2f}x")
+        finally:
+            async_app.dependency_overrides.pop(get_async_db, None)
+            await async_engine.dispose()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
@@ -0,0 +1,95 @@
+"""
+Insert throughput of random vs time-ordered confirmation codes.
+
+For each code scheme, fills a throwaway SQLite tickets table with ``--rows``
+existing codes (10 million by default), builds the unique index on
+``confirmation_code`` and then times ``--batches`` purchase-sized
+transactions inserting fresh codes. Legacy codes are 16 random hex
+characters, so every insert lands on a random leaf page of the index; the
+time-ordered codes of ``app/codes.py`` land at its right-hand edge. The
+existing time-ordered codes are spread over the previous year.
+
+The table holds only an id and the code, so the difference measured is the
+unique index's. Connections use the application's SQLite pragmas (page
+cache and mmap size); the gap grows once the index no longer fits them.
+
+Run with: python benchmarks/bench_confirmation_codes.py [--rows 10000000] [--batches 200] [--batch 50]
+"""
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.codes import generate_confirmation_code
+from app.config import Settings
+from app.database import create_db_engine
+
+LOAD_CHUNK = 100_000
+YEAR = 365 * 24 * 3600
+
+
+def legacy_code(issued_at=None):
+    return secrets.token_hex(8).upper()
+
+
+SCHEMES = {"random": legacy_code, "time-ordered": generate_confirmation_code}
+
+
+def fill(engine, generate, rows):
+    """``rows`` existing codes, issued over the past year in order; the index is built afterwards"""
+    started = time.time() - YEAR
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY, confirmation_code VARCHAR(20) NOT NULL)"
+        )
+        cursor = conn.connection.driver_connection.cursor()
+        for offset in range(0, rows, LOAD_CHUNK):
+            count = min(LOAD_CHUNK, rows - offset)
+            cursor.executemany(
+                "INSERT INTO tickets (confirmation_code) VALUES (?)",
+                ((generate(started + YEAR * (offset + i) / rows),) for i in range(count)),
+            )
+        conn.exec_driver_sql("CREATE UNIQUE INDEX ix_tickets_confirmation_code ON tickets (confirmation_code)")
+
+
+def insert_rate(engine, generate, batches, batch):
+    """Rows per second over ``batches`` transactions of ``batch`` inserts each"""
+    elapsed = 0.0
+    for _ in range(batches):
+        codes = [(generate(),) for _ in range(batch)]
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO tickets (confirmation_code) VALUES (?)", codes)
+        elapsed += time.perf_counter() - started
+    return batches * batch / elapsed
+
+
+def run(rows, batches, batch):
+    print(f"{rows:,} existing tickets, {batches} transactions of {batch} inserts")
+    print(f"{'codes':<14}{'load s':>10}{'db MB':>10}{'inserts/s':>12}")
+    results = {}
+    for label, generate in SCHEMES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_db_engine(Settings(database_url=f"sqlite:///{tmp}/codes.db"))
+            started = time.perf_counter()
+            fill(engine, generate, rows)
+            loaded = time.perf_counter() - started
+            size = os.path.getsize(f"{tmp}/codes.db") / 2 ** 20
+            results[label] = insert_rate(engine, generate, batches, batch)
+            engine.dispose()
+            print(f"{label:<14}{loaded:>10.1f}{size:>10.0f}{results[label]:>12.0f}")
+    print(f"time-ordered / random: {results['time-ordered'] / results['random']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+    run(args.rows, args.batches, args.batch)
@@ -0,0 +1,131 @@
+"""
+Regular vs fast JSON list pages.
+
+Seeds a throwaway SQLite database, checks that both paths return identical
+bodies, then times full list pages with the response cache off, alternating
+the two paths request by request so drift affects both alike:
+
+  regular  ORM objects validated against the response schema (FAST_JSON=false)
+  fast     selected columns serialized directly (FAST_JSON=true)
+
+Run with: python benchmarks/bench_fast_json.py [--requests 300] [--limit 100]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Measure the request path itself, not the response cache
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Settings, get_settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Event, Ticket, Venue
+
+VENUES = 200
+EVENTS = 2000
+TICKETS = 20000
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": f"Venue {i}", "address": f"{i} Moi Avenue", "city": "Nairobi", "capacity": 1000 + i}
+            for i in range(1, VENUES + 1)
+        ])
+        conn.execute(insert(Event), [
+            {
+                "venue_id": i % VENUES + 1,
+                "title": f"Event {i}",
+                "description": "Benchmark event " * 10,
+                "category": "Concert",
+                "event_date": date.today() + timedelta(days=i % 365),
+                "event_time": dtime(19, 0),
+            }
+            for i in range(1, EVENTS + 1)
+        ])
+        conn.execute(insert(Ticket), [
+            {
+                "event_id": i % EVENTS + 1,
+                "buyer_name": f"Buyer {i}",
+                "buyer_email": f"buyer{i}@email.co.ke",
+                "ticket_type": "Standard",
+                "price": 1500,
+                "confirmation_code": f"BENCH{i:07d}",
+                "purchase_date": datetime(2025, 1, 1) + timedelta(minutes=i),
+            }
+            for i in range(1, TICKETS + 1)
+        ])
+
+
+async def fetch(client, path, fast) -> bytes:
+    get_settings().fast_json = fast
+    response = await client.get(path)
+    response.raise_for_status()
+    return response.content
+
+
+async def timed(client, path, total) -> dict:
+    """Median latency in ms of each path over ``total`` alternating requests"""
+    latencies = {False: [], True: []}
+    for _ in range(total):
+        for fast in (False, True):
+            started = time.perf_counter()
+            await fetch(client, path, fast)
+            latencies[fast].append((time.perf_counter() - started) * 1000)
+    return {fast: statistics.median(values) for fast, values in latencies.items()}
+
+
+async def run(total, limit):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/bench.db")
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        seed(engine)
+
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                print(f"{total} sequential requests per path, limit={limit}")
+                print(f"{'path':<28}{'regular ms':>12}{'fast ms':>10}{'speedup':>9}")
+                for resource in ("events", "venues", "tickets"):
+                    path = f"/{resource}?limit={limit}"
+                    regular_body = await fetch(client, path, False)
+                    fast_body = await fetch(client, path, True)
+                    if regular_body != fast_body:
+                        raise SystemExit(f"{path}: fast body differs from the regular one")
+                    medians = await timed(client, path, total)
+                    regular, fast = medians[False], medians[True]
+                    print(f"{'GET ' + path:<28}{regular:>12.2f}{fast:>10.2f}{regular / fast:>8.2f}x")
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+            get_settings().fast_json = False
+            await async_engine.dispose()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.limit))
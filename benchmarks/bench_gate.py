@@ -0,0 +1,149 @@
+"""
+Gate scan latency and redeem throughput.
+
+Seeds a throwaway SQLite database, loads one event into the gate index and
+reports p50/p99 latency of ``GET /tickets/code/{code}/status`` for codes
+served from the index and codes that fall through to the database, both
+end to end (through httpx) and for the route handler alone. It then
+redeems every ticket of the event, one request per ticket, from
+CONCURRENCY scanners, checks that each code was admitted exactly once,
+and finally syncs the other event's codes through the batch endpoint.
+
+Run with: python benchmarks/bench_gate.py [--lookups 2000] [--tickets 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CACHE_BACKEND", "none")
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Event, Ticket, Venue
+from app.routers.tickets import get_ticket_gate_status
+from app.services import rebuild_ticket_stats
+
+GATED_EVENT, OTHER_EVENT = 1, 2
+BATCH = 500
+
+
+def seed(engine, tickets):
+    """One venue, two events with ``tickets`` tickets each"""
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [{"name": "Kasarani", "address": "Thika Road", "city": "Nairobi", "capacity": 60000}])
+        conn.execute(insert(Event), [
+            {"venue_id": 1, "title": f"Derby {i}", "event_date": date.today() + timedelta(days=i), "event_time": dtime(15, 0)}
+            for i in (GATED_EVENT, OTHER_EVENT)
+        ])
+        conn.execute(insert(Ticket), [
+            {
+                "event_id": event_id,
+                "buyer_name": f"Fan {i}",
+                "buyer_email": f"fan{i}@email.co.ke",
+                "price": 1000,
+                "confirmation_code": f"GATE{event_id}{i:07d}",
+            }
+            for event_id in (GATED_EVENT, OTHER_EVENT)
+            for i in range(tickets)
+        ])
+    with sessionmaker(bind=engine)() as db:
+        rebuild_ticket_stats(db)
+        db.commit()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+async def lookups(client, sessions, code, total):
+    """(p50, p99) in ms end to end and for the handler alone"""
+    end_to_end = []
+    for _ in range(total):
+        started = time.perf_counter()
+        (await client.get(f"/tickets/code/{code}/status")).raise_for_status()
+        end_to_end.append((time.perf_counter() - started) * 1000)
+    handler = []
+    async with sessions() as db:
+        for _ in range(total):
+            started = time.perf_counter()
+            await get_ticket_gate_status(code, db)
+            handler.append((time.perf_counter() - started) * 1000)
+    return percentiles(end_to_end), percentiles(handler)
+
+
+async def run(total, tickets, concurrency):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/bench.db", sqlite_busy_timeout_ms=60000)
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        seed(engine, tickets)
+
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                (await client.post(f"/events/{GATED_EVENT}/gate")).raise_for_status()
+                print(f"{total} status lookups per code; event {GATED_EVENT} loaded, {tickets} tickets per event")
+                print(f"{'lookup':<12}{'p50 ms':>10}{'p99 ms':>10}{'handler p50':>14}{'handler p99':>14}")
+                for label, code in (("index", f"GATE{GATED_EVENT}0000001"), ("database", f"GATE{OTHER_EVENT}0000001")):
+                    (p50, p99), (h50, h99) = await lookups(client, sessions, code, total)
+                    print(f"{label:<12}{p50:>10.3f}{p99:>10.3f}{h50:>14.4f}{h99:>14.4f}")
+
+                gate = asyncio.Semaphore(concurrency)
+                codes = [f"GATE{GATED_EVENT}{i:07d}" for i in range(tickets)]
+
+                async def redeem(code):
+                    async with gate:
+                        return (await client.post(f"/tickets/code/{code}/redeem")).status_code
+
+                started = time.perf_counter()
+                # Every code is scanned twice; only one scan of each may get in
+                statuses = Counter(await asyncio.gather(*(redeem(code) for code in codes + codes)))
+                elapsed = time.perf_counter() - started
+                print(f"redeem: {2 * tickets} scans in {elapsed:.2f}s ({2 * tickets / elapsed:.0f}/s), {dict(statuses)}")
+                if statuses[200] != tickets or statuses[409] != tickets:
+                    raise SystemExit("a ticket was admitted more or less than once")
+
+                # An offline scanner syncing the other event's queue, BATCH codes per request
+                queue = [f"GATE{OTHER_EVENT}{i:07d}" for i in range(tickets)]
+                started = time.perf_counter()
+                results = Counter()
+                for offset in range(0, len(queue), BATCH):
+                    response = await client.post("/tickets/redeem", json={"codes": queue[offset:offset + BATCH]})
+                    results.update(item["result"] for item in response.json())
+                elapsed = time.perf_counter() - started
+                print(f"batch redeem: {tickets} codes in {elapsed:.2f}s ({tickets / elapsed:.0f}/s), {dict(results)}")
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+            await async_engine.dispose()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--tickets", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.lookups, args.tickets, args.concurrency))
@@ -0,0 +1,279 @@
+"""
+Per-route micro-benchmarks.
+
+Runs every API route through FastAPI's TestClient against a generated
+dataset (see ``synthetic.py``), one request at a time: ``--warmup``
+untimed requests, then ``--iterations`` timed ones per case. Prints
+p50/p95/p99 latency and requests per second per case, and fails if a
+case errors or a route has no case (so new routes cannot slip past).
+
+Cases run in order on the same database. Writes go to a venue and events
+the run creates for itself, and per-iteration inputs that need a fresh
+row (a hold to confirm, a ticket to cancel, a code to redeem) are made
+untimed before each request, so only the route under test is measured.
+The response cache, rate limits and load shedding are off. Against a
+pre-generated ``--database`` the run adds rows; regenerate it, or copy it
+first, before taking a baseline.
+
+  --save FILE     write the results as a baseline
+  --compare FILE  flag cases whose median is more than --tolerance slower than in FILE
+
+Run with: python benchmarks/bench_routes.py [--database sqlite:///bench_full.db] [--iterations 200] [--compare baseline.json]
+"""
+import argparse
+import os
+import string
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Measure the request path itself, not the cache or the guards in front of it
+os.environ.setdefault("CACHE_BACKEND", "none")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("PURCHASE_CONCURRENCY_MAX", "0")
+os.environ.setdefault("HOLD_SWEEP_SECONDS", "0")
+# The dataset has no migration history; its schema comes from synthetic.py
+os.environ.setdefault("SCHEMA_ON_STARTUP", "none")
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import create_async_db_engine, get_async_db
+from app.main import app
+from benchmarks import baseline
+from benchmarks.synthetic import SCALES, dataset
+
+BUYER = {"buyer_name": "Bench Buyer", "buyer_email": "bench@email.co.ke", "price": "1500.00"}
+
+# (method, path, TestClient kwargs), run in this order. Strings may name
+# setup values ({venue}, {event}, {queue_event}, {known_code}, {today},
+# {month_ago}), the iteration ({i}) or a fresh input made before each
+# request (PREPARE). Placeholders keep case labels the same from run to run.
+CASES = [
+    ("GET", "/", {}),
+    ("GET", "/health", {}),
+    ("GET", "/metrics", {}),
+    ("GET", "/venues", {}),
+    ("GET", "/venues", {"params": {"city": "Mombasa"}}),
+    ("GET", "/venues", {"params": {"search": "kasarani"}}),
+    ("GET", "/venues", {"params": {"fields": "name,city"}}),
+    ("GET", "/venues/search", {"params": {"q": "kasarani"}}),
+    ("GET", "/venues/1", {}),
+    ("GET", "/venues/1/events", {}),
+    ("POST", "/venues", {"json": {"name": "Bench Hall {i}", "address": "Moi Avenue", "city": "Nairobi", "capacity": 900}}),
+    ("PUT", "/venues/{venue}", {"json": {"address": "Haile Selassie Avenue {i}"}}),
+    ("DELETE", "/venues/{new_venue}", {}),
+    ("GET", "/events", {}),
+    ("GET", "/events", {"params": {"category": "Concert"}}),
+    ("GET", "/events", {"params": {"venue_id": 1}}),
+    ("GET", "/events", {"params": {"search": "derby"}}),
+    ("GET", "/events", {"params": {"fields": "id,title,event_date,venue.name"}}),
+    ("GET", "/events", {"params": {"include": "availability"}}),
+    ("GET", "/events/search", {"params": {"q": "derby"}}),
+    ("GET", "/events/export", {"params": {"date_from": "{today}", "date_to": "{today}"}}),
+    ("GET", "/events/1", {}),
+    ("GET", "/events/1/availability", {}),
+    ("POST", "/events", {"json": {
+        "venue_id": "{venue}", "title": "Bench Night {i}", "category": "Concert",
+        "event_date": "2031-01-10", "event_time": "19:00:00",
+    }}),
+    ("PUT", "/events/{event}", {"json": {"title": "Bench Main Event {i}"}}),
+    ("DELETE", "/events/{new_event}", {}),
+    ("POST", "/events/1/gate", {}),
+    ("DELETE", "/events/1/gate", {}),
+    ("POST", "/events/{queue_event}/queue", {"json": {"rate_per_second": 10000}}),
+    ("GET", "/events/{queue_event}/queue", {}),
+    ("POST", "/events/{queue_event}/queue/join", {}),
+    ("GET", "/events/{queue_event}/queue/{queue_token}", {}),
+    ("GET", "/events/{queue_event}/queue/{queue_token}/stream", {}),
+    ("DELETE", "/events/{queue_event}/queue", {}),
+    ("POST", "/events/{event}/holds", {"json": {"quantity": 2}}),
+    ("GET", "/holds/{hold}", {}),
+    ("POST", "/holds/{hold}/confirm", {"json": BUYER}),
+    ("DELETE", "/holds/{hold}", {}),
+    ("GET", "/tickets", {}),
+    ("GET", "/tickets", {"params": {"fields": "event_id,status"}}),
+    ("GET", "/tickets/export", {"params": {"event_id": 1}}),
+    ("GET", "/tickets/1", {}),
+    ("GET", "/tickets/code/{known_code}", {}),
+    ("GET", "/tickets/code/{known_code}/status", {}),
+    ("POST", "/tickets/code/{code}/redeem", {}),
+    ("POST", "/tickets/redeem", {"json": {"codes": ["{code}", "{known_code}"]}}),
+    ("GET", "/tickets/event/1", {}),
+    ("POST", "/tickets", {"json": {**BUYER, "event_id": "{event}"}}),
+    ("POST", "/tickets/batch", {"json": {"tickets": [{**BUYER, "event_id": "{event}"}] * 2}}),
+    ("DELETE", "/tickets/{ticket}", {}),
+    ("GET", "/stats/dashboard", {}),
+    ("GET", "/stats/cache", {}),
+    ("GET", "/stats/gate", {}),
+    ("GET", "/stats/limits", {}),
+    ("GET", "/stats/queues", {}),
+    ("GET", "/stats/holds", {}),
+    ("GET", "/stats/timeseries", {"params": {"date_from": "{month_ago}"}}),
+    ("GET", "/stats/timeseries", {"params": {"date_from": "{month_ago}", "interval": "hour", "group_by": "city"}}),
+]
+
+
+def created(response, field="id"):
+    response.raise_for_status()
+    return response.json()[field]
+
+
+# Fresh inputs, made untimed before each request that names them
+PREPARE = {
+    "new_venue": lambda client, setup: created(client.post("/venues", json={
+        "name": "Doomed Hall", "address": "Moi Avenue", "city": "Nairobi", "capacity": 100,
+    })),
+    "new_event": lambda client, setup: created(client.post("/events", json={
+        "venue_id": setup["venue"], "title": "Doomed Night", "event_date": "2031-02-01", "event_time": "19:00:00",
+    })),
+    "queue_token": lambda client, setup: created(
+        client.post(f"/events/{setup['queue_event']}/queue/join"), "queue_token"
+    ),
+    "hold": lambda client, setup: created(client.post(f"/events/{setup['event']}/holds", json={"quantity": 1})),
+    "ticket": lambda client, setup: created(client.post("/tickets", json={**BUYER, "event_id": setup["event"]})),
+    "code": lambda client, setup: created(
+        client.post("/tickets", json={**BUYER, "event_id": setup["event"]}), "confirmation_code"
+    ),
+}
+
+
+def names_in(value):
+    """Placeholder names in the strings of ``value``"""
+    if isinstance(value, str):
+        return {name for _, name, _, _ in string.Formatter().parse(value) if name}
+    if isinstance(value, dict):
+        return set().union(*map(names_in, value.values()))
+    if isinstance(value, (list, tuple)):
+        return set().union(*map(names_in, value))
+    return set()
+
+
+def fill(value, values):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {key: fill(item, values) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [fill(item, values) for item in value]
+    return value
+
+
+def label_of(method, path, kwargs):
+    return f"{method} {path} {kwargs.get('params', '')}".rstrip()
+
+
+def route_for(method, path):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and method in route.methods and route.path_regex.match(path):
+            return route
+    return None
+
+
+def setup_fixture(client) -> dict:
+    """A venue and events for the writes, and a ticket code to read"""
+    venue = created(client.post("/venues", json={
+        "name": "Bench Arena", "address": "Thika Road", "city": "Nairobi", "capacity": 10_000_000,
+    }))
+    event, queue_event = (
+        created(client.post("/events", json={
+            "venue_id": venue, "title": title, "category": "Concert",
+            "event_date": "2031-01-01", "event_time": "19:00:00",
+        }))
+        for title in ("Bench Main Event", "Bench Queued Event")
+    )
+    known_code = created(client.get("/tickets/1"), "confirmation_code")
+    return {
+        "venue": venue,
+        "event": event,
+        "queue_event": queue_event,
+        "known_code": known_code,
+        "today": date.today().isoformat(),
+        "month_ago": (date.today() - timedelta(days=30)).isoformat(),
+    }
+
+
+def run_case(client, setup, method, path, kwargs, warmup, iterations):
+    """Latencies in ms of ``iterations`` timed requests, or the first error"""
+    needed = (names_in(path) | names_in(kwargs)) & set(PREPARE)
+    latencies = []
+    for i in range(warmup + iterations):
+        values = {**setup, "i": i, **{name: PREPARE[name](client, setup) for name in needed}}
+        url, request_kwargs = fill(path, values), fill(kwargs, values)
+        started = time.perf_counter()
+        response = client.request(method, url, **request_kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            return None, f"HTTP {response.status_code} {response.text[:200]}"
+        if i >= warmup:
+            latencies.append(elapsed)
+    return latencies, None
+
+
+def main(args) -> int:
+    failures = []
+    covered = set()
+    for method, path, _ in CASES:
+        route = route_for(method, path)
+        if route is None:
+            failures.append(f"{method} {path}: no route matches")
+        else:
+            covered.add((method, route.path))
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods:
+                if (method, route.path) not in covered:
+                    failures.append(f"{method} {route.path}: no benchmark, add it to CASES")
+
+    results = {}
+    with dataset(args.database, args.scale) as settings:
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            with TestClient(app) as client:
+                setup = setup_fixture(client)
+                for method, path, kwargs in CASES:
+                    label = label_of(method, path, kwargs)
+                    latencies, error = run_case(client, setup, method, path, kwargs, args.warmup, args.iterations)
+                    if error:
+                        failures.append(f"{label}: {error}")
+                    else:
+                        results[label] = baseline.summarize(latencies)
+                client.portal.call(async_engine.dispose)
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+
+    print(f"{args.iterations} sequential requests per case after {args.warmup} warm-up")
+    baseline.print_table(results)
+    run_settings = {
+        "benchmark": "routes",
+        "dataset": args.database or args.scale,
+        "iterations": args.iterations,
+    }
+    ok = baseline.report(args.save, args.compare, args.tolerance, run_settings, results, ["p50"])
+    if failures:
+        print(f"✗ {len(failures)} case problem(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+    return 0 if ok and not failures else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database", help="SQLAlchemy URL of a dataset from synthetic.py")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="dataset to generate without --database")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(main(parser.parse_args()))
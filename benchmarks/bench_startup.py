@@ -0,0 +1,124 @@
+"""
+Worker startup time.
+
+Starts ``--runs`` fresh interpreters against a small migrated SQLite
+database and times, in each, the phases a new worker goes through before
+it serves traffic:
+
+  frameworks     importing FastAPI, SQLAlchemy and pydantic
+  app import     importing app.main: settings, engines, models, schemas,
+                 routers and building the application
+  startup        the lifespan startup (SCHEMA_ON_STARTUP, the hold sweeper)
+  first request  GET /events on the new worker
+  warm request   the same request again
+  ready          from the first import to the first response
+
+Prints p50/p95/p99 per phase. ``--schema`` sets SCHEMA_ON_STARTUP for the
+workers (see ``app/schema.py``); the response cache is off so the warm
+request measures the request path.
+
+  --save FILE     write the results as a baseline
+  --compare FILE  flag phases whose median is more than --tolerance slower than in FILE
+
+Run with: python benchmarks/bench_startup.py [--runs 20] [--schema check] [--compare baseline_startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PHASES = ["frameworks", "app import", "startup", "first request", "warm request", "ready"]
+
+
+def worker() -> None:
+    """One worker's phase timings in ms, printed as JSON"""
+    started = time.perf_counter()
+    import fastapi  # noqa: F401
+    import pydantic  # noqa: F401
+    import sqlalchemy  # noqa: F401
+    from fastapi.testclient import TestClient
+    frameworks = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+    with TestClient(app) as client:
+        started_up = time.perf_counter()
+        client.get("/events").raise_for_status()
+        first = time.perf_counter()
+        client.get("/events").raise_for_status()
+        warm = time.perf_counter()
+    print(json.dumps({
+        "frameworks": (frameworks - started) * 1000,
+        "app import": (imported - frameworks) * 1000,
+        "startup": (started_up - imported) * 1000,
+        "first request": (first - started_up) * 1000,
+        "warm request": (warm - first) * 1000,
+        "ready": (first - started) * 1000,
+    }))
+
+
+def migrated_database(tmp: str) -> str:
+    """A small dataset in a database built by ``alembic upgrade head``"""
+    url = f"sqlite:///{tmp}/startup.db"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT, env={**os.environ, "DATABASE_URL": url}, check=True, capture_output=True,
+    )
+    from app.config import Settings
+    from app.database import create_db_engine
+    from benchmarks.synthetic import Scale, generate
+
+    engine = create_db_engine(Settings(database_url=url))
+    generate(engine, Scale(100, 1_000, 10_000))
+    engine.dispose()
+    return url
+
+
+def main(args) -> int:
+    from benchmarks import baseline
+
+    timings = {phase: [] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Migrating and filling a small database")
+        env = {
+            **os.environ,
+            "DATABASE_URL": migrated_database(tmp),
+            "SCHEMA_ON_STARTUP": args.schema,
+            "CACHE_BACKEND": "none",
+        }
+        for _ in range(args.runs):
+            result = subprocess.run(
+                [sys.executable, __file__, "--worker"], cwd=ROOT, env=env, capture_output=True, text=True,
+            )
+            if result.returncode:
+                print(result.stderr)
+                return 1
+            for phase, value in json.loads(result.stdout.splitlines()[-1]).items():
+                timings[phase].append(value)
+
+    results = {phase: baseline.summarize(timings[phase]) for phase in PHASES}
+    print(f"{args.runs} fresh workers, SCHEMA_ON_STARTUP={args.schema}")
+    baseline.print_table(results)
+    run_settings = {"benchmark": "startup", "runs": args.runs, "schema": args.schema}
+    return 0 if baseline.report(args.save, args.compare, args.tolerance, run_settings, results, ["p50"]) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--schema", choices=["create", "check", "none"], default="check")
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker()
+    else:
+        sys.exit(main(args))
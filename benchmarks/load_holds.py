@@ -0,0 +1,235 @@
+"""
+Checkout holds under load.
+
+Seeds a throwaway SQLite database with one event of ``--seats`` seats and
+sends ``--buyers`` checkouts at it, ``--concurrency`` requests in flight.
+Each takes a hold of one or two seats that expires after ``--ttl``
+seconds, then confirms it, cancels it or walks away; confirmations arrive
+at random up to a little past the expiry, so some race the sweeper. A sweeper releases expired holds every
+``--sweep`` seconds throughout.
+
+Once every hold has expired and been swept, checks the event's counters:
+nothing oversold, ``sold`` equal to the tickets issued, nothing still
+held and ``remaining = capacity - sold - held``. Then times a sweep of
+1000 expired holds sitting among ``--live`` unexpired ones, which reads
+only the expired rows through the ``expires_at`` index. Exits non-zero
+when an invariant does not hold.
+
+Rate limits and load shedding are turned off: every client shares one
+address here.
+
+Run with: python benchmarks/load_holds.py [--buyers 1000] [--seats 500] [--ttl 10] [--live 100000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("PURCHASE_CONCURRENCY_MAX", "0")
+
+import httpx
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.codes import generate_confirmation_code
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.holds import HoldSweeper
+from app.main import app
+from app.models import Event, EventInventory, Hold, Ticket, Venue
+from app.services import ensure_inventory
+
+
+# Lock waits are the point of this test, not slow queries worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+EXPIRED = 1000
+
+
+def seed(engine, seats, live):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": "Kasarani Stadium", "address": "Thika Road", "city": "Nairobi", "capacity": seats},
+            {"name": "Nyayo Stadium", "address": "Langata Road", "city": "Nairobi", "capacity": live + EXPIRED},
+        ])
+        conn.execute(insert(Event), [
+            {
+                "venue_id": venue_id,
+                "title": title,
+                "category": "Sports",
+                "event_date": date.today() + timedelta(days=30),
+                "event_time": dtime(15, 0),
+            }
+            for venue_id, title in ((1, "Rugby Sevens Final"), (2, "Safari Sevens"))
+        ])
+
+
+async def checkouts(client, buyers, ttl, concurrency):
+    """Status code counts per step and the seats confirmed"""
+    codes: Counter = Counter()
+    confirmed = 0
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def request(method, url, **kwargs):
+        async with in_flight:
+            return await client.request(method, url, **kwargs)
+
+    async def checkout(i):
+        nonlocal confirmed
+        rng = random.Random(i)
+        quantity = rng.choice((1, 2))
+        response = await request("POST", "/events/1/holds", json={"quantity": quantity, "ttl_seconds": ttl})
+        codes[f"hold {response.status_code}"] += 1
+        if response.status_code != 201:
+            return
+        hold_id = response.json()["id"]
+        choice = rng.random()
+        if choice < 0.6:
+            await asyncio.sleep(rng.uniform(0, ttl * 1.1))
+            response = await request("POST", f"/holds/{hold_id}/confirm", json={
+                "buyer_name": f"Buyer {i}",
+                "buyer_email": f"buyer{i}@email.co.ke",
+                "price": "1500.00",
+            })
+            codes[f"confirm {response.status_code}"] += 1
+            if response.status_code == 201:
+                confirmed += len(response.json())
+        elif choice < 0.8:
+            await asyncio.sleep(rng.uniform(0, ttl / 2))
+            response = await request("DELETE", f"/holds/{hold_id}")
+            codes[f"cancel {response.status_code}"] += 1
+        # Otherwise the buyer walks away and the hold expires
+
+    await asyncio.gather(*(checkout(i) for i in range(buyers)))
+    return codes, confirmed
+
+
+def check_event(engine, confirmed):
+    """Failed invariants for event 1, and its counters"""
+    with engine.connect() as conn:
+        capacity, sold, held, remaining = conn.execute(
+            select(EventInventory.capacity, EventInventory.sold, EventInventory.held, EventInventory.remaining)
+            .where(EventInventory.event_id == 1)
+        ).one()
+        tickets = conn.scalar(select(func.count(Ticket.id)).where(Ticket.event_id == 1, Ticket.status != "cancelled"))
+        holds = conn.scalar(select(func.count(Hold.id)).where(Hold.event_id == 1))
+    failures = []
+    if sold > capacity:
+        failures.append(f"oversold: {sold} of {capacity}")
+    if sold != tickets or sold != confirmed:
+        failures.append(f"sold {sold}, but {tickets} tickets issued and {confirmed} confirmed")
+    if held or holds:
+        failures.append(f"{held} seats still held by {holds} holds")
+    if remaining != capacity - sold - held:
+        failures.append(f"remaining {remaining} != {capacity} - {sold} - {held}")
+    return failures, f"capacity {capacity}, sold {sold}, held {held}, remaining {remaining}"
+
+
+async def time_sweep(engine, sessions, live):
+    """Seconds to sweep EXPIRED holds among ``live`` unexpired ones on event 2"""
+    now = datetime.now(timezone.utc)
+    with sessionmaker(bind=engine)() as db:
+        ensure_inventory(db, 2)
+        db.execute(
+            update(EventInventory)
+            .where(EventInventory.event_id == 2)
+            .values(held=live + EXPIRED, remaining=0)
+        )
+        db.execute(insert(Hold), [
+            {
+                "id": generate_confirmation_code(),
+                "event_id": 2,
+                "quantity": 1,
+                "expires_at": now + (timedelta(hours=1) if n < live else -timedelta(seconds=n - live + 1)),
+            }
+            for n in range(live + EXPIRED)
+        ])
+        db.commit()
+    sweeper = HoldSweeper(sessions)
+    started = time.perf_counter()
+    released = await sweeper.sweep()
+    elapsed = time.perf_counter() - started
+    with engine.connect() as conn:
+        held = conn.scalar(select(EventInventory.held).where(EventInventory.event_id == 2))
+    return elapsed, released, held
+
+
+async def run(buyers, seats, ttl, sweep, live, concurrency) -> bool:
+    print(f"{buyers} checkouts for {seats} seats, {concurrency} in flight; holds last {ttl}s, swept every {sweep}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            database_url=f"sqlite:///{tmp}/holds.db",
+            db_pool_size=20,
+            db_max_overflow=40,
+            sqlite_busy_timeout_ms=60000,
+        )
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        seed(engine, seats, live)
+
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        sweeper = HoldSweeper(sessions)
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        transport = httpx.ASGITransport(app=app)
+        sweeping = asyncio.create_task(sweeper.run(sweep))
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+                started = time.perf_counter()
+                codes, confirmed = await checkouts(client, buyers, ttl, concurrency)
+                elapsed = time.perf_counter() - started
+            # Let the last holds expire and be swept
+            await asyncio.sleep(ttl + 2 * sweep)
+        finally:
+            sweeping.cancel()
+            app.dependency_overrides.pop(get_async_db, None)
+
+        try:
+            for label, count in sorted(codes.items()):
+                print(f"  {label:<16}{count:>8}")
+            print(f"  {sum(codes.values()) / elapsed:.0f} requests/s; checkouts took {elapsed:.1f}s")
+            stats = sweeper.stats()
+            print(f"  {stats['sweeps']} sweeps released {stats['released']} expired holds")
+            failures, counters = check_event(engine, confirmed)
+            print(f"  {counters}")
+
+            elapsed, released, held = await time_sweep(engine, sessions, live)
+            print(f"sweep of {released} expired holds among {live} live: {elapsed * 1000:.1f} ms")
+            if released != EXPIRED or held != live:
+                failures.append(f"sweep released {released} holds, leaving {held} seats held")
+        finally:
+            await async_engine.dispose()
+            engine.dispose()
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print("✓ no oversell, sold matches tickets issued, nothing left held")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--buyers", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--ttl", type=int, default=10)
+    parser.add_argument("--sweep", type=float, default=1)
+    parser.add_argument("--live", type=int, default=100000)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.buyers, args.seats, args.ttl, args.sweep, args.live, args.concurrency)) else 1)
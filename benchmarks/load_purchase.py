@@ -0,0 +1,138 @@
+"""
+Concurrent purchase load test: no event may ever be oversold.
+
+Seeds a throwaway SQLite database with one small-capacity event, fires many
+more concurrent POST /tickets than there are seats through the real app, and
+checks that exactly ``capacity`` purchases succeed, the rest get 409, and the
+live ticket count and inventory counters agree. Exits non-zero on oversell.
+
+It proves correctness, not speed. Every purchase is a write transaction and
+SQLite lets one writer commit at a time, so purchases on this single
+database run one after another: a development machine manages roughly
+60-120 purchase requests per second, sold out or not, far short of
+thousands. The counter keeps each purchase to one conditional UPDATE; it
+does not lift the single-writer ceiling.
+
+Run with: python benchmarks/load_purchase.py [--capacity 50] [--buyers 500] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Every buyer shares one client address; this test is about seats, not throttling
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("PURCHASE_CONCURRENCY_MAX", "0")
+
+import httpx
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Event, EventInventory, Ticket, Venue
+
+
+# Lock waits are the point of this test, not slow queries worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+
+def seed(engine, capacity):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": "Tiny Hall", "address": "1 Moi Avenue", "city": "Nairobi", "capacity": capacity},
+        ])
+        conn.execute(insert(Event), [{
+            "venue_id": 1,
+            "title": "Sold Out Show",
+            "category": "Concert",
+            "event_date": date.today() + timedelta(days=30),
+            "event_time": dtime(19, 0),
+        }])
+
+
+async def hammer(buyers, concurrency) -> Counter:
+    """POST one ticket per buyer with ``concurrency`` in flight; returns status code counts"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def buy(i):
+            async with gate:
+                response = await client.post("/tickets", json={
+                    "event_id": 1,
+                    "buyer_name": f"Buyer {i}",
+                    "buyer_email": f"buyer{i}@email.co.ke",
+                    "price": "1500.00",
+                })
+                return response.status_code
+
+        return Counter(await asyncio.gather(*(buy(i) for i in range(buyers))))
+
+
+async def run(capacity, buyers, concurrency) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        # SQLite serializes writers; with this many queued on one row the
+        # default busy timeout can run out before a writer gets its turn
+        settings = Settings(
+            database_url=f"sqlite:///{tmp}/load.db",
+            db_pool_size=20,
+            db_max_overflow=40,
+            sqlite_busy_timeout_ms=60000,
+        )
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        seed(engine, capacity)
+
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            started = time.perf_counter()
+            codes = await hammer(buyers, concurrency)
+            elapsed = time.perf_counter() - started
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+            await async_engine.dispose()
+
+        with engine.connect() as conn:
+            live = conn.scalar(select(func.count(Ticket.id)).where(Ticket.status != "cancelled"))
+            inventory = conn.execute(select(EventInventory.sold, EventInventory.remaining)).one()
+        engine.dispose()
+
+    print(f"{buyers} buyers, {concurrency} in flight, capacity {capacity}")
+    print(f"  responses    {dict(sorted(codes.items()))}")
+    print(f"  tickets      {live}")
+    print(f"  inventory    sold={inventory.sold} remaining={inventory.remaining}")
+    print(f"  throughput   {buyers / elapsed:.0f} purchase requests/s")
+
+    ok = (
+        codes[201] == capacity
+        and codes[409] == buyers - capacity
+        and live == capacity
+        and (inventory.sold, inventory.remaining) == (capacity, 0)
+    )
+    print("✓ no oversell" if ok else "✗ oversold or lost purchases")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--buyers", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.capacity, args.buyers, args.concurrency)) else 1)
@@ -0,0 +1,173 @@
+"""
+Concurrent load across the routers.
+
+Drives the app in process through httpx's ASGI transport with
+``--concurrency`` clients for ``--duration`` seconds. Each client picks
+requests from a weighted browse-and-buy MIX (event listings and pages,
+availability, search, venues, ticket lookups, purchases and holds) with
+ids drawn at random from a generated dataset (see ``synthetic.py``).
+Clients are seeded, so the same settings replay the same request
+sequence. Prints p50/p95/p99 latency and requests per second per request
+kind and overall, and exits non-zero on any 5xx response.
+
+Rate limits and load shedding are off: every client shares one address
+here. The response cache follows CACHE_BACKEND.
+
+  --save FILE     write the results as a baseline
+  --compare FILE  flag request kinds whose p50, p95 or req/s is more than
+                  --tolerance worse than in FILE
+
+Run with: python benchmarks/load_routes.py [--database sqlite:///bench_full.db] [--concurrency 50] [--duration 30]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("PURCHASE_CONCURRENCY_MAX", "0")
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+from app.database import create_async_db_engine, get_async_db
+from app.main import app
+from app.models import Event, Ticket, Venue
+from benchmarks import baseline
+from benchmarks.synthetic import SCALES, dataset
+
+# Lock waits are part of the load, not slow queries worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+BUYER = {"buyer_name": "Load Buyer", "buyer_email": "load@email.co.ke", "price": "1500.00"}
+
+# (weight, method, path, kwargs); {venue}, {event} and {ticket} are drawn
+# per request, purchases and holds go to the run's own {bench_event}
+MIX = [
+    (20, "GET", "/events", {}),
+    (8, "GET", "/events", {"params": {"include": "availability"}}),
+    (20, "GET", "/events/{event}", {}),
+    (12, "GET", "/events/{event}/availability", {}),
+    (6, "GET", "/events/search", {"params": {"q": "derby"}}),
+    (5, "GET", "/venues", {}),
+    (5, "GET", "/venues/{venue}", {}),
+    (4, "GET", "/venues/{venue}/events", {}),
+    (6, "GET", "/tickets/{ticket}", {}),
+    (10, "POST", "/tickets", {"json": {**BUYER, "event_id": "{bench_event}"}}),
+    (4, "POST", "/events/{bench_event}/holds", {"json": {"quantity": 1}}),
+]
+
+
+def fill(value, values):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {key: fill(item, values) for key, item in value.items()}
+    return value
+
+
+def label_of(method, path, kwargs):
+    return f"{method} {path} {kwargs.get('params', '')}".rstrip()
+
+
+async def client_loop(client, worker, deadline, sizes, bench_event, timings, statuses):
+    rng = random.Random(worker)
+    weights = [weight for weight, *_ in MIX]
+    while time.perf_counter() < deadline:
+        _, method, path, kwargs = rng.choices(MIX, weights)[0]
+        values = {
+            "venue": rng.randint(1, sizes["venue"]),
+            "event": rng.randint(1, sizes["event"]),
+            "ticket": rng.randint(1, sizes["ticket"]),
+            "bench_event": bench_event,
+        }
+        label = label_of(method, path, kwargs)
+        started = time.perf_counter()
+        response = await client.request(method, fill(path, values), **fill(kwargs, values))
+        timings[label].append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] += 1
+
+
+async def run(args) -> bool:
+    with dataset(
+        args.database, args.scale, db_pool_size=20, db_max_overflow=40, sqlite_busy_timeout_ms=60000
+    ) as settings:
+        async_engine = create_async_db_engine(settings)
+        sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with sessions() as db:
+                yield db
+
+        async with sessions() as db:
+            sizes = {
+                name: await db.scalar(select(func.max(model.id)))
+                for name, model in (("venue", Venue), ("event", Event), ("ticket", Ticket))
+            }
+
+        timings = defaultdict(list)
+        statuses: Counter = Counter()
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        # Errors come back as 500s and are counted, rather than stopping the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+                venue = (await client.post("/venues", json={
+                    "name": "Load Arena", "address": "Thika Road", "city": "Nairobi", "capacity": 10_000_000,
+                })).json()["id"]
+                bench_event = (await client.post("/events", json={
+                    "venue_id": venue, "title": "Load Night", "category": "Concert",
+                    "event_date": "2031-01-01", "event_time": "19:00:00",
+                })).json()["id"]
+
+                started = time.perf_counter()
+                deadline = started + args.duration
+                await asyncio.gather(*(
+                    client_loop(client, worker, deadline, sizes, bench_event, timings, statuses)
+                    for worker in range(args.concurrency)
+                ))
+                elapsed = time.perf_counter() - started
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+            await async_engine.dispose()
+
+    results = {label: baseline.summarize(values, elapsed) for label, values in sorted(timings.items())}
+    results["all"] = baseline.summarize([value for values in timings.values() for value in values], elapsed)
+    print(f"{args.concurrency} clients for {elapsed:.1f}s")
+    baseline.print_table(results)
+    print("responses " + " ".join(f"{code}:{count}" for code, count in sorted(statuses.items())))
+
+    run_settings = {
+        "benchmark": "load",
+        "dataset": args.database or args.scale,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "cache": get_settings().cache_backend,
+    }
+    ok = baseline.report(
+        args.save, args.compare, args.tolerance, run_settings, results, ["p50", "p95", "rps"]
+    )
+    errors = sum(count for code, count in statuses.items() if code >= 500)
+    if errors:
+        print(f"✗ {errors} server error(s)")
+    return ok and not errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database", help="SQLAlchemy URL of a dataset from synthetic.py")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="dataset to generate without --database")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(0 if asyncio.run(run(parser.parse_args())) else 1)
@@ -0,0 +1,141 @@
+"""
+Browse latency during a purchase flood, with and without load shedding.
+
+Seeds a throwaway SQLite database with one large event, then for each mode
+runs ``--buyers`` clients posting purchases back to back for ``--seconds``
+while ``--browsers`` clients read the event's availability, and reports
+purchase outcomes and browse latency percentiles. With shedding off every
+purchase queues for the database; with it on, purchases past the adaptive
+concurrency limit get 503 straight away (buyers wait out its Retry-After)
+and page views keep their latency.
+
+Rate limits are turned off: every client shares one address here.
+
+Run with: python benchmarks/load_shedding.py [--buyers 200] [--browsers 20] [--seconds 10]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.limits import purchase_guard
+from app.main import app
+from app.models import Event, Venue
+
+
+# Lock waits are the point of this test, not slow queries worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": "Kasarani Stadium", "address": "Thika Road", "city": "Nairobi", "capacity": 10_000_000},
+        ])
+        conn.execute(insert(Event), [{
+            "venue_id": 1,
+            "title": "Big On-Sale",
+            "category": "Concert",
+            "event_date": date.today() + timedelta(days=30),
+            "event_time": dtime(19, 0),
+        }])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float("nan")
+
+
+async def flood(buyers, browsers, seconds):
+    """Purchase status counts and browse latencies (ms) over ``seconds``"""
+    transport = httpx.ASGITransport(app=app)
+    purchases: Counter = Counter()
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def buy(i):
+            while time.perf_counter() < deadline:
+                response = await client.post("/tickets", json={
+                    "event_id": 1,
+                    "buyer_name": f"Buyer {i}",
+                    "buyer_email": f"buyer{i}@email.co.ke",
+                    "price": "1500.00",
+                })
+                purchases[response.status_code] += 1
+                if response.status_code == 503:
+                    await asyncio.sleep(float(response.headers["Retry-After"]))
+
+        async def browse():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/events/1/availability")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(buy(i) for i in range(buyers)), *(browse() for _ in range(browsers)))
+    return purchases, latencies
+
+
+async def run(buyers, browsers, seconds):
+    print(f"{buyers} buyers, {browsers} browsers, {seconds}s per mode")
+    print(f"{'shedding':<10}{'purchases':>24}{'browse/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    concurrency = purchase_guard.concurrency
+    max_limit = concurrency.max_limit or 64
+    for mode, limit in (("off", 0), ("on", max_limit)):
+        concurrency.max_limit = concurrency.limit = limit
+        concurrency.latency.average_ms = None
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(
+                database_url=f"sqlite:///{tmp}/shed.db",
+                db_pool_size=20,
+                db_max_overflow=40,
+                sqlite_busy_timeout_ms=60000,
+            )
+            engine = create_db_engine(settings)
+            Base.metadata.create_all(bind=engine)
+            seed(engine)
+            engine.dispose()
+
+            async_engine = create_async_db_engine(settings)
+            sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+            async def override_get_async_db():
+                async with sessions() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_db] = override_get_async_db
+            try:
+                purchases, latencies = await flood(buyers, browsers, seconds)
+            finally:
+                app.dependency_overrides.pop(get_async_db, None)
+                await async_engine.dispose()
+
+        outcomes = " ".join(f"{code}:{count}" for code, count in sorted(purchases.items()))
+        print(
+            f"{mode:<10}{outcomes:>24}{len(latencies) / seconds:>10.0f}"
+            f"{percentile(latencies, 0.5):>9.1f}{percentile(latencies, 0.99):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--browsers", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.buyers, args.browsers, args.seconds))
@@ -0,0 +1,171 @@
+"""
+On-sale load with and without a waiting room.
+
+Seeds a throwaway SQLite database with one event, then lets ``--buyers``
+clients buy a ticket each, all arriving at once: first straight at
+POST /tickets, then through a waiting room: every buyer joins a held
+queue, the on-sale starts admitting ``--rate`` buyers per second, and each
+follows the position stream until admitted, then buys with the admission
+token. Reports how long each on-sale took and the peak purchases committed
+per second over one and five second windows. Behind the waiting room the
+peak stays near the admission rate however many buyers arrive. Exits non-zero when a queued buyer fails to get their
+ticket.
+
+Rate limits and load shedding are turned off: every client shares one
+address here.
+
+Run with: python benchmarks/load_waiting_room.py [--buyers 1000] [--rate 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("PURCHASE_CONCURRENCY_MAX", "0")
+os.environ.setdefault("WAITING_ROOM_BACKEND", "memory")
+os.environ.setdefault("QUEUE_POLL_SECONDS", "1")
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Event, Venue
+from app.waiting_room import ADMISSION_HEADER
+
+
+# Lock waits are the point of this test, not slow queries worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+
+def seed(engine, capacity):
+    with engine.begin() as conn:
+        conn.execute(insert(Venue), [
+            {"name": "Uhuru Gardens", "address": "Langata Road", "city": "Nairobi", "capacity": capacity},
+        ])
+        conn.execute(insert(Event), [{
+            "venue_id": 1,
+            "title": "Sol Fest",
+            "category": "Concert",
+            "event_date": date.today() + timedelta(days=30),
+            "event_time": dtime(19, 0),
+        }])
+
+
+async def on_sale(client, buyers, rate=None):
+    """Status code counts, seconds taken and the time each successful purchase finished
+
+    With a rate, buyers queue first and the clock starts when admission does.
+    """
+    finished = []
+    codes: Counter = Counter()
+    queued = rate is not None
+    lined_up = asyncio.Event()
+    joined = 0
+
+    async def buy(i):
+        nonlocal joined
+        headers = {}
+        if queued:
+            position = (await client.post("/events/1/queue/join")).json()
+            joined += 1
+            if joined == buyers:
+                lined_up.set()
+            if not position["admitted"]:
+                # The stream ends with the buyer's admission
+                stream = await client.get(f"/events/1/queue/{position['queue_token']}/stream")
+                last = [line for line in stream.text.splitlines() if line.startswith("data: ")][-1]
+                position = json.loads(last[len("data: "):])
+            headers[ADMISSION_HEADER] = position["admission_token"]
+        response = await client.post("/tickets", headers=headers, json={
+            "event_id": 1,
+            "buyer_name": f"Buyer {i}",
+            "buyer_email": f"buyer{i}@email.co.ke",
+            "price": "3500.00",
+        })
+        codes[response.status_code] += 1
+        if response.status_code == 201:
+            finished.append(time.perf_counter())
+
+    crowd = asyncio.gather(*(buy(i) for i in range(buyers)))
+    if queued:
+        await lined_up.wait()
+        await client.post("/events/1/queue", json={"rate_per_second": rate})
+    started = time.perf_counter()
+    await crowd
+    return codes, time.perf_counter() - started, finished
+
+
+def peak_rate(moments, window):
+    """Most events within any ``window`` seconds, per second"""
+    moments = sorted(moments)
+    peak = start = 0
+    for end, moment in enumerate(moments):
+        while moment - moments[start] > window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak / window
+
+
+async def run(buyers, rate) -> bool:
+    print(f"{buyers} buyers arriving at once; queue admits {rate:g}/s")
+    print(f"{'on-sale':<16}{'responses':>20}{'seconds':>10}{'peak/s (1s)':>13}{'peak/s (5s)':>13}")
+    ok = True
+    for label, queue_rate in (("no queue", None), ("waiting room", rate)):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(
+                database_url=f"sqlite:///{tmp}/onsale.db",
+                db_pool_size=20,
+                db_max_overflow=40,
+                sqlite_busy_timeout_ms=60000,
+            )
+            engine = create_db_engine(settings)
+            Base.metadata.create_all(bind=engine)
+            seed(engine, buyers)
+            engine.dispose()
+
+            async_engine = create_async_db_engine(settings)
+            sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+            async def override_get_async_db():
+                async with sessions() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_db] = override_get_async_db
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+                    if queue_rate is not None:
+                        await client.post("/events/1/queue", json={"rate_per_second": 0})
+                    codes, elapsed, finished = await on_sale(client, buyers, queue_rate)
+                    if queue_rate is not None:
+                        await client.delete("/events/1/queue")
+            finally:
+                app.dependency_overrides.pop(get_async_db, None)
+                await async_engine.dispose()
+
+        responses = " ".join(f"{code}:{count}" for code, count in sorted(codes.items()))
+        print(f"{label:<16}{responses:>20}{elapsed:>10.1f}{peak_rate(finished, 1):>13.0f}{peak_rate(finished, 5):>13.0f}")
+        if queue_rate is not None:
+            ok = codes[201] == buyers
+    print("✓ every queued buyer got a ticket" if ok else "✗ queued buyers were turned away")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--buyers", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=50)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.buyers, args.rate)) else 1)
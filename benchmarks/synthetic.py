@@ -0,0 +1,188 @@
+"""
+Synthetic benchmark data.
+
+Fills a database with the shape of ``seed.py``'s Kenyan sample data at
+benchmark scale: venues in Kenyan cities, ten events per venue on average
+and ten tickets per event, plus the derived tables (seat inventory, ticket
+stats, sales rollups and buckets) the routes read. The same ``--seed``
+always gives the same rows, confirmation codes included, with dates
+relative to the day it runs, so timings taken on two generated databases
+compare like for like.
+
+Scales (venues / events / tickets):
+
+  small   1,000 / 10,000 / 100,000         a few seconds; the default for the route benchmarks
+  medium  10,000 / 100,000 / 1,000,000
+  full    100,000 / 1,000,000 / 10,000,000
+
+Event ids are ordered by date, tickets by purchase time; about 5% of
+tickets are cancelled and 10% used. Events run from half a year ago to a
+year ahead, and tickets were bought over the past year.
+
+Run with: python benchmarks/synthetic.py [--scale full] [--database sqlite:///bench_full.db] [--seed 0]
+"""
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.codes import generate_confirmation_code
+from app.config import Settings
+from app.database import Base, create_db_engine
+from app.models import Event, Ticket, Venue
+from app.services import (
+    bump_revisions, rebuild_inventory, rebuild_ticket_stats, rebuild_row_counts, rebuild_ticket_sales,
+    rebuild_sales_buckets,
+)
+
+# Bulk loads and rebuilds are slow statements by design, not ones worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+
+class Scale(NamedTuple):
+    venues: int
+    events: int
+    tickets: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(1_000, 10_000, 100_000),
+    "medium": Scale(10_000, 100_000, 1_000_000),
+    "full": Scale(100_000, 1_000_000, 10_000_000),
+}
+
+CHUNK = 50_000
+
+CITIES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Malindi", "Nyeri", "Naivasha", "Machakos"]
+PLACES = ["Kasarani", "Uhuru", "Jamhuri", "Moi", "Kenyatta", "Tudor", "Milimani", "Lang'ata", "Westlands", "Nyali"]
+VENUE_KINDS = ["Stadium", "Arena", "Gardens", "Grounds", "Hall", "Theatre", "Amphitheatre", "Lounge"]
+CAPACITIES = [500, 1_000, 2_500, 5_000, 10_000, 30_000, 60_000]
+CATEGORIES = {
+    "Sports": ["Derby", "Rugby Sevens", "Marathon", "Safari Rally Stage", "Cup Final", "Boxing Night"],
+    "Concert": ["Live", "Unplugged", "Gospel Night", "Benga Revival", "Afro Fusion", "Jazz Evening"],
+    "Comedy": ["Comedy Night", "Stand-Up Special", "Improv Jam", "Roast"],
+    "Festival": ["Food Festival", "Arts Festival", "Cultural Week", "Film Festival"],
+    "Theatre": ["Premiere", "Drama Season", "Musical", "Poetry Slam"],
+}
+TICKET_TYPES = [("Standard", 1_500, 70), ("VIP", 5_000, 20), ("Premium", 12_000, 10)]
+
+
+def venue_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    for i in range(1, scale.venues + 1):
+        city = rng.choice(CITIES)
+        yield {
+            "name": f"{rng.choice(PLACES)} {rng.choice(VENUE_KINDS)} {i}",
+            "address": f"{rng.randint(1, 999)} {rng.choice(PLACES)} Road",
+            "city": city,
+            "capacity": rng.choice(CAPACITIES),
+        }
+
+
+def event_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    first_day = date.today() - timedelta(days=182)
+    days = 547
+    for i in range(scale.events):
+        category = rng.choice(list(CATEGORIES))
+        yield {
+            "venue_id": rng.randint(1, scale.venues),
+            "title": f"{rng.choice(PLACES)} {rng.choice(CATEGORIES[category])} {i + 1}",
+            "description": f"{category} at benchmark scale",
+            "category": category,
+            "event_date": first_day + timedelta(days=days * i // scale.events),
+            "event_time": dtime(rng.choice((14, 17, 19, 20)), rng.choice((0, 30))),
+        }
+
+
+def ticket_rows(scale: Scale, rng: random.Random) -> Iterator[dict]:
+    start = datetime.combine(date.today(), dtime.min, timezone.utc) - timedelta(days=365)
+    span = 365 * 24 * 3600
+    types, prices, weights = zip(*TICKET_TYPES)
+    for i in range(scale.tickets):
+        purchased = start + timedelta(seconds=span * i / scale.tickets)
+        ticket_type = rng.choices(types, weights)[0]
+        roll = rng.random()
+        yield {
+            "event_id": rng.randint(1, scale.events),
+            "buyer_name": f"Buyer {i + 1}",
+            "buyer_email": f"buyer{i + 1}@email.co.ke",
+            "ticket_type": ticket_type,
+            "price": prices[types.index(ticket_type)],
+            "confirmation_code": generate_confirmation_code(purchased.timestamp(), rng),
+            "purchase_date": purchased,
+            "status": "cancelled" if roll < 0.05 else "used" if roll < 0.15 else "confirmed",
+        }
+
+
+def load(engine, model, rows: Iterator[dict], total: int) -> None:
+    """Insert ``rows`` in chunks of CHUNK, one executemany per chunk"""
+    started = time.perf_counter()
+    chunk = []
+    with engine.begin() as conn:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == CHUNK:
+                conn.execute(insert(model), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(model), chunk)
+    elapsed = time.perf_counter() - started
+    print(f"  {model.__tablename__:<10}{total:>12,} rows{elapsed:>9.1f}s{total / elapsed:>12,.0f} rows/s")
+
+
+def generate(engine, scale: Scale, seed: int = 0) -> None:
+    """Create the schema and fill an empty database with ``scale`` rows"""
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.scalar(select(func.count()).select_from(Venue)):
+            raise SystemExit("Database already has venues; generate into an empty one")
+    rng = random.Random(seed)
+    load(engine, Venue, venue_rows(scale, rng), scale.venues)
+    load(engine, Event, event_rows(scale, rng), scale.events)
+    load(engine, Ticket, ticket_rows(scale, rng), scale.tickets)
+
+    started = time.perf_counter()
+    with sessionmaker(bind=engine)() as db:
+        rebuild_inventory(db)
+        rebuild_ticket_stats(db)
+        rebuild_row_counts(db)
+        rebuild_ticket_sales(db)
+        rebuild_sales_buckets(db)
+        bump_revisions(db, "venues", "events")
+        db.commit()
+    print(f"  derived tables rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+@contextmanager
+def dataset(database: Optional[str] = None, scale: str = "small", seed: int = 0, **overrides) -> Iterator[Settings]:
+    """Settings for ``database``, a generated dataset; without one, a throwaway ``scale`` dataset"""
+    if database:
+        yield Settings(database_url=database, **overrides)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/bench.db", **overrides)
+        engine = create_db_engine(settings)
+        print(f"Generating the {scale} dataset")
+        generate(engine, SCALES[scale], seed)
+        engine.dispose()
+        yield settings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--database", default="sqlite:///bench.db", help="SQLAlchemy URL of an empty database")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"Generating the {args.scale} dataset into {args.database}")
+    generate(create_db_engine(Settings(database_url=args.database)), SCALES[args.scale], args.seed)
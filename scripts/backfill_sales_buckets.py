@@ -0,0 +1,35 @@
+"""
+Backfill the sales_buckets time series from the tickets table.
+
+Run once after ``alembic upgrade`` adds the table, or with ``--since`` to
+recompute recent days after a manual data fix. Buckets from ``--since``
+(midnight UTC) on are replaced in one transaction; purchases made while it
+runs wait for it rather than being counted twice.
+
+Run with: python scripts/backfill_sales_buckets.py [--since 2026-01-01]
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime, time as dtime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import SessionLocal
+from app.services import rebuild_sales_buckets
+
+
+def main(since):
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        written = rebuild_sales_buckets(db, datetime.combine(since, dtime.min) if since else None)
+        db.commit()
+    scope = f"from {since.isoformat()}" if since else "for all tickets"
+    print(f"✓ Wrote {written} sales buckets {scope} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--since", type=date.fromisoformat, help="First day to recompute (UTC)")
+    main(parser.parse_args().since)
@@ -0,0 +1,242 @@
+"""
+N+1 query check for the read routes.
+
+Seeds two throwaway SQLite databases with the same shape at different sizes
+(every venue has SCALE events and every event SCALE tickets), issues the same
+GET requests against both with the response cache off, and counts the SQL
+statements each request runs. The list requests in FAST_JSON_REQUESTS run
+again with FAST_JSON on. A route whose count grows with the data is
+loading rows one query at a time (an N+1) and fails the check; so does any
+GET route missing from REQUESTS.
+
+Run with: python scripts/check_query_counts.py [-v]
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Count what the routes run, not what the response cache saves them
+os.environ["CACHE_BACKEND"] = "none"
+# The schema is built below, on a throwaway database the app never migrates
+os.environ.setdefault("SCHEMA_ON_STARTUP", "none")
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings, get_settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Venue, Event, Ticket
+from app.services import rebuild_ticket_stats, rebuild_row_counts, rebuild_ticket_sales, rebuild_sales_buckets
+
+SMALL, LARGE = 1, 5
+
+# (path, TestClient kwargs); ids refer to rows present at every scale
+REQUESTS = [
+    ("/", {}),
+    ("/health", {}),
+    ("/venues", {}),
+    ("/venues", {"params": {"city": "Nairobi"}}),
+    ("/venues", {"params": {"search": "hall"}}),
+    ("/venues", {"params": {"fields": "name,city"}}),
+    ("/venues/search", {"params": {"q": "hall"}}),
+    ("/venues/1", {}),
+    ("/venues/1/events", {}),
+    ("/events", {}),
+    ("/events", {"params": {"category": "Concert"}}),
+    ("/events", {"params": {"venue_id": 1}}),
+    ("/events", {"params": {"search": "night"}}),
+    ("/events", {"params": {"fields": "id,title,event_date,venue.name"}}),
+    ("/events", {"params": {"include": "availability"}}),
+    ("/events/search", {"params": {"q": "night"}}),
+    ("/events/export", {"params": {"format": "csv"}}),
+    ("/events/1", {}),
+    ("/events/1/availability", {}),
+    ("/events/1/queue", {}),
+    ("/events/1/queue/{queue_token}", {}),
+    ("/events/1/queue/{queue_token}/stream", {}),
+    ("/tickets", {}),
+    ("/tickets", {"params": {"fields": "event_id,status"}}),
+    ("/tickets/export", {}),
+    ("/tickets/1", {}),
+    ("/tickets/code/CODE0001", {}),
+    ("/tickets/code/CODE0001/status", {}),
+    ("/holds/{hold_id}", {}),
+    ("/tickets/event/1", {}),
+    ("/stats/dashboard", {}),
+    ("/stats/cache", {}),
+    ("/stats/gate", {}),
+    ("/stats/limits", {}),
+    ("/stats/queues", {}),
+    ("/stats/holds", {}),
+    ("/metrics", {}),
+    ("/stats/timeseries", {"params": {"date_from": date.today().isoformat(), "group_by": "venue"}}),
+]
+
+# List requests repeated through app/fast_json.py; limit 2 leaves a next
+# page at every scale, so the cursor is taken from a selected row
+FAST_JSON_REQUESTS = [
+    ("/venues", {}),
+    ("/venues", {"params": {"fields": "id", "limit": 2}}),
+    ("/venues", {"params": {"fields": "name,city"}}),
+    ("/events", {}),
+    ("/events", {"params": {"fields": "id", "limit": 2}}),
+    ("/events", {"params": {"fields": "id,title,event_date,venue.name"}}),
+    ("/tickets", {}),
+    ("/tickets", {"params": {"fields": "id", "limit": 2}}),
+    ("/tickets", {"params": {"fields": "event_id,status"}}),
+]
+
+
+@contextmanager
+def fast_json():
+    """Serve list pages through app/fast_json.py while inside"""
+    settings = get_settings()
+    before, settings.fast_json = settings.fast_json, True
+    try:
+        yield
+    finally:
+        settings.fast_json = before
+
+
+def seed_fixture(db, scale):
+    """Three venues, ``scale`` events per venue and ``scale`` tickets per event"""
+    venues = [
+        Venue(name=f"{name} Hall", address="Moi Avenue", city=city, capacity=5000)
+        for name, city in [("Moi", "Nairobi"), ("Tudor", "Mombasa"), ("Kisumu", "Kisumu")]
+    ]
+    db.add_all(venues)
+    db.flush()
+    events = [
+        Event(
+            venue_id=venue.id,
+            title=f"Concert Night {i}",
+            category="Concert",
+            event_date=date.today() + timedelta(days=30 + i),
+            event_time=time(19, 0),
+        )
+        for i in range(scale)
+        for venue in venues
+    ]
+    db.add_all(events)
+    db.flush()
+    db.add_all(
+        Ticket(
+            event_id=ticket_event.id,
+            buyer_name=f"Buyer {n}",
+            buyer_email=f"buyer{n}@email.co.ke",
+            price=1000,
+            confirmation_code=f"CODE{n:04d}",
+        )
+        for n, ticket_event in enumerate(
+            (e for e in events for _ in range(scale)), start=1
+        )
+    )
+    rebuild_ticket_stats(db)
+    rebuild_row_counts(db)
+    rebuild_ticket_sales(db)
+    rebuild_sales_buckets(db)
+    db.commit()
+
+
+def route_for(path):
+    """The GET route Starlette would dispatch ``path`` to"""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path_regex.match(path):
+            return route
+    return None
+
+
+def count_statements(scale):
+    """{request label: statements run} against a database seeded at ``scale``"""
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/counts.db")
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            seed_fixture(db, scale)
+        engine.dispose()
+
+        async_engine = create_async_db_engine(settings)
+        TestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with TestingSession() as db:
+                yield db
+
+        counter = {"statements": 0}
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            counter["statements"] += 1
+
+        counts = {}
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        try:
+            with TestClient(app, raise_server_exceptions=False) as client:
+                # Queue positions and holds are read with the ids they hand out
+                client.post("/events/1/queue", json={"rate_per_second": 1000})
+                issued = {
+                    "queue_token": client.post("/events/1/queue/join").json()["queue_token"],
+                    "hold_id": client.post("/events/2/holds", json={"quantity": 1}).json()["id"],
+                }
+                for path, kwargs in REQUESTS:
+                    label = f"GET {path} {kwargs.get('params', '')}".rstrip()
+                    counter["statements"] = 0
+                    response = client.get(path.format(**issued), **kwargs)
+                    counts[label] = (counter["statements"], response.status_code)
+                with fast_json():
+                    for path, kwargs in FAST_JSON_REQUESTS:
+                        label = f"GET {path} {kwargs.get('params', '')}".rstrip() + " (FAST_JSON)"
+                        counter["statements"] = 0
+                        response = client.get(path, **kwargs)
+                        counts[label] = (counter["statements"], response.status_code)
+                client.delete("/events/1/queue")
+                client.portal.call(async_engine.dispose)
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+    return counts
+
+
+def main(verbose=False):
+    failures = []
+    covered = set()
+    for path, _ in REQUESTS:
+        route = route_for(path)
+        if route is None:
+            failures.append(f"GET {path}: no route matches")
+        else:
+            covered.add(route.path)
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path not in covered:
+            failures.append(f"GET {route.path}: not exercised, add it to REQUESTS")
+
+    small = count_statements(SMALL)
+    large = count_statements(LARGE)
+    for label, (statements, status) in small.items():
+        grown, large_status = large[label]
+        if verbose:
+            print(f"{label:<64}{statements:>4}{grown:>4}")
+        if status >= 400 or large_status >= 400:
+            failures.append(f"{label}: HTTP {status} / {large_status}")
+        elif grown > statements:
+            failures.append(f"{label}: {statements} statements at scale {SMALL}, {grown} at scale {LARGE} (N+1)")
+
+    if failures:
+        print(f"✗ {len(failures)} query count problem(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"✓ {len(small)} read requests run a constant number of statements at scale {SMALL} and {LARGE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(verbose="-v" in sys.argv[1:]))
@@ -0,0 +1,309 @@
+"""
+Query plan checker.
+
+Runs every API route against a small throwaway SQLite database, captures
+the SQL each route issues and runs EXPLAIN QUERY PLAN on every SELECT,
+UPDATE and DELETE, then repeats the list requests in FAST_JSON_REQUESTS
+with FAST_JSON on. Exits non-zero if any statement falls back to a full
+table scan, or if a route has no entry in REQUESTS (so new routes cannot
+slip past the check).
+
+Run with: python scripts/check_query_plans.py [-v]
+"""
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# The schema is built below, on a throwaway database the app never migrates
+os.environ.setdefault("SCHEMA_ON_STARTUP", "none")
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings, get_settings
+from app.database import Base, create_async_db_engine, create_db_engine, get_async_db
+from app.main import app
+from app.models import Venue, Event, Ticket
+from app.pagination import encode_cursor
+from app.services import rebuild_ticket_stats, rebuild_row_counts, rebuild_ticket_sales, rebuild_sales_buckets
+
+# Tables that stay a handful of rows by construction, so scanning them is fine
+BOUNDED_TABLES = {"ticket_stats", "table_revisions"}
+
+# Path placeholders filled from earlier responses: placeholder ->
+# (path suffix of the POST that hands it out, response field)
+ISSUED = {"queue_token": ("/queue/join", "queue_token"), "hold_id": ("/holds", "id")}
+
+# Routes whose job is to read whole tables (streamed exports)
+FULL_SCAN_ROUTES = {"export_events", "export_tickets"}
+
+# (method, path, TestClient kwargs); ids refer to the fixture rows below
+REQUESTS = [
+    ("GET", "/", {}),
+    ("GET", "/health", {}),
+    ("GET", "/venues", {}),
+    ("GET", "/venues", {"headers": {"If-None-Match": '"venues.0"'}}),
+    ("GET", "/venues", {"params": {"city": "Nairobi"}}),
+    ("GET", "/venues", {"params": {"search": "arena"}}),
+    ("GET", "/venues", {"params": {"cursor": encode_cursor([1]), "limit": 1}}),
+    ("GET", "/venues", {"params": {"fields": "name,city"}}),
+    ("GET", "/venues/search", {"params": {"q": "arena"}}),
+    ("GET", "/venues/1", {}),
+    ("GET", "/venues/1/events", {}),
+    ("POST", "/venues", {"json": {"name": "New Hall", "address": "Moi Avenue", "city": "Nairobi", "capacity": 800}}),
+    ("PUT", "/venues/1", {"json": {"capacity": 2500}}),
+    ("GET", "/events", {}),
+    ("GET", "/events", {"params": {"category": "Concert"}}),
+    ("GET", "/events", {"params": {"venue_id": 1}}),
+    ("GET", "/events", {"params": {"search": "derby"}}),
+    ("GET", "/events", {"params": {"cursor": encode_cursor([2]), "limit": 2}}),
+    ("GET", "/events", {"params": {"fields": "id,title,event_date,venue.name"}}),
+    ("GET", "/events", {"params": {"include": "availability"}}),
+    ("GET", "/events", {"params": {"include": "availability", "fields": "id,title"}}),
+    ("GET", "/events/search", {"params": {"q": "derby"}}),
+    ("GET", "/events/export", {"params": {"date_from": date.today().isoformat()}}),
+    ("GET", "/events/1", {}),
+    ("GET", "/events/1/availability", {}),
+    ("POST", "/events", {"json": {
+        "venue_id": 1, "title": "Jazz Night", "category": "Concert",
+        "event_date": "2031-01-10", "event_time": "19:00:00",
+    }}),
+    ("PUT", "/events/1", {"json": {"title": "Derby Day Rematch", "venue_id": 1}}),
+    ("GET", "/tickets", {}),
+    ("GET", "/tickets", {"params": {"cursor": encode_cursor([3]), "limit": 3}}),
+    ("GET", "/tickets", {"params": {"fields": "event_id,status"}}),
+    ("GET", "/tickets/export", {"params": {"event_id": 1, "status": "confirmed", "format": "csv"}}),
+    ("GET", "/tickets/1", {}),
+    ("GET", "/tickets/code/CODE0001", {}),
+    ("GET", "/tickets/code/CODE0003/status", {}),
+    ("POST", "/events/2/gate", {}),
+    ("GET", "/tickets/code/CODE0001/status", {}),
+    ("POST", "/tickets/code/CODE0001/redeem", {"params": {"event_id": 2}}),
+    ("POST", "/tickets/redeem", {"json": {"codes": ["CODE0004", "CODE0005", "CODE0001", "NOSUCHCODE"]}}),
+    ("DELETE", "/events/2/gate", {}),
+    ("POST", "/events/3/queue", {"json": {"rate_per_second": 1000}}),
+    ("POST", "/events/3/queue/join", {}),
+    ("GET", "/events/3/queue", {}),
+    ("GET", "/events/3/queue/{queue_token}", {}),
+    ("GET", "/events/3/queue/{queue_token}/stream", {}),
+    ("DELETE", "/events/3/queue", {}),
+    ("POST", "/events/4/holds", {"json": {"quantity": 2}}),
+    ("GET", "/holds/{hold_id}", {}),
+    ("POST", "/holds/{hold_id}/confirm", {"json": {"buyer_name": "Wanjiru", "buyer_email": "wanjiru@email.co.ke", "price": "800.00"}}),
+    ("POST", "/events/4/holds", {"json": {"quantity": 1, "ttl_seconds": 60}}),
+    ("DELETE", "/holds/{hold_id}", {}),
+    ("GET", "/tickets/event/1", {}),
+    ("POST", "/tickets", {"json": {"event_id": 1, "buyer_name": "Amina", "buyer_email": "amina@email.co.ke", "price": "500.00"}}),
+    ("POST", "/tickets/batch", {"json": {"tickets": [
+        {"event_id": 1, "buyer_name": "Baraka", "buyer_email": "baraka@email.co.ke", "price": "500.00"},
+        {"event_id": 2, "buyer_name": "Baraka", "buyer_email": "baraka@email.co.ke", "price": "750.00"},
+    ]}}),
+    ("DELETE", "/tickets/2", {}),
+    ("GET", "/stats/dashboard", {}),
+    ("GET", "/stats/cache", {}),
+    ("GET", "/stats/gate", {}),
+    ("GET", "/stats/limits", {}),
+    ("GET", "/stats/queues", {}),
+    ("GET", "/stats/holds", {}),
+    ("GET", "/metrics", {}),
+    ("GET", "/stats/timeseries", {"params": {"date_from": date.today().isoformat(), "interval": "hour"}}),
+    ("GET", "/stats/timeseries", {"params": {"date_from": date.today().isoformat(), "event_id": 1}}),
+    ("GET", "/stats/timeseries", {"params": {
+        "date_from": date.today().isoformat(), "interval": "week", "group_by": "city", "category": "Concert",
+    }}),
+    ("DELETE", "/events/5", {}),
+    ("DELETE", "/venues/3", {}),
+]
+
+# List requests repeated through app/fast_json.py, single-column pages included
+FAST_JSON_REQUESTS = [
+    ("GET", "/venues", {}),
+    ("GET", "/venues", {"params": {"fields": "id", "limit": 2}}),
+    ("GET", "/venues", {"params": {"fields": "name,city", "cursor": encode_cursor([1]), "limit": 1}}),
+    ("GET", "/events", {}),
+    ("GET", "/events", {"params": {"fields": "id", "limit": 2}}),
+    ("GET", "/events", {"params": {"fields": "id,title,event_date,venue.name", "cursor": encode_cursor([2])}}),
+    ("GET", "/tickets", {}),
+    ("GET", "/tickets", {"params": {"fields": "id", "limit": 2}}),
+    ("GET", "/tickets", {"params": {"fields": "event_id,status", "cursor": encode_cursor([3]), "limit": 3}}),
+]
+
+PLAN_SCAN = re.compile(r"^SCAN (\w+)(.*)$")
+
+
+@contextmanager
+def fast_json():
+    """Serve list pages through app/fast_json.py while inside"""
+    settings = get_settings()
+    before, settings.fast_json = settings.fast_json, True
+    try:
+        yield
+    finally:
+        settings.fast_json = before
+
+
+def seed_fixture(db):
+    """A few rows per table so every route has something to find"""
+    venues = [
+        Venue(name="Moi Arena", address="Thika Road", city="Nairobi", capacity=2000),
+        Venue(name="City Hall", address="Harambee Avenue", city="Nairobi", capacity=900),
+        Venue(name="Coast Arena", address="Mombasa Island", city="Mombasa", capacity=1500),
+        Venue(name="Uhuru Grounds", address="Langata Road", city="Nairobi", capacity=5000),
+    ]
+    db.add_all(venues)
+    db.flush()
+    first_date = date.today() + timedelta(days=30)
+    events = [
+        Event(
+            venue_id=venues[i % 3].id,
+            title=f"{category} Night {i}" if i else "Mashemeji Derby",
+            description="Season fixture" if i else "The derby everyone waits for",
+            category=category,
+            event_date=first_date + timedelta(days=i),
+            event_time=time(19, 0),
+        )
+        for i, category in enumerate(["Sports", "Concert", "Comedy", "Concert", "Festival", "Sports"])
+    ]
+    db.add_all(events)
+    db.flush()
+    db.add_all(
+        Ticket(
+            event_id=events[i % len(events)].id,
+            buyer_name=f"Buyer {i}",
+            buyer_email=f"buyer{i}@email.co.ke",
+            price=1000,
+            confirmation_code=f"CODE{i:04d}",
+        )
+        for i in range(1, 13)
+    )
+    rebuild_ticket_stats(db)
+    rebuild_row_counts(db)
+    rebuild_ticket_sales(db)
+    rebuild_sales_buckets(db)
+    db.commit()
+
+
+def route_for(method, path):
+    """The API route Starlette would dispatch (method, path) to"""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and method in route.methods and route.path_regex.match(path):
+            return route
+    return None
+
+
+def scan_violations(statement, plan):
+    """Plan lines that read a whole table without an index"""
+    statement = " ".join(statement.split())
+    bounded_listing = (
+        " LIMIT " in statement
+        and " WHERE " not in statement
+        and not any("TEMP B-TREE" in line for line in plan)
+    )
+    violations = []
+    for line in plan:
+        match = PLAN_SCAN.match(line)
+        if not match or line.startswith("SCAN CONSTANT ROW"):
+            continue
+        table, rest = match.groups()
+        if rest.strip() or table in BOUNDED_TABLES or bounded_listing:
+            # "USING INDEX ..." / "VIRTUAL TABLE ..." scans are index driven
+            continue
+        violations.append(line)
+    return violations
+
+
+def main(verbose=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(database_url=f"sqlite:///{tmp}/plans.db")
+        engine = create_db_engine(settings)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            seed_fixture(db)
+
+        async_engine = create_async_db_engine(settings)
+        TestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with TestingSession() as db:
+                yield db
+
+        captured = []
+        current = {"route": None, "name": None}
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if current["route"] and not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                captured.append((current["route"], current["name"], statement, parameters))
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        covered = set()
+        failures = []
+        issued = {}
+        try:
+            with TestClient(app, raise_server_exceptions=False) as client:
+                for method, path, kwargs in REQUESTS:
+                    route = route_for(method, path)
+                    if route is None:
+                        failures.append(f"{method} {path}: no route matches")
+                        continue
+                    covered.add((method, route.path))
+                    current["route"] = f"{method} {path} ({route.name})"
+                    current["name"] = route.name
+                    response = client.request(method, path.format(**issued), **kwargs)
+                    current["route"] = None
+                    for placeholder, (suffix, field) in ISSUED.items():
+                        if method == "POST" and path.endswith(suffix) and response.status_code < 400:
+                            issued[placeholder] = response.json()[field]
+                    if response.status_code >= 400:
+                        failures.append(f"{method} {path}: HTTP {response.status_code} {response.text}")
+                with fast_json():
+                    for method, path, kwargs in FAST_JSON_REQUESTS:
+                        route = route_for(method, path)
+                        current["route"] = f"{method} {path} ({route.name}, FAST_JSON)"
+                        current["name"] = route.name
+                        response = client.request(method, path, **kwargs)
+                        current["route"] = None
+                        if response.status_code >= 400:
+                            failures.append(f"{method} {path} (FAST_JSON): HTTP {response.status_code} {response.text}")
+                client.portal.call(async_engine.dispose)
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+
+        with engine.connect() as conn:
+            for label, name, statement, parameters in captured:
+                plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+                if verbose:
+                    print(f"{label}\n  {' '.join(statement.split())}")
+                    for line in plan:
+                        print(f"    {line}")
+                if name in FULL_SCAN_ROUTES:
+                    continue
+                for line in scan_violations(statement, plan):
+                    failures.append(f"{label}: {line}\n    {' '.join(statement.split())}")
+        engine.dispose()
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods:
+                if (method, route.path) not in covered:
+                    failures.append(f"{method} {route.path}: not exercised, add it to REQUESTS")
+
+    if failures:
+        print(f"✗ {len(failures)} query plan problem(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"✓ {len(captured)} statements across {len(covered)} routes use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(verbose="-v" in sys.argv[1:]))
@@ -0,0 +1,433 @@
+"""
+Bulk import venues, events and tickets from CSV or NDJSON files.
+
+Streams each file (``.csv`` with a header row, or ``.ndjson``/``.jsonl``
+with one object per line) and inserts its rows with Core ``insert()``
+executemany, ``--batch`` rows per transaction. Imported rows get new ids
+after the table's current highest one. Events name their venue, and
+tickets their event, by the ``id`` column of the venue or event file (or
+its 1-based record number when the file has no ``id`` column); those
+references are resolved through in-memory maps of source to new ids, so
+nothing is looked up row by row.
+
+Columns (blank values count as missing):
+
+  venues   id, name*, address*, city*, capacity*, image_url
+  events   id, venue_id*, title*, description, category, event_date* (YYYY-MM-DD),
+           event_time* (HH:MM[:SS]), image_url
+  tickets  event_id*, buyer_name*, buyer_email*, ticket_type (Standard), price*,
+           confirmation_code (generated), purchase_date (ISO 8601, now),
+           status (confirmed, cancelled or used; confirmed)
+
+For the length of the load the non-unique indexes on the imported tables
+and the search index insert triggers are dropped, and SQLite runs with
+``synchronous=OFF``, a 512 MiB page cache and in-memory temp storage.
+Afterwards the indexes are rebuilt, the search indexes are rebuilt from
+the imported text, the derived tables (seat inventory, ticket stats,
+sales rollups and buckets) are rebuilt and the planner statistics
+refreshed. Stop the API while importing: until the import finishes its
+queries run without their indexes.
+
+A row that fails to parse, names an unknown venue or event, or repeats a
+confirmation code is skipped and reported; the rest of its batch is kept.
+Progress is kept in ``--state`` after every batch. If the import stops
+part way, fix the cause and run it again with ``--resume`` to carry on
+after the last committed batch; the journal stays in WAL mode, so a
+killed import leaves the database consistent.
+
+The database must already be at the latest migration (``alembic upgrade
+head``); the importer refuses to run otherwise and never creates tables.
+
+Run with: python scripts/import_data.py --venues venues.csv --events events.ndjson --tickets tickets.csv [--database sqlite:///tickettou.db] [--resume]
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from datetime import date, datetime, time as dtime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.codes import generate_confirmation_code
+from app.config import Settings, get_settings
+from app.database import Base, create_db_engine
+from app.models import Event, Ticket, Venue
+from app.models.search_index import SEARCH_INDEXES, search_index_ddl
+from app.schema import check_schema
+from app.services import (
+    bump_revisions, rebuild_inventory, rebuild_ticket_stats, rebuild_row_counts, rebuild_ticket_sales,
+    rebuild_sales_buckets,
+)
+from app.services.stats import TICKET_STATUSES
+
+# Bulk inserts and rebuilds are slow statements by design, not ones worth logging
+logging.getLogger("app.metrics").setLevel(logging.ERROR)
+
+TABLES = ("venues", "events", "tickets")
+MODELS = {"venues": Venue, "events": Event, "tickets": Ticket}
+# Column holding the source id of a row in another table, and that table
+REFERENCES = {"events": ("venue_id", "venues"), "tickets": ("event_id", "events")}
+SHOWN_REJECTS = 10
+
+
+def text(value) -> str:
+    return str(value).strip()
+
+
+def to_date(value) -> date:
+    return date.fromisoformat(text(value))
+
+
+def to_time(value) -> dtime:
+    return dtime.fromisoformat(text(value))
+
+
+def to_datetime(value) -> datetime:
+    parsed = datetime.fromisoformat(text(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def to_price(value) -> Decimal:
+    try:
+        price = Decimal(text(value))
+    except InvalidOperation:
+        raise ValueError(f"not a price: {value!r}")
+    if price < 0:
+        raise ValueError("price is negative")
+    return price
+
+
+def to_capacity(value) -> int:
+    capacity = int(value)
+    if capacity <= 0:
+        raise ValueError("capacity must be positive")
+    return capacity
+
+
+def to_status(value) -> str:
+    status = text(value)
+    if status not in TICKET_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(TICKET_STATUSES)}")
+    return status
+
+
+# column -> (parser, required); a missing optional column is NULL, or its DEFAULTS value
+COLUMNS: Dict[str, Dict[str, Tuple[Callable, bool]]] = {
+    "venues": {
+        "name": (text, True),
+        "address": (text, True),
+        "city": (text, True),
+        "capacity": (to_capacity, True),
+        "image_url": (text, False),
+    },
+    "events": {
+        "title": (text, True),
+        "description": (text, False),
+        "category": (text, False),
+        "event_date": (to_date, True),
+        "event_time": (to_time, True),
+        "image_url": (text, False),
+    },
+    "tickets": {
+        "buyer_name": (text, True),
+        "buyer_email": (text, True),
+        "ticket_type": (text, False),
+        "price": (to_price, True),
+        "confirmation_code": (text, False),
+        "purchase_date": (to_datetime, False),
+        "status": (to_status, False),
+    },
+}
+DEFAULTS = {"tickets": {"ticket_type": "Standard", "status": "confirmed"}}
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Records of a CSV or NDJSON file, with blank values as None"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            for record in csv.DictReader(file):
+                yield {key: (value if value != "" else None) for key, value in record.items()}
+        elif path.endswith((".ndjson", ".jsonl")):
+            for line in file:
+                if line.strip():
+                    yield {key: (value if value != "" else None) for key, value in json.loads(line).items()}
+        else:
+            raise SystemExit(f"{path}: expected a .csv, .ndjson or .jsonl file")
+
+
+def source_key(record: dict, number: int) -> str:
+    """How other files refer to this record: its id column, else its record number"""
+    value = record.get("id")
+    return text(value) if value is not None else str(number)
+
+
+def to_row(table: str, record: dict, new_id: int, parents: Optional[Dict[str, int]]) -> dict:
+    """The insert parameters for one record; ValueError when it cannot be imported"""
+    row = {"id": new_id, **DEFAULTS.get(table, {})}
+    for column, (parse, required) in COLUMNS[table].items():
+        value = record.get(column)
+        if value is None:
+            if required:
+                raise ValueError(f"missing {column}")
+            # executemany needs the same columns in every row
+            row.setdefault(column, None)
+            continue
+        try:
+            row[column] = parse(value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"{column}: {exc}")
+    if table in REFERENCES:
+        column, parent = REFERENCES[table]
+        value = record.get(column)
+        if value is None:
+            raise ValueError(f"missing {column}")
+        if text(value) not in parents:
+            raise ValueError(f"{column} {value} is not in the {parent} file")
+        row[column] = parents[text(value)]
+    if table == "tickets":
+        if row["purchase_date"] is None:
+            row["purchase_date"] = datetime.now(timezone.utc)
+        if row["confirmation_code"] is None:
+            row["confirmation_code"] = generate_confirmation_code(row["purchase_date"].timestamp())
+    return row
+
+
+def load_engine(database: str):
+    """An engine tuned for bulk writes from a single connection"""
+    engine = create_db_engine(Settings(
+        database_url=database,
+        sqlite_synchronous="OFF",
+        sqlite_cache_size=-512 * 1024,
+    ))
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def temp_store_in_memory(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA temp_store=MEMORY")
+    return engine
+
+
+def defer_indexes(engine, tables: List[str]) -> None:
+    """Drop the non-unique indexes and search index insert triggers on ``tables``"""
+    with engine.begin() as conn:
+        for table in tables:
+            for index in Base.metadata.tables[table].indexes:
+                if not index.unique:
+                    index.drop(conn, checkfirst=True)
+        if conn.dialect.name == "sqlite":
+            for index, (source, _) in SEARCH_INDEXES.items():
+                if source in tables:
+                    conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {index}_ai")
+
+
+def restore_indexes(engine, tables: List[str]) -> None:
+    """Recreate what defer_indexes dropped and reindex the imported text"""
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for table in tables:
+            for index in Base.metadata.tables[table].indexes:
+                index.create(conn, checkfirst=True)
+        if conn.dialect.name == "sqlite":
+            for index, (source, _) in SEARCH_INDEXES.items():
+                if source in tables:
+                    for statement in search_index_ddl(index):
+                        conn.exec_driver_sql(statement)
+                    conn.exec_driver_sql(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+    print(f"  indexes rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+def insert_batch(conn, model, rows: List[dict]) -> List[Tuple[int, str]]:
+    """Insert ``rows`` in one transaction; on a constraint violation keep every row but the offenders"""
+    try:
+        with conn.begin():
+            conn.execute(insert(model), rows)
+        return []
+    except IntegrityError:
+        pass
+    rejected = []
+    with conn.begin():
+        for row in rows:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(model), row)
+            except IntegrityError as exc:
+                rejected.append((row["id"], str(exc.orig)))
+    return rejected
+
+
+class Import:
+    """One import run, resumable from the state file it keeps"""
+
+    def __init__(self, engine, state_path: str, state: dict, batch: int):
+        self.engine = engine
+        self.state_path = state_path
+        self.state = state
+        self.batch = batch
+        # Source key -> new id of the rows imported so far, for the tables referenced by others
+        self.maps: Dict[str, Dict[str, int]] = {}
+
+    def save_state(self) -> None:
+        with open(self.state_path, "w") as file:
+            json.dump(self.state, file, indent=2, sort_keys=True)
+
+    def run(self) -> None:
+        tables = [table for table in TABLES if table in self.state["files"]]
+        for table in tables:
+            self.state["bases"].setdefault(table, self.max_id(table))
+        self.save_state()
+        defer_indexes(self.engine, tables)
+        for table in tables:
+            self.load(table)
+        restore_indexes(self.engine, tables)
+        self.rebuild_derived()
+
+    def max_id(self, table: str) -> int:
+        with self.engine.connect() as conn:
+            return conn.scalar(select(func.coalesce(func.max(MODELS[table].id), 0)))
+
+    def imported_ids(self, table: str, base: int, done: int) -> set:
+        model = MODELS[table]
+        with self.engine.connect() as conn:
+            return set(conn.scalars(select(model.id).where(model.id > base, model.id <= base + done)))
+
+    def load(self, table: str) -> None:
+        model = MODELS[table]
+        base = self.state["bases"][table]
+        # A batch commits before its progress is saved, so the database may be one batch ahead
+        done = max(self.state["done"].get(table, 0), self.max_id(table) - base)
+        referenced = table in (parent for _, parent in REFERENCES.values())
+        parents = self.maps.get(REFERENCES[table][1]) if table in REFERENCES else None
+        existing = self.imported_ids(table, base, done) if referenced and done else set()
+        keys: Dict[str, int] = {}
+
+        started = time.perf_counter()
+        inserted = 0
+        rejects: List[str] = []
+        rows: List[dict] = []
+        row_keys: List[str] = []
+        number = 0
+
+        with self.engine.connect() as conn:
+
+            def flush():
+                nonlocal inserted
+                failed = dict(insert_batch(conn, model, rows))
+                for position, row in enumerate(rows):
+                    if row["id"] in failed:
+                        rejects.append(f"record {row['id'] - base}: {failed[row['id']]}")
+                        if referenced:
+                            keys.pop(row_keys[position], None)
+                inserted += len(rows) - len(failed)
+                self.state["done"][table] = number
+                self.save_state()
+                rows.clear()
+                row_keys.clear()
+
+            for number, record in enumerate(read_records(self.state["files"][table]), 1):
+                new_id = base + number
+                if number <= done:
+                    # Already imported on an earlier run; only its id is needed
+                    if referenced and new_id in existing:
+                        keys[source_key(record, number)] = new_id
+                    continue
+                try:
+                    row = to_row(table, record, new_id, parents)
+                except ValueError as exc:
+                    rejects.append(f"record {number}: {exc}")
+                    continue
+                rows.append(row)
+                if referenced:
+                    row_keys.append(source_key(record, number))
+                    keys[row_keys[-1]] = new_id
+                if len(rows) == self.batch:
+                    flush()
+            if rows:
+                flush()
+            self.state["done"][table] = number
+            self.save_state()
+        if referenced:
+            self.maps[table] = keys
+
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed else 0.0
+        resumed = f" (resumed after {done:,})" if done else ""
+        print(
+            f"  {table:<10}{inserted:>12,} rows{len(rejects):>9,} rejected"
+            f"{elapsed:>9.1f}s{rate:>12,.0f} rows/s{resumed}"
+        )
+        for reject in rejects[:SHOWN_REJECTS]:
+            print(f"    ✗ {reject}")
+        if len(rejects) > SHOWN_REJECTS:
+            print(f"    ... and {len(rejects) - SHOWN_REJECTS:,} more")
+
+    def rebuild_derived(self) -> None:
+        started = time.perf_counter()
+        with sessionmaker(bind=self.engine)() as db:
+            rebuild_inventory(db)
+            rebuild_ticket_stats(db)
+            rebuild_row_counts(db)
+            rebuild_ticket_sales(db)
+            rebuild_sales_buckets(db)
+            bump_revisions(db, "venues", "events")
+            db.commit()
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        print(f"  derived tables rebuilt in {time.perf_counter() - started:.1f}s")
+
+
+def main(args) -> None:
+    state_file = Path(args.state)
+    files = {table: str(Path(getattr(args, table)).resolve()) for table in TABLES if getattr(args, table)}
+    if args.resume:
+        if not state_file.exists():
+            raise SystemExit(f"No import to resume: {args.state} does not exist")
+        state = json.loads(state_file.read_text())
+        if files and files != state["files"]:
+            raise SystemExit(f"{args.state} is an import of {state['files']}; resume it with the same files")
+    else:
+        if state_file.exists():
+            raise SystemExit(f"{args.state} holds an unfinished import; pass --resume to continue it, or delete it")
+        if not files:
+            raise SystemExit("Nothing to import; pass --venues, --events and/or --tickets")
+        if ("tickets" in files and "events" not in files) or ("events" in files and "venues" not in files):
+            raise SystemExit("Events need --venues and tickets need --events to resolve their references")
+        state = {"database": args.database, "files": files, "bases": {}, "done": {}}
+
+    engine = load_engine(state["database"])
+    with engine.connect() as conn:
+        try:
+            check_schema(conn)
+        except RuntimeError as e:
+            engine.dispose()
+            raise SystemExit(str(e))
+    print(f"Importing {', '.join(table for table in TABLES if table in state['files'])} into {state['database']}")
+    started = time.perf_counter()
+    try:
+        Import(engine, args.state, state, args.batch).run()
+    except BaseException:
+        print(f"✗ Import stopped; progress is in {args.state}, run again with --resume to continue")
+        raise
+    finally:
+        engine.dispose()
+    state_file.unlink()
+    print(f"✓ Imported in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--venues", metavar="FILE")
+    parser.add_argument("--events", metavar="FILE")
+    parser.add_argument("--tickets", metavar="FILE")
+    parser.add_argument("--database", default=get_settings().database_url, help="SQLAlchemy URL to import into")
+    parser.add_argument("--batch", type=int, default=50_000, help="rows per transaction")
+    parser.add_argument("--state", default="import_state.json", help="progress file for --resume")
+    parser.add_argument("--resume", action="store_true", help="continue the import in --state, with its files and database")
+    main(parser.parse_args())
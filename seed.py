@@ -3,18 +3,31 @@ Seed script to populate the database with Kenyan venue and event data.
 Run with: python seed.py
 """
 from datetime import date, time
-from app.database import SessionLocal, engine, Base
-from app.models import Venue, Event, Ticket
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from app.database import SessionLocal, engine
+from app.models import Venue, Event, Ticket, TicketStats, EventInventory, TicketSales, SalesBucket, Hold
+from app.services import (
+    rebuild_ticket_stats, rebuild_row_counts, rebuild_ticket_sales, rebuild_sales_buckets, ensure_inventory,
+    bump_revisions,
+)
+from app.schema import check_schema
 
 
 def seed_database():
+    # The schema comes from `alembic upgrade head`; seeding only fills it
+    with engine.connect() as conn:
+        try:
+            check_schema(conn)
+        except RuntimeError as e:
+            raise SystemExit(f"❌ {e}")
     db = SessionLocal()
 
     try:
         # Clear existing data
+        db.query(TicketStats).delete()
+        db.query(EventInventory).delete()
+        db.query(TicketSales).delete()
+        db.query(SalesBucket).delete()
+        db.query(Hold).delete()
         db.query(Ticket).delete()
         db.query(Event).delete()
         db.query(Venue).delete()
@@ -296,6 +309,14 @@ def seed_database():
 
         for ticket in tickets:
             db.add(ticket)
+        rebuild_ticket_stats(db)
+        rebuild_row_counts(db)
+        rebuild_ticket_sales(db)
+        rebuild_sales_buckets(db)
+        for event in events:
+            ensure_inventory(db, event.id)
+        # Invalidate ETags handed out for the old data
+        bump_revisions(db, "venues", "events")
         db.commit()
 
         print(f"✓ Created {len(tickets)} tickets")